@@ -2,12 +2,18 @@
 """Generate test PDFs with math symbols and charts for DoodleDoc sanity testing."""
 
 import argparse
+import os
 import random
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from io import BytesIO
 from pathlib import Path
+from typing import Any, Callable
 
+import matplotlib
 import matplotlib.pyplot as plt
 import numpy as np
+from matplotlib.figure import Figure
 from reportlab.lib.pagesizes import letter
 from reportlab.lib.units import inch
 from reportlab.pdfgen import canvas
@@ -20,7 +26,7 @@ GREEK_LETTERS = ["α", "β", "γ", "δ", "ε", "ζ", "η", "θ", "ι", "κ", "λ
 
 MATH_OPERATORS = ["∫", "∑", "∏", "√", "∂", "∞", "≈", "≠", "≤", "≥", "±", "×", "÷"]
 
-FORMULAS = [
+FORMULAS = (
     "E = mc²",
     "F = ma",
     "a² + b² = c²",
@@ -34,10 +40,33 @@ FORMULAS = [
     "x = (-b ± √(b²-4ac)) / 2a",
     "eiπ + 1 = 0",
     "∂²u/∂t² = c²∇²u",
-]
-
-
-def generate_math_pdf(output_path: Path, num_pages: int = 3) -> None:
+)
+
+SYMBOL_POOL = tuple(GREEK_LETTERS + MATH_OPERATORS)
+FORMULA_SAMPLE_K = min(5, len(FORMULAS))
+
+# Fixed plot inputs shared by every chart/calculus PDF
+_X_SINE = np.linspace(0, 4 * np.pi, 100)
+_SIN_SINE = np.sin(_X_SINE)
+_X_LINES = np.linspace(0, 10, 50)
+_X_CUBIC = np.linspace(-2, 2, 100)
+_CUBE = _X_CUBIC**3
+_DERIV = 3 * _X_CUBIC**2
+_X_AREA = np.linspace(0, 3, 100)
+_Y_AREA = np.sin(_X_AREA) + 1
+_X_TANGENT = np.linspace(-1, 3, 100)
+_X_SIN_X = np.linspace(0.01, 2, 100)
+_SINC = np.sin(_X_SIN_X) / _X_SIN_X
+
+# Default generator when a caller doesn't pass its own seeded one
+_RNG = np.random.default_rng()
+
+
+def generate_math_pdf(
+    output_path: Path,
+    num_pages: int = 3,
+    rng: np.random.Generator = _RNG,
+) -> None:
     """Generate a PDF with random math symbols and formulas."""
     c = canvas.Canvas(str(output_path), pagesize=letter)
     width, height = letter
@@ -47,48 +76,68 @@ def generate_math_pdf(output_path: Path, num_pages: int = 3) -> None:
         c.setFont("Helvetica-Bold", 24)
         c.drawString(1 * inch, height - 1 * inch, f"Math Symbols - Page {page + 1}")
 
-        # Random Greek letters scattered
-        c.setFont("Helvetica", 36)
-        for _ in range(random.randint(8, 15)):
-            x = random.uniform(0.5 * inch, width - 1 * inch)
-            y = random.uniform(2 * inch, height - 2 * inch)
-            symbol = random.choice(GREEK_LETTERS + MATH_OPERATORS)
-            c.drawString(x, y, symbol)
+        # Random Greek letters scattered (one text block for all glyphs)
+        n = int(rng.integers(8, 16))
+        xs = rng.uniform(0.5 * inch, width - 1 * inch, n)
+        ys = rng.uniform(2 * inch, height - 2 * inch, n)
+        symbols = rng.choice(SYMBOL_POOL, n)
+        text = c.beginText()
+        text.setFont("Helvetica", 36)
+        for x, y, symbol in zip(xs, ys, symbols):
+            text.setTextOrigin(x, y)
+            text.textOut(str(symbol))
+        c.drawText(text)
 
         # Random formulas
-        c.setFont("Helvetica", 18)
+        formulas = rng.choice(FORMULAS, FORMULA_SAMPLE_K, replace=False)
+        xs = rng.uniform(0.5 * inch, width - 3 * inch, len(formulas))
         y_pos = height - 2.5 * inch
-        for formula in random.sample(FORMULAS, min(5, len(FORMULAS))):
-            x = random.uniform(0.5 * inch, width - 3 * inch)
-            c.drawString(x, y_pos, formula)
+        text = c.beginText()
+        text.setFont("Helvetica", 18)
+        for x, formula in zip(xs, formulas):
+            text.setTextOrigin(x, y_pos)
+            text.textOut(str(formula))
             y_pos -= 0.8 * inch
+        c.drawText(text)
 
         # Draw some lines/arrows to simulate handwriting
         c.setLineWidth(2)
-        for _ in range(random.randint(3, 6)):
-            x1 = random.uniform(1 * inch, width - 2 * inch)
-            y1 = random.uniform(1 * inch, height - 3 * inch)
-            x2 = x1 + random.uniform(-1 * inch, 1 * inch)
-            y2 = y1 + random.uniform(-0.5 * inch, 0.5 * inch)
-            c.line(x1, y1, x2, y2)
+        n = int(rng.integers(3, 7))
+        x1s = rng.uniform(1 * inch, width - 2 * inch, n)
+        y1s = rng.uniform(1 * inch, height - 3 * inch, n)
+        dxs = rng.uniform(-1 * inch, 1 * inch, n)
+        dys = rng.uniform(-0.5 * inch, 0.5 * inch, n)
+        c.lines(list(zip(x1s, y1s, x1s + dxs, y1s + dys)))
 
         c.showPage()
 
     c.save()
 
 
-def generate_chart_pdf(output_path: Path, chart_type: str = "random") -> None:
-    """Generate a PDF with matplotlib charts."""
-
-    # Use xkcd style for hand-drawn look
+@lru_cache(maxsize=None)
+def _chart_figure() -> tuple[Figure, np.ndarray]:
+    """Build the 2x2 chart figure once; generate_chart_pdf redraws its axes."""
     with plt.xkcd():
         fig, axes = plt.subplots(2, 2, figsize=(8.5, 11))
         fig.suptitle(f"Charts & Graphs", fontsize=16)
+    return fig, axes
+
 
+def generate_chart_pdf(
+    output_path: Path,
+    chart_type: str = "random",
+    rng: np.random.Generator = _RNG,
+) -> None:
+    """Generate a PDF with matplotlib charts."""
+    fig, axes = _chart_figure()
+    for ax in axes.flat:
+        ax.cla()
+
+    # Use xkcd style for hand-drawn look
+    with plt.xkcd():
         # Sine wave
         ax = axes[0, 0]
-        x = np.linspace(0, 4 * np.pi, 100)
-        ax.plot(x, np.sin(x), linewidth=2)
+        ax.plot(_X_SINE, _SIN_SINE, linewidth=2)
         ax.set_title("Sine Wave")
         ax.set_xlabel("x")
         ax.set_ylabel("sin(x)")
@@ -96,14 +145,14 @@ def generate_chart_pdf(output_path: Path, chart_type: str = "random") -> None:
         # Bar chart
         ax = axes[0, 1]
         categories = ["A", "B", "C", "D", "E"]
-        values = np.random.randint(1, 10, 5)
+        values = rng.integers(1, 10, 5)
         ax.bar(categories, values)
         ax.set_title("Bar Chart")
 
         # Scatter plot
         ax = axes[1, 0]
-        x = np.random.randn(30)
-        y = x + np.random.randn(30) * 0.5
+        x = rng.standard_normal(30)
+        y = rng.normal(loc=x, scale=0.5)
         ax.scatter(x, y)
         ax.set_title("Scatter Plot")
         ax.set_xlabel("x")
@@ -111,16 +160,15 @@ def generate_chart_pdf(output_path: Path, chart_type: str = "random") -> None:
 
         # Line plot with multiple series
         ax = axes[1, 1]
-        x = np.linspace(0, 10, 50)
+        x = _X_LINES
         ax.plot(x, x**2, label="x²")
         ax.plot(x, x**1.5, label="x^1.5")
         ax.plot(x, x, label="x")
         ax.legend()
         ax.set_title("Comparison")
 
-        plt.tight_layout()
-        plt.savefig(str(output_path), format="pdf", dpi=150)
-        plt.close()
+        fig.tight_layout()
+        fig.savefig(str(output_path), format="pdf", dpi=72, backend="pdf")
 
 
 def generate_geometry_pdf(output_path: Path) -> None:
@@ -148,17 +196,17 @@ def generate_geometry_pdf(output_path: Path) -> None:
         h = random.uniform(0.5 * inch, 1.5 * inch)
         c.rect(x, y, w, h)
 
-    # Draw triangles (as paths)
+    # Draw triangles (one path, one subpath per triangle)
+    path = c.beginPath()
     for _ in range(3):
         x = random.uniform(2 * inch, width - 2 * inch)
         y = random.uniform(2 * inch, height - 3 * inch)
         size = random.uniform(0.5 * inch, 1 * inch)
-        path = c.beginPath()
         path.moveTo(x, y)
         path.lineTo(x + size, y)
         path.lineTo(x + size/2, y + size)
         path.close()
-        c.drawPath(path)
+    c.drawPath(path)
 
     c.showPage()
 
@@ -177,15 +225,19 @@ def generate_geometry_pdf(output_path: Path) -> None:
     c.drawString(center_x + 0.1 * inch, height - 1.8 * inch, "y")
 
     # Plot some points with labels
-    c.setFont("Helvetica", 12)
     points = [
         (center_x + 1 * inch, center_y + 1 * inch, "(1,1)"),
         (center_x - 1.5 * inch, center_y + 0.8 * inch, "(-1.5,0.8)"),
         (center_x + 0.5 * inch, center_y - 1.2 * inch, "(0.5,-1.2)"),
     ]
-    for px, py, label in points:
+    for px, py, _ in points:
         c.circle(px, py, 4, fill=1)
-        c.drawString(px + 5, py + 5, label)
+    text = c.beginText()
+    text.setFont("Helvetica", 12)
+    for px, py, label in points:
+        text.setTextOrigin(px + 5, py + 5)
+        text.textOut(label)
+    c.drawText(text)
 
     c.showPage()
     c.save()
@@ -198,9 +250,8 @@ def generate_calculus_pdf(output_path: Path) -> None:
 
         # Function and its derivative
         ax1 = fig.add_subplot(2, 2, 1)
-        x = np.linspace(-2, 2, 100)
-        ax1.plot(x, x**3, label="f(x) = x³", linewidth=2)
-        ax1.plot(x, 3*x**2, label="f'(x) = 3x²", linewidth=2, linestyle="--")
+        ax1.plot(_X_CUBIC, _CUBE, label="f(x) = x³", linewidth=2)
+        ax1.plot(_X_CUBIC, _DERIV, label="f'(x) = 3x²", linewidth=2, linestyle="--")
         ax1.legend()
         ax1.set_title("Function & Derivative")
         ax1.axhline(y=0, color='k', linewidth=0.5)
@@ -208,15 +259,13 @@ def generate_calculus_pdf(output_path: Path) -> None:
 
         # Area under curve (integral visualization)
         ax2 = fig.add_subplot(2, 2, 2)
-        x = np.linspace(0, 3, 100)
-        y = np.sin(x) + 1
-        ax2.plot(x, y, linewidth=2)
-        ax2.fill_between(x, y, alpha=0.3)
+        ax2.plot(_X_AREA, _Y_AREA, linewidth=2)
+        ax2.fill_between(_X_AREA, _Y_AREA, alpha=0.3)
         ax2.set_title("∫ sin(x)+1 dx")
 
         # Tangent line
         ax3 = fig.add_subplot(2, 2, 3)
-        x = np.linspace(-1, 3, 100)
+        x = _X_TANGENT
         ax3.plot(x, x**2, label="f(x) = x²", linewidth=2)
         # Tangent at x=1
         x_t = 1
@@ -230,25 +279,24 @@ def generate_calculus_pdf(output_path: Path) -> None:
 
         # Limit visualization
         ax4 = fig.add_subplot(2, 2, 4)
-        x = np.linspace(0.01, 2, 100)
-        ax4.plot(x, np.sin(x)/x, linewidth=2)
+        ax4.plot(_X_SIN_X, _SINC, linewidth=2)
         ax4.axhline(y=1, color='r', linestyle='--', alpha=0.5)
         ax4.set_title("lim(x→0) sin(x)/x = 1")
         ax4.set_xlabel("x")
 
         plt.tight_layout()
-        plt.savefig(str(output_path), format="pdf", dpi=150)
+        plt.savefig(str(output_path), format="pdf", dpi=72, backend="pdf")
         plt.close()
 
 
-def generate_statistics_pdf(output_path: Path) -> None:
+def generate_statistics_pdf(output_path: Path, rng: np.random.Generator = _RNG) -> None:
     """Generate a PDF with statistics-related charts."""
     with plt.xkcd():
         fig = plt.figure(figsize=(8.5, 11))
 
         # Histogram / Normal distribution
         ax1 = fig.add_subplot(2, 2, 1)
-        data = np.random.randn(1000)
+        data = rng.standard_normal(1000)
         ax1.hist(data, bins=30, edgecolor='black', alpha=0.7)
         ax1.set_title("Normal Distribution")
         ax1.set_xlabel("Value")
@@ -256,7 +304,7 @@ def generate_statistics_pdf(output_path: Path) -> None:
 
         # Box plot
         ax2 = fig.add_subplot(2, 2, 2)
-        data = [np.random.randn(50) + i for i in range(4)]
+        data = list(rng.normal(loc=np.arange(4)[:, None], size=(4, 50)))
         ax2.boxplot(data, labels=["A", "B", "C", "D"])
         ax2.set_title("Box Plot Comparison")
 
@@ -269,8 +317,8 @@ def generate_statistics_pdf(output_path: Path) -> None:
 
         # Correlation scatter
         ax4 = fig.add_subplot(2, 2, 4)
-        x = np.random.randn(50)
-        y = 2*x + np.random.randn(50)*0.5
+        x = rng.standard_normal(50)
+        y = rng.normal(loc=2*x, scale=0.5)
         ax4.scatter(x, y, alpha=0.7)
         z = np.polyfit(x, y, 1)
         p = np.poly1d(z)
@@ -280,10 +328,29 @@ def generate_statistics_pdf(output_path: Path) -> None:
         ax4.set_ylabel("y")
 
         plt.tight_layout()
-        plt.savefig(str(output_path), format="pdf", dpi=150)
+        plt.savefig(str(output_path), format="pdf", dpi=72, backend="pdf")
         plt.close()
 
 
+def _init_matplotlib() -> None:
+    """Configure matplotlib in each worker process before it draws anything."""
+    matplotlib.use("Agg")
+    # Charts are only ever saved as vector PDFs; decimate near-colinear path points
+    matplotlib.rcParams["path.simplify"] = True
+    matplotlib.rcParams["path.simplify_threshold"] = 1.0
+
+
+def _run_job(job: tuple[Callable[..., None], Path, dict[str, Any], int | None]) -> Path:
+    """Run one generator in a worker process with its own seeded RNG state."""
+    fn, path, kwargs, seed = job
+    # A None seed reseeds from OS entropy so forked workers don't share state
+    random.seed(seed)
+    if fn in (generate_math_pdf, generate_chart_pdf, generate_statistics_pdf):
+        kwargs = {**kwargs, "rng": np.random.default_rng(seed)}
+    fn(path, **kwargs)
+    return path
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Generate test PDFs for DoodleDoc")
     parser.add_argument("--output", "-o", type=Path, default=Path("test_pdfs"),
@@ -292,41 +359,36 @@ def main() -> None:
                         help="Random seed for reproducibility")
     args = parser.parse_args()
 
-    if args.seed is not None:
-        random.seed(args.seed)
-        np.random.seed(args.seed)
-
     # Create output directory
     args.output.mkdir(parents=True, exist_ok=True)
 
     print(f"Generating test PDFs in {args.output}/...")
 
-    # Generate math symbol PDFs
-    for i in range(5):
-        path = args.output / f"math_symbols_{i+1}.pdf"
-        generate_math_pdf(path, num_pages=random.randint(2, 5))
-        print(f"  Created: {path}")
-
-    # Generate chart PDFs
-    for i in range(3):
-        path = args.output / f"charts_{i+1}.pdf"
-        generate_chart_pdf(path)
-        print(f"  Created: {path}")
-
-    # Generate geometry PDF
-    path = args.output / "geometry.pdf"
-    generate_geometry_pdf(path)
-    print(f"  Created: {path}")
-
-    # Generate calculus PDF
-    path = args.output / "calculus.pdf"
-    generate_calculus_pdf(path)
-    print(f"  Created: {path}")
-
-    # Generate statistics PDF
-    path = args.output / "statistics.pdf"
-    generate_statistics_pdf(path)
-    print(f"  Created: {path}")
+    if args.seed is not None:
+        random.seed(args.seed)
+    jobs: list[tuple[Callable[..., None], Path, dict[str, Any]]] = [
+        *(
+            (generate_math_pdf, args.output / f"math_symbols_{i+1}.pdf",
+             {"num_pages": random.randint(2, 5)})
+            for i in range(5)
+        ),
+        *((generate_chart_pdf, args.output / f"charts_{i+1}.pdf", {}) for i in range(3)),
+        (generate_geometry_pdf, args.output / "geometry.pdf", {}),
+        (generate_calculus_pdf, args.output / "calculus.pdf", {}),
+        (generate_statistics_pdf, args.output / "statistics.pdf", {}),
+    ]
+    # Each job gets its own seed (base seed + job index) so --seed reproduces
+    # the same corpus regardless of which worker process picks the job up.
+    seeded_jobs = [
+        (fn, path, kwargs, None if args.seed is None else args.seed + i)
+        for i, (fn, path, kwargs) in enumerate(jobs)
+    ]
+
+    with ProcessPoolExecutor(
+        max_workers=os.cpu_count(), initializer=_init_matplotlib
+    ) as pool:
+        for path in pool.map(_run_job, seeded_jobs):
+            print(f"  Created: {path}")
 
     total = len(list(args.output.glob("*.pdf")))
     print(f"\nDone! Generated {total} test PDFs in {args.output}/")
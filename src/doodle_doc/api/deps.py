@@ -1,8 +1,10 @@
 from __future__ import annotations
 
+import threading
 from functools import lru_cache
 from typing import TYPE_CHECKING
 
+from doodle_doc.api.schemas import HealthResponse
 from doodle_doc.core.config import Settings, get_settings
 from doodle_doc.core.database import Database
 from doodle_doc.ingestion.embed import SigLIP2Embedder
@@ -24,51 +26,84 @@ class AppState:
         self._db: Database | None = None
         self._search_service: SearchService | None = None
         self._reranker: ColQwen2Reranker | None = None
+        self._health_cache: tuple[float, HealthResponse] | None = None
+        # Per-resource locks so concurrent first requests build each resource once
+        # without a slow model load blocking access to the others
+        self._locks = {
+            name: threading.Lock()
+            for name in ("settings", "embedder", "index", "db", "search_service", "reranker")
+        }
 
     @property
     def settings(self) -> Settings:
         if self._settings is None:
-            self._settings = get_settings()
+            with self._locks["settings"]:
+                if self._settings is None:
+                    self._settings = get_settings()
         return self._settings
 
     @property
     def embedder(self) -> SigLIP2Embedder:
         if self._embedder is None:
-            self._embedder = SigLIP2Embedder(model_name=self.settings.siglip_model)
+            with self._locks["embedder"]:
+                if self._embedder is None:
+                    self._embedder = SigLIP2Embedder(model_name=self.settings.siglip_model)
         return self._embedder
 
     @property
     def index(self) -> FAISSIndex:
         if self._index is None:
-            index_path = self.settings.index_dir
-            if (index_path / "faiss.index").exists():
-                self._index = FAISSIndex.load(index_path)
-            else:
-                self._index = FAISSIndex(self.settings.embedding_dim)
+            with self._locks["index"]:
+                if self._index is None:
+                    index_path = self.settings.index_dir
+                    if (index_path / "faiss.index").exists():
+                        self._index = FAISSIndex.load(index_path)
+                        self._index.set_ef_search(self.settings.faiss_hnsw_ef_search)
+                    else:
+                        self._index = FAISSIndex(
+                            self.settings.embedding_dim, self.settings.faiss_index_type
+                        )
+                    if self.settings.use_gpu_faiss:
+                        self._index.use_gpu()
         return self._index
 
     @property
     def db(self) -> Database:
         if self._db is None:
-            self._db = Database(self.settings.index_dir / "metadata.sqlite")
+            with self._locks["db"]:
+                if self._db is None:
+                    self._db = Database(self.settings.index_dir / "metadata.sqlite")
         return self._db
 
     @property
     def search_service(self) -> SearchService:
         if self._search_service is None:
-            self._search_service = SearchService(
-                settings=self.settings,
-                embedder=self._embedder,
-                index=self._index,
-            )
+            with self._locks["search_service"]:
+                if self._search_service is None:
+                    self._search_service = SearchService(
+                        settings=self.settings,
+                        embedder=self._embedder,
+                        index=self._index,
+                    )
         return self._search_service
 
     @property
     def reranker(self) -> ColQwen2Reranker:
         if self._reranker is None:
-            self._reranker = ColQwen2Reranker(model_name=self.settings.colqwen_model)
+            with self._locks["reranker"]:
+                if self._reranker is None:
+                    self._reranker = ColQwen2Reranker(model_name=self.settings.colqwen_model)
         return self._reranker
 
+    def preload(self) -> None:
+        """Load and warm up SigLIP2 and load the FAISS index and SQLite now.
+
+        The ColQwen2 reranker stays lazy.
+        """
+        self.embedder.warmup()
+        _ = self.index
+        _ = self.db
+
     def is_embedder_loaded(self) -> bool:
         return self._embedder is not None
 
@@ -1,6 +1,9 @@
 from __future__ import annotations
 
+import asyncio
 import os
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 
 # Fix OpenMP duplicate library error on macOS
 # Must be set before importing torch, faiss, or opencv
@@ -8,7 +11,9 @@ os.environ["KMP_DUPLICATE_LIB_OK"] = "TRUE"
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 
+from doodle_doc.api.deps import get_app_state
 from doodle_doc.api.routes import (
     health_router,
     ingest_router,
@@ -17,11 +22,21 @@ from doodle_doc.api.routes import (
 )
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    # Load and warm up SigLIP2, load the FAISS index and SQLite before serving
+    # so the first search doesn't pay for it. The ColQwen2 reranker stays lazy.
+    await asyncio.get_running_loop().run_in_executor(None, get_app_state().preload)
+    yield
+
+
 def create_app() -> FastAPI:
     app = FastAPI(
         title="DoodleDoc API",
         description="Sketch-based search for handwritten PDF notes",
         version="0.1.0",
+        lifespan=lifespan,
+        default_response_class=ORJSONResponse,
     )
 
     app.add_middleware(
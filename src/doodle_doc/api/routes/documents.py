@@ -1,12 +1,14 @@
 from __future__ import annotations
 
-import hashlib
+import os
 import shutil
+from functools import lru_cache
 from pathlib import Path
 
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import FileResponse, JSONResponse, Response
 from pydantic import BaseModel
+from starlette.types import Message, Receive, Scope, Send
 
 from doodle_doc.api.deps import AppState, get_app_state
 
@@ -17,6 +19,59 @@ class DocumentIdsRequest(BaseModel):
     doc_ids: list[str]
 
 
+@lru_cache(maxsize=256)
+def _cached_stat(path: Path) -> os.stat_result:
+    """Stat a page image once. Misses raise, so only existing files are cached.
+
+    Images for a doc_id never change, so entries only go stale when a
+    document is removed, reindexed or ingested again, which clears the
+    cache. Deletes by another process are caught by _PageFileResponse.
+    """
+    return path.stat()
+
+
+def clear_page_stat_cache() -> None:
+    _cached_stat.cache_clear()
+
+
+def _stat_or_none(path: Path) -> os.stat_result | None:
+    try:
+        return _cached_stat(path)
+    except FileNotFoundError:
+        return None
+
+
+class _PageFileResponse(FileResponse):
+    """FileResponse that turns into a 404 if the file is gone when it is opened.
+
+    A cached stat can outlive a file deleted outside this process (the CLI
+    or another worker). The response start is held back until the first
+    body chunk, so a failed open can still be answered with a 404.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        start: Message | None = None
+
+        async def send_after_open(message: Message) -> None:
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if start is not None:
+                await send(start)
+                start = None
+            await send(message)
+
+        try:
+            await super().__call__(scope, receive, send_after_open)
+        except FileNotFoundError:
+            clear_page_stat_cache()
+            if start is None:
+                raise
+            not_found = JSONResponse({"detail": "Page not found"}, status_code=404)
+            await not_found(scope, receive, send)
+
+
 @router.get("/doc/{doc_id}/page/{page_num}")
 def get_page(
     doc_id: str,
@@ -25,23 +80,49 @@ def get_page(
 ) -> FileResponse:
     """Get full page image for viewer."""
     image_path = state.settings.rendered_dir / doc_id / f"{page_num}.png"
-    if not image_path.exists():
+    st = _stat_or_none(image_path)
+    if st is None:
         raise HTTPException(status_code=404, detail="Page not found")
-    return FileResponse(image_path, media_type="image/png")
+    return _PageFileResponse(
+        image_path,
+        media_type="image/png",
+        stat_result=st,
+        headers={"Cache-Control": "public, max-age=3600"},
+    )
 
 
 @router.get("/thumb/{doc_id}/{page_num}")
 def get_thumbnail(
     doc_id: str,
     page_num: int,
+    if_none_match: str | None = Header(None),
     state: AppState = Depends(get_app_state),
-) -> FileResponse:
-    """Get page thumbnail (uses same image, browser will resize)."""
-    # TODO: Generate actual thumbnails at 300px width
-    image_path = state.settings.rendered_dir / doc_id / f"{page_num}.png"
-    if not image_path.exists():
-        raise HTTPException(status_code=404, detail="Page not found")
-    return FileResponse(image_path, media_type="image/png")
+) -> Response:
+    """Get page thumbnail generated at ingest time."""
+    image_path = state.settings.thumbnails_dir / doc_id / f"{page_num}.png"
+    st = _stat_or_none(image_path)
+    if st is None:
+        # Documents indexed before thumbnails existed only have the full render.
+        # A thumbnail may be generated later, so the fallback is cached briefly.
+        image_path = state.settings.rendered_dir / doc_id / f"{page_num}.png"
+        st = _stat_or_none(image_path)
+        if st is None:
+            raise HTTPException(status_code=404, detail="Page not found")
+        return _PageFileResponse(
+            image_path,
+            media_type="image/png",
+            stat_result=st,
+            headers={"Cache-Control": "public, max-age=3600"},
+        )
+
+    # doc_ids are regenerated on reindex, so a page's thumbnail never changes
+    etag = f'"{doc_id}-{page_num}"'
+    headers = {"Cache-Control": "public, max-age=31536000, immutable", "ETag": etag}
+    if if_none_match == etag:
+        return Response(status_code=304, headers=headers)
+    return _PageFileResponse(
+        image_path, media_type="image/png", stat_result=st, headers=headers
+    )
 
 
 @router.get("/documents")
@@ -49,17 +130,7 @@ def list_documents(
     state: AppState = Depends(get_app_state),
 ) -> list[dict]:
     """List all indexed documents."""
-    docs = state.db.get_all_documents()
-    return [
-        {
-            "doc_id": doc.doc_id,
-            "path": doc.path,
-            "name": Path(doc.path).name,
-            "num_pages": doc.num_pages,
-            "sha256": doc.sha256,
-        }
-        for doc in docs
-    ]
+    return state.db.list_document_summaries()
 
 
 @router.delete("/documents")
@@ -73,10 +144,12 @@ def remove_documents(
         state.db.delete_document(doc_id)
         # Remove from FAISS index
         state.index.remove_by_doc_id(doc_id)
-        # Remove rendered images
-        rendered_dir = state.settings.rendered_dir / doc_id
-        if rendered_dir.exists():
-            shutil.rmtree(rendered_dir)
+        # Remove rendered images and thumbnails
+        for image_dir in (state.settings.rendered_dir, state.settings.thumbnails_dir):
+            if (image_dir / doc_id).exists():
+                shutil.rmtree(image_dir / doc_id)
+
+    clear_page_stat_cache()
 
     # Save updated index
     state.index.save(state.settings.index_dir)
@@ -90,7 +163,7 @@ def reindex_documents(
     state: AppState = Depends(get_app_state),
 ) -> dict:
     """Re-index specific documents by their doc_ids."""
-    from doodle_doc.ingestion.discover import PDFFile
+    from doodle_doc.ingestion.discover import PDFFile, compute_sha256
     from doodle_doc.ingestion.pipeline import IndexingProgress, IngestionPipeline
 
     reindexed = 0
@@ -106,13 +179,19 @@ def reindex_documents(
         # Remove old data first
         state.db.delete_document(doc_id)
         state.index.remove_by_doc_id(doc_id)
-        rendered_dir = state.settings.rendered_dir / doc_id
-        if rendered_dir.exists():
-            shutil.rmtree(rendered_dir)
-
-        # Re-index the document
-        sha256 = hashlib.sha256(pdf_path.read_bytes()).hexdigest()
-        pdf_file = PDFFile(path=pdf_path, sha256=sha256, size_bytes=pdf_path.stat().st_size)
+        for image_dir in (state.settings.rendered_dir, state.settings.thumbnails_dir):
+            if (image_dir / doc_id).exists():
+                shutil.rmtree(image_dir / doc_id)
+
+        # Re-index the document, reusing the cached hash if the file is unchanged
+        st = pdf_path.stat()
+        sha256 = state.db.get_file_hash(doc.path, st.st_mtime_ns, st.st_size)
+        if sha256 is None:
+            sha256 = compute_sha256(pdf_path)
+            state.db.set_file_hash(doc.path, st.st_mtime_ns, st.st_size, sha256)
+        pdf_file = PDFFile(
+            path=pdf_path, sha256=sha256, size_bytes=st.st_size, mtime_ns=st.st_mtime_ns
+        )
 
         pipeline = IngestionPipeline(
             settings=state.settings,
@@ -126,5 +205,6 @@ def reindex_documents(
         pipeline._process_pdf(pdf_file, progress, None)
         reindexed += 1
 
+    clear_page_stat_cache()
     state.index.save(state.settings.index_dir)
     return {"reindexed": reindexed}
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import time
+
 from fastapi import APIRouter, Depends
 
 from doodle_doc.api.deps import AppState, get_app_state
@@ -8,29 +10,40 @@ from doodle_doc.api.schemas import HealthResponse, ModelLoadResponse
 router = APIRouter(prefix="/v1", tags=["health"])
 
 
+HEALTH_CACHE_TTL_S = 1.0
+
+
 @router.get("/health", response_model=HealthResponse)
 def get_health(state: AppState = Depends(get_app_state)) -> HealthResponse:
+    now = time.monotonic()
+    if state._health_cache and now - state._health_cache[0] < HEALTH_CACHE_TTL_S:
+        return state._health_cache[1]
+
     index_size_mb = 0.0
     index_path = state.settings.index_dir / "faiss.index"
     if index_path.exists():
         index_size_mb = index_path.stat().st_size / (1024 * 1024)
 
-    return HealthResponse(
+    response = HealthResponse(
         status="ok",
         siglip_loaded=state.is_embedder_loaded(),
         colqwen_loaded=state.is_reranker_loaded(),
         indexed_pages=state.index.size // 5 if state._index else 0,
         index_size_mb=round(index_size_mb, 2),
     )
+    state._health_cache = (now, response)
+    return response
 
 
 @router.post("/models/colqwen/load", response_model=ModelLoadResponse)
 def load_colqwen(state: AppState = Depends(get_app_state)) -> ModelLoadResponse:
     state.reranker.load()
+    state._health_cache = None
     return ModelLoadResponse(status="ok", message="ColQwen2 model loaded")
 
 
 @router.post("/models/colqwen/unload", response_model=ModelLoadResponse)
 def unload_colqwen(state: AppState = Depends(get_app_state)) -> ModelLoadResponse:
     state.reranker.unload()
+    state._health_cache = None
     return ModelLoadResponse(status="ok", message="ColQwen2 model unloaded")
@@ -1,19 +1,49 @@
 from __future__ import annotations
 
+import asyncio
 import threading
+import time
 import uuid
+from collections.abc import AsyncIterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
 
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 
 from doodle_doc.api.deps import AppState, get_app_state
+from doodle_doc.api.routes.documents import clear_page_stat_cache
 from doodle_doc.api.schemas import IngestRequest, IngestResponse, IngestStatusResponse
 from doodle_doc.ingestion.pipeline import IngestionPipeline, IndexingProgress
 
 router = APIRouter(prefix="/v1", tags=["ingest"])
 
-_jobs: dict[str, IndexingProgress] = {}
-_job_threads: dict[str, threading.Thread] = {}
+# Finished jobs are kept this long so clients can read their final status
+JOB_TTL_S = 3600.0
+# Upper bound on tracked jobs; the oldest finished jobs are dropped first
+MAX_TRACKED_JOBS = 1024
+
+
+@dataclass
+class IngestJob:
+    future: Future[None]
+    progress: IndexingProgress
+    finished_at: float | None = None
+    # Event-stream subscribers, woken from the indexing thread on each update
+    listeners: list[tuple[asyncio.AbstractEventLoop, asyncio.Event]] = field(
+        default_factory=list
+    )
+
+    def notify(self) -> None:
+        for loop, event in self.listeners:
+            loop.call_soon_threadsafe(event.set)
+
+
+# Indexing is GPU/IO heavy and shares model weights, so jobs run one at a time
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ingest")
+_jobs: dict[str, IngestJob] = {}
+_jobs_lock = threading.Lock()
 
 
 def _run_indexing(
@@ -23,7 +53,10 @@ def _run_indexing(
     state: AppState,
 ) -> None:
     def on_progress(progress: IndexingProgress) -> None:
-        _jobs[job_id] = progress
+        with _jobs_lock:
+            job = _jobs[job_id]
+            job.progress = progress
+            job.notify()
 
     pipeline = IngestionPipeline(
         settings=state.settings,
@@ -32,6 +65,35 @@ def _run_indexing(
     pipeline.run(root_path, on_progress=on_progress, force_reindex=force_reindex)
 
 
+def _on_job_done(job_id: str, future: Future[None]) -> None:
+    # Ingestion may have rewritten page images for existing doc_ids
+    clear_page_stat_cache()
+    with _jobs_lock:
+        job = _jobs[job_id]
+        job.finished_at = time.monotonic()
+        if future.exception() is not None:
+            job.progress.status = "failed"
+        job.notify()
+
+
+def _evict_finished_jobs() -> None:
+    """Drop finished jobs past JOB_TTL_S or over MAX_TRACKED_JOBS.
+
+    Running and queued jobs are never evicted. Caller holds _jobs_lock.
+    """
+    finished = sorted(
+        (job.finished_at, job_id)
+        for job_id, job in _jobs.items()
+        if job.finished_at is not None
+    )
+    cutoff = time.monotonic() - JOB_TTL_S
+    overflow = len(_jobs) - MAX_TRACKED_JOBS
+    for i, (finished_at, job_id) in enumerate(finished):
+        if finished_at >= cutoff and i >= overflow:
+            break
+        del _jobs[job_id]
+
+
 @router.post("/ingest", response_model=IngestResponse)
 def start_ingest(
     request: IngestRequest,
@@ -42,26 +104,18 @@ def start_ingest(
         raise HTTPException(status_code=400, detail=f"Path does not exist: {root_path}")
 
     job_id = str(uuid.uuid4())
-    _jobs[job_id] = IndexingProgress(status="starting")
-
-    thread = threading.Thread(
-        target=_run_indexing,
-        args=(job_id, root_path, request.force_reindex, state),
-        daemon=True,
-    )
-    _job_threads[job_id] = thread
-    thread.start()
+    with _jobs_lock:
+        _evict_finished_jobs()
+        future = _executor.submit(
+            _run_indexing, job_id, root_path, request.force_reindex, state
+        )
+        _jobs[job_id] = IngestJob(future=future, progress=IndexingProgress(status="starting"))
+    future.add_done_callback(lambda f: _on_job_done(job_id, f))
 
     return IngestResponse(job_id=job_id, status="started")
 
 
-@router.get("/ingest/{job_id}", response_model=IngestStatusResponse)
-def get_ingest_status(job_id: str) -> IngestStatusResponse:
-    if job_id not in _jobs:
-        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
-
-    progress = _jobs[job_id]
-
+def _status_response(progress: IndexingProgress) -> IngestStatusResponse:
     eta = None
     if progress.pages_done > 0 and progress.pages_total > progress.pages_done:
         # Rough estimate based on progress
@@ -76,3 +130,44 @@ def get_ingest_status(job_id: str) -> IngestStatusResponse:
         pages_total=progress.pages_total,
         eta_seconds=eta,
     )
+
+
+@router.get("/ingest/{job_id}", response_model=IngestStatusResponse)
+def get_ingest_status(job_id: str) -> IngestStatusResponse:
+    with _jobs_lock:
+        _evict_finished_jobs()
+        job = _jobs.get(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+        progress = job.progress
+
+    return _status_response(progress)
+
+
+@router.get("/ingest/{job_id}/events")
+async def stream_ingest_status(job_id: str) -> StreamingResponse:
+    """Server-sent events stream of job progress; ends once the job finishes."""
+    event = asyncio.Event()
+    listener = (asyncio.get_running_loop(), event)
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+        job.listeners.append(listener)
+
+    async def events() -> AsyncIterator[str]:
+        try:
+            while True:
+                with _jobs_lock:
+                    status = _status_response(job.progress)
+                    finished = job.finished_at is not None
+                yield f"data: {status.model_dump_json()}\n\n"
+                if finished:
+                    return
+                await event.wait()
+                event.clear()
+        finally:
+            with _jobs_lock:
+                job.listeners.remove(listener)
+
+    return StreamingResponse(events(), media_type="text/event-stream")
@@ -1,8 +1,9 @@
 from __future__ import annotations
 
+import asyncio
 import time
-from io import BytesIO
-from typing import Literal
+from functools import partial
+from typing import BinaryIO, Literal
 
 from fastapi import APIRouter, Depends, File, Form, UploadFile
 from PIL import Image
@@ -13,6 +14,12 @@ from doodle_doc.api.schemas import SearchResponse, SearchResultItem
 router = APIRouter(prefix="/v1", tags=["search"])
 
 
+def _decode_sketch(file: BinaryIO) -> Image.Image:
+    img = Image.open(file)
+    img.load()
+    return img
+
+
 @router.post("/search", response_model=SearchResponse)
 async def search(
     sketch_image: UploadFile = File(...),
@@ -23,16 +30,22 @@ async def search(
     state: AppState = Depends(get_app_state),
 ) -> SearchResponse:
     start_time = time.time()
+    loop = asyncio.get_running_loop()
 
-    image_bytes = await sketch_image.read()
-    img = Image.open(BytesIO(image_bytes))
+    # Decoding and searching are CPU/GPU bound, so keep them off the event loop.
+    # The upload is already spooled to a seekable file, so decode it in place.
+    img = await loop.run_in_executor(None, _decode_sketch, sketch_image.file)
 
-    results = state.search_service.search(
-        sketch_image=img,
-        text_query=text_query,
-        top_k=top_k,
-        search_mode=search_mode,
-        use_rerank=use_rerank,
+    results = await loop.run_in_executor(
+        None,
+        partial(
+            state.search_service.search,
+            sketch_image=img,
+            text_query=text_query,
+            top_k=top_k,
+            search_mode=search_mode,
+            use_rerank=use_rerank,
+        ),
     )
 
     query_time_ms = int((time.time() - start_time) * 1000)
@@ -6,16 +6,41 @@ os.environ["KMP_DUPLICATE_LIB_OK"] = "TRUE"
 
 import argparse
 import sys
+import time
 from pathlib import Path
+from typing import TYPE_CHECKING, Callable
 
 from doodle_doc.core.config import get_settings, load_settings_from_yaml
-from doodle_doc.ingestion.pipeline import IngestionPipeline, IndexingProgress
-from doodle_doc.eval.runner import EvalRunner
 
+if TYPE_CHECKING:
+    from doodle_doc.ingestion.pipeline import IndexingProgress
+
+
+class ProgressPrinter:
+    """Progress callback that redraws on a new whole percent or status, or every 100ms."""
+
+    def __init__(self, min_interval_s: float = 0.1) -> None:
+        self.min_interval_s = min_interval_s
+        self._last_pct = -1
+        self._last_status = ""
+        self._last_time = 0.0
+
+    def __call__(self, progress: IndexingProgress) -> None:
+        if progress.pages_total <= 0:
+            return
 
-def print_progress(progress: IndexingProgress) -> None:
-    if progress.pages_total > 0:
         pct = (progress.pages_done / progress.pages_total) * 100
+        now = time.monotonic()
+        if (
+            int(pct) == self._last_pct
+            and progress.status == self._last_status
+            and now - self._last_time < self.min_interval_s
+        ):
+            return
+
+        self._last_pct = int(pct)
+        self._last_status = progress.status
+        self._last_time = now
         print(
             f"\r[{progress.status}] {progress.current_doc}: "
             f"{progress.pages_done}/{progress.pages_total} pages ({pct:.1f}%)",
@@ -25,6 +50,8 @@ def print_progress(progress: IndexingProgress) -> None:
 
 
 def cmd_index(args: argparse.Namespace) -> int:
+    from doodle_doc.ingestion.pipeline import IngestionPipeline
+
     root = Path(args.path)
     if not root.exists():
         print(f"Error: Path does not exist: {root}", file=sys.stderr)
@@ -39,10 +66,10 @@ def cmd_index(args: argparse.Namespace) -> int:
     print(f"Indexing PDFs from: {root}")
     print(f"Data directory: {settings.data_dir}")
 
-    pipeline = IngestionPipeline(settings)
+    pipeline = IngestionPipeline(settings, workers=args.workers)
     progress = pipeline.run(
         root,
-        on_progress=print_progress,
+        on_progress=ProgressPrinter(),
         force_reindex=args.force,
     )
 
@@ -57,12 +84,16 @@ def cmd_serve(args: argparse.Namespace) -> int:
     host = args.host or "127.0.0.1"
     port = args.port or 8000
 
+    # uvicorn only supports a single worker with hot reload.
+    workers = 1 if args.reload else args.workers
+
     print(f"Starting DoodleDoc API at http://{host}:{port}")
     uvicorn.run(
         "doodle_doc.api.main:app",
         host=host,
         port=port,
         reload=args.reload,
+        workers=workers,
     )
     return 0
 
@@ -74,6 +105,7 @@ def cmd_synth_generate(args: argparse.Namespace) -> int:
         output_dir=Path(args.output),
         num_pairs=args.num_pairs,
         seed=args.seed,
+        concurrency=args.concurrency,
     )
 
     print(f"Generating {config.num_pairs} page/doodle pairs to {config.output_dir}...")
@@ -134,6 +166,8 @@ def cmd_eval_synth(args: argparse.Namespace) -> int:
 
 
 def cmd_eval(args: argparse.Namespace) -> int:
+    from doodle_doc.eval.runner import EvalRunner
+
     settings = get_settings()
     if args.config:
         settings = load_settings_from_yaml(Path(args.config))
@@ -147,6 +181,7 @@ def cmd_eval(args: argparse.Namespace) -> int:
         num_queries=args.num_queries,
         seed=args.seed,
         regenerate=args.regenerate,
+        workers=args.workers,
     )
 
     results = runner.run(modes=modes)
@@ -180,6 +215,17 @@ def cmd_eval(args: argparse.Namespace) -> int:
     return 0
 
 
+# Each command imports its own heavy dependencies when it runs
+COMMANDS: dict[str, Callable[[argparse.Namespace], int]] = {
+    "index": cmd_index,
+    "serve": cmd_serve,
+    "eval": cmd_eval,
+    "synth-generate": cmd_synth_generate,
+    "synth-index": cmd_synth_index,
+    "eval-synth": cmd_eval_synth,
+}
+
+
 def main() -> int:
     parser = argparse.ArgumentParser(
         prog="doodle-doc",
@@ -191,11 +237,25 @@ def main() -> int:
     index_parser.add_argument("path", help="Path to folder containing PDFs")
     index_parser.add_argument("--config", "-c", help="Path to config YAML file")
     index_parser.add_argument("--force", "-f", action="store_true", help="Force reindex")
+    index_parser.add_argument(
+        "--workers",
+        "-w",
+        type=int,
+        default=max(1, (os.cpu_count() or 2) - 1),
+        help="Threads for writing page images and preprocessing",
+    )
 
     serve_parser = subparsers.add_parser("serve", help="Start the API server")
     serve_parser.add_argument("--host", help="Host to bind to")
     serve_parser.add_argument("--port", "-p", type=int, help="Port to bind to")
     serve_parser.add_argument("--reload", "-r", action="store_true", help="Enable hot reload")
+    serve_parser.add_argument(
+        "--workers",
+        "-w",
+        type=int,
+        default=1,
+        help="Number of worker processes (each loads its own models)",
+    )
 
     eval_parser = subparsers.add_parser("eval", help="Run crop-based evaluation")
     eval_parser.add_argument("--config", "-c", help="Path to config YAML file")
@@ -206,11 +266,22 @@ def main() -> int:
     eval_parser.add_argument("--save-baseline", action="store_true", help="Save results as baseline")
     eval_parser.add_argument("--check-regression", action="store_true", help="Check against baseline")
     eval_parser.add_argument("--regression-threshold", type=float, default=0.05)
+    eval_parser.add_argument(
+        "--workers",
+        "-w",
+        type=int,
+        default=1,
+        help=(
+            "Concurrent queries; their FAISS searches are batched into one call "
+            "(above 1, latency includes contention)"
+        ),
+    )
 
     synth_gen_parser = subparsers.add_parser("synth-generate", help="Generate synthetic dataset")
     synth_gen_parser.add_argument("--output", "-o", default="data/synth", help="Output directory")
     synth_gen_parser.add_argument("--num-pairs", "-n", type=int, default=25, help="Number of pairs")
     synth_gen_parser.add_argument("--seed", "-s", type=int, default=42, help="Random seed")
+    synth_gen_parser.add_argument("--concurrency", "-j", type=int, default=4, help="Pairs generated at once")
 
     synth_index_parser = subparsers.add_parser("synth-index", help="Index synthetic pages")
     synth_index_parser.add_argument("synth_dir", help="Path to synthetic dataset")
@@ -222,21 +293,7 @@ def main() -> int:
     eval_synth_parser.add_argument("--top-k", "-k", type=int, default=20)
 
     args = parser.parse_args()
-
-    if args.command == "index":
-        return cmd_index(args)
-    elif args.command == "serve":
-        return cmd_serve(args)
-    elif args.command == "eval":
-        return cmd_eval(args)
-    elif args.command == "synth-generate":
-        return cmd_synth_generate(args)
-    elif args.command == "synth-index":
-        return cmd_synth_index(args)
-    elif args.command == "eval-synth":
-        return cmd_eval_synth(args)
-
-    return 0
+    return COMMANDS[args.command](args)
 
 
 if __name__ == "__main__":
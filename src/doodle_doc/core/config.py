@@ -1,18 +1,32 @@
 from __future__ import annotations
 
-from functools import lru_cache
+from functools import cached_property, lru_cache
 from pathlib import Path
-from typing import Literal
+from typing import Any, Literal
 
 import yaml
 from pydantic import Field
 from pydantic_settings import BaseSettings
 
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader as _YamlLoader  # type: ignore[assignment]
+
+
+# IndexScalarQuantizerFP16 stores vectors as float16, halving index memory;
+# IndexHNSWFlat trades exactness for sub-linear search on large corpora;
+# IndexHNSWSQFP16 is the HNSW graph over float16 vectors
+FAISSIndexType = Literal[
+    "IndexFlatIP", "IndexScalarQuantizerFP16", "IndexHNSWFlat", "IndexHNSWSQFP16"
+]
+
 
 class Settings(BaseSettings):
     # Rendering
     render_dpi: int = 150
     max_pages_per_doc: int = 500
+    thumbnail_width: int = 300
 
     # Preprocessing
     clahe_clip_limit: float = 2.0
@@ -26,6 +40,8 @@ class Settings(BaseSettings):
     # Retrieval
     stage1_top_k: int = 100
     default_result_k: int = 20
+    # Query embeddings kept for repeated identical sketches (0 disables)
+    query_cache_size: int = 512
 
     # Reranking (deprecated, kept for backward compat)
     colqwen_model: str = "vidore/colqwen2-v1.0-hf"
@@ -41,7 +57,14 @@ class Settings(BaseSettings):
     text_boost_weight: float = 0.3
 
     # Index
-    faiss_index_type: Literal["IndexFlatIP"] = "IndexFlatIP"
+    faiss_index_type: FAISSIndexType = "IndexFlatIP"
+    # A flat or fp16 index is rebuilt as HNSW (keeping its vector precision) after
+    # indexing once it holds more vectors (0 disables)
+    faiss_hnsw_threshold: int = 50_000
+    # HNSW candidate list size at query time: higher trades latency for recall
+    faiss_hnsw_ef_search: int = 16
+    # Mirror the index onto the first GPU for search when faiss was built with GPU support
+    use_gpu_faiss: bool = False
 
     # Evaluation
     eval_num_queries: int = 100
@@ -54,28 +77,43 @@ class Settings(BaseSettings):
     data_dir: Path = Field(default_factory=lambda: Path("data"))
     config_path: Path | None = None
 
-    model_config = {"env_prefix": "DOODLE_DOC_"}
+    # Frozen so derived paths can be cached and instances shared across threads
+    model_config = {"env_prefix": "DOODLE_DOC_", "frozen": True}
 
-    @property
+    @cached_property
     def rendered_dir(self) -> Path:
         return self.data_dir / "rendered"
 
-    @property
+    @cached_property
     def index_dir(self) -> Path:
         return self.data_dir / "index"
 
-    @property
+    @cached_property
     def thumbnails_dir(self) -> Path:
         return self.data_dir / "thumbnails"
 
-    @property
+    @cached_property
     def colqwen_index_dir(self) -> Path:
         return self.index_dir / "colqwen"
 
 
+# Parsed YAML keyed by (resolved path, mtime_ns, size); edits invalidate naturally
+_yaml_cache: dict[tuple[str, int, int], dict[str, Any]] = {}
+
+
+def _load_yaml(path: Path) -> dict[str, Any]:
+    st = path.stat()
+    key = (str(path.resolve()), st.st_mtime_ns, st.st_size)
+    data = _yaml_cache.get(key)
+    if data is None:
+        with open(path) as f:
+            data = yaml.load(f, Loader=_YamlLoader) or {}
+        _yaml_cache[key] = data
+    return data
+
+
 def load_settings_from_yaml(path: Path) -> Settings:
-    with open(path) as f:
-        data = yaml.safe_load(f)
+    data = _load_yaml(path)
     return Settings(**data, config_path=path)
 
 
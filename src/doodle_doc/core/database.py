@@ -1,10 +1,23 @@
 from __future__ import annotations
 
+from collections.abc import Iterable
 from datetime import datetime
 from pathlib import Path
-from typing import TYPE_CHECKING
-
-from sqlalchemy import String, Integer, DateTime, Text, create_engine
+from typing import TYPE_CHECKING, Any
+
+from sqlalchemy import (
+    DateTime,
+    Index,
+    Integer,
+    String,
+    Text,
+    create_engine,
+    event,
+    func,
+    inspect,
+    select,
+    text,
+)
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, sessionmaker
 
 if TYPE_CHECKING:
@@ -27,20 +40,57 @@ class DocumentModel(Base):
 
 class PageModel(Base):
     __tablename__ = "pages"
+    # Serves both the doc_id filter and the page_num ordering of page lookups
+    __table_args__ = (Index("ix_pages_doc_id_page_num", "doc_id", "page_num"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    doc_id: Mapped[str] = mapped_column(String(36), index=True)
+    doc_id: Mapped[str] = mapped_column(String(36))
     page_num: Mapped[int] = mapped_column(Integer)
     width_px: Mapped[int] = mapped_column(Integer)
     height_px: Mapped[int] = mapped_column(Integer)
     text_layer: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # SHA256 of the rendered pixels; lets reindexing reuse unchanged pages' embeddings
+    pixel_sha256: Mapped[str | None] = mapped_column(String(64), nullable=True, index=True)
+
+
+class FileHashModel(Base):
+    __tablename__ = "file_hashes"
+
+    path: Mapped[str] = mapped_column(String(1024), primary_key=True)
+    mtime_ns: Mapped[int] = mapped_column(Integer)
+    size_bytes: Mapped[int] = mapped_column(Integer)
+    sha256: Mapped[str] = mapped_column(String(64))
+
+
+# Keeps IN (...) lists well under SQLite's bound-parameter limit
+SQL_IN_BATCH_SIZE = 500
+
+
+def _set_sqlite_pragmas(dbapi_connection: Any, connection_record: Any) -> None:
+    # WAL with synchronous=NORMAL fsyncs at checkpoints instead of every commit
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
 
 
 class Database:
     def __init__(self, db_path: Path) -> None:
         db_path.parent.mkdir(parents=True, exist_ok=True)
-        self.engine = create_engine(f"sqlite:///{db_path}", echo=False)
+        self.engine = create_engine(
+            f"sqlite:///{db_path}",
+            echo=False,
+            connect_args={"check_same_thread": False},
+        )
+        event.listen(self.engine, "connect", _set_sqlite_pragmas)
         Base.metadata.create_all(self.engine)
+        # create_all skips existing tables, so add columns and indexes introduced later
+        page_columns = {c["name"] for c in inspect(self.engine).get_columns("pages")}
+        if "pixel_sha256" not in page_columns:
+            with self.engine.begin() as conn:
+                conn.execute(text("ALTER TABLE pages ADD COLUMN pixel_sha256 VARCHAR(64)"))
+        for index in Base.metadata.tables[PageModel.__tablename__].indexes:
+            index.create(self.engine, checkfirst=True)
         self._session_factory = sessionmaker(bind=self.engine)
 
     def session(self) -> Session:
@@ -51,23 +101,78 @@ class Database:
             return session.query(DocumentModel).filter_by(sha256=sha256).first()
 
     def add_document(self, doc: DocumentModel) -> None:
+        self.add_documents([doc])
+
+    def get_documents_by_sha256(self, sha256s: Iterable[str]) -> list[DocumentModel]:
+        """Fetch all documents matching any of the given hashes in one session."""
+        hashes = list(sha256s)
+        docs: list[DocumentModel] = []
         with self.session() as session:
-            session.add(doc)
+            for i in range(0, len(hashes), SQL_IN_BATCH_SIZE):
+                batch = hashes[i : i + SQL_IN_BATCH_SIZE]
+                stmt = select(DocumentModel).where(DocumentModel.sha256.in_(batch))
+                docs.extend(session.scalars(stmt))
+        return docs
+
+    def add_documents(self, docs: list[DocumentModel]) -> None:
+        with self.session() as session:
+            session.add_all(docs)
             session.commit()
 
     def add_page(self, page: PageModel) -> None:
+        self.add_pages([page])
+
+    def add_pages(self, pages: list[PageModel]) -> None:
+        """Insert pages in a single transaction."""
         with self.session() as session:
-            session.add(page)
+            session.add_all(pages)
+            session.commit()
+
+    def add_document_with_pages(self, doc: DocumentModel, pages: list[PageModel]) -> None:
+        """Insert a document and its pages in one transaction, so one commit per PDF."""
+        with self.session() as session:
+            session.add(doc)
+            session.add_all(pages)
             session.commit()
 
     def get_document(self, doc_id: str) -> DocumentModel | None:
         with self.session() as session:
             return session.query(DocumentModel).filter_by(doc_id=doc_id).first()
 
+    def get_documents(self, doc_ids: Iterable[str]) -> dict[str, DocumentModel]:
+        """Fetch documents by id in one session, keyed by doc_id; unknown ids are left out."""
+        ids = list(set(doc_ids))
+        docs: dict[str, DocumentModel] = {}
+        with self.session() as session:
+            for i in range(0, len(ids), SQL_IN_BATCH_SIZE):
+                batch = ids[i : i + SQL_IN_BATCH_SIZE]
+                stmt = select(DocumentModel).where(DocumentModel.doc_id.in_(batch))
+                docs.update((doc.doc_id, doc) for doc in session.scalars(stmt))
+        return docs
+
     def get_all_documents(self) -> list[DocumentModel]:
         with self.session() as session:
             return list(session.query(DocumentModel).all())
 
+    def list_document_summaries(self) -> list[dict[str, Any]]:
+        """Return doc_id, path, name, num_pages and sha256 for every document.
+
+        The file name is computed in SQL (everything after the last "/" or
+        "\\") so callers don't need to hydrate ORM objects or build Path objects.
+        """
+        # Windows paths use backslashes; fold them into "/" before splitting
+        path = func.replace(DocumentModel.path, "\\", "/")
+        dir_prefix = func.rtrim(path, func.replace(path, "/", ""))
+        stmt = select(
+            DocumentModel.doc_id,
+            DocumentModel.path,
+            func.substr(DocumentModel.path, func.length(dir_prefix) + 1).label("name"),
+            DocumentModel.num_pages,
+            DocumentModel.sha256,
+        )
+        with self.session() as session:
+            return [dict(row._mapping) for row in session.execute(stmt)]
+
     def get_pages_for_document(self, doc_id: str) -> list[PageModel]:
         with self.session() as session:
             return list(
@@ -77,9 +182,74 @@ class Database:
                 .all()
             )
 
+    def find_pages_by_pixel_sha256(self, pixel_sha256: str) -> list[tuple[str, int]]:
+        """Return (doc_id, page_num) of pages rendered to identical pixels, newest first."""
+        with self.session() as session:
+            rows = session.execute(
+                select(PageModel.doc_id, PageModel.page_num)
+                .where(PageModel.pixel_sha256 == pixel_sha256)
+                .order_by(PageModel.id.desc())
+            )
+            return [(doc_id, page_num) for doc_id, page_num in rows]
+
+    def list_page_keys(self) -> list[tuple[str, int]]:
+        """Return (doc_id, page_num) for every page of every document.
+
+        Documents come in insertion order (rowid, as get_all_documents scans
+        them) and pages by page_num, so seeded shuffles of this list match
+        query sets sampled document by document.
+        """
+        with self.session() as session:
+            rows = session.execute(
+                select(PageModel.doc_id, PageModel.page_num)
+                .join(DocumentModel, DocumentModel.doc_id == PageModel.doc_id)
+                .order_by(text("documents.rowid"), PageModel.page_num)
+            )
+            return [(doc_id, page_num) for doc_id, page_num in rows]
+
     def delete_document(self, doc_id: str) -> None:
         """Delete a document and its pages."""
         with self.session() as session:
             session.query(PageModel).filter_by(doc_id=doc_id).delete()
             session.query(DocumentModel).filter_by(doc_id=doc_id).delete()
             session.commit()
+
+    def get_file_hash(self, path: str, mtime_ns: int, size_bytes: int) -> str | None:
+        """Return the cached SHA256 for a file if its mtime and size are unchanged."""
+        with self.session() as session:
+            cached = session.get(FileHashModel, path)
+            if cached and cached.mtime_ns == mtime_ns and cached.size_bytes == size_bytes:
+                return cached.sha256
+            return None
+
+    def get_file_hashes(self) -> dict[str, tuple[int, int, str]]:
+        """Return every cached (mtime_ns, size_bytes, sha256) keyed by path."""
+        with self.session() as session:
+            rows = session.execute(select(
+                FileHashModel.path,
+                FileHashModel.mtime_ns,
+                FileHashModel.size_bytes,
+                FileHashModel.sha256,
+            ))
+            return {path: (mtime_ns, size, sha256) for path, mtime_ns, size, sha256 in rows}
+
+    def clear_file_hashes(self) -> None:
+        """Drop every cached file hash so the next discovery rehashes all files."""
+        with self.session() as session:
+            session.query(FileHashModel).delete()
+            session.commit()
+
+    def set_file_hash(self, path: str, mtime_ns: int, size_bytes: int, sha256: str) -> None:
+        self.set_file_hashes([(path, mtime_ns, size_bytes, sha256)])
+
+    def set_file_hashes(self, entries: Iterable[tuple[str, int, int, str]]) -> None:
+        """Upsert (path, mtime_ns, size_bytes, sha256) cache entries in one transaction."""
+        with self.session() as session:
+            for path, mtime_ns, size_bytes, sha256 in entries:
+                session.merge(FileHashModel(
+                    path=path,
+                    mtime_ns=mtime_ns,
+                    size_bytes=size_bytes,
+                    sha256=sha256,
+                ))
+            session.commit()
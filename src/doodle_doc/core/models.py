@@ -1,11 +1,14 @@
 from __future__ import annotations
 
+from collections.abc import Sequence
 from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Literal
 
+import numpy as np
 
-@dataclass
+
+@dataclass(slots=True)
 class Document:
     doc_id: str
     path: str
@@ -14,7 +17,7 @@ class Document:
     num_pages: int
 
 
-@dataclass
+@dataclass(slots=True)
 class Page:
     doc_id: str
     page_num: int
@@ -26,7 +29,7 @@ class Page:
 RegionType = Literal["full", "q1", "q2", "q3", "q4"]
 
 
-@dataclass
+@dataclass(slots=True)
 class EmbeddingRecord:
     embedding_id: str
     doc_id: str
@@ -37,7 +40,7 @@ class EmbeddingRecord:
     created_at: datetime = field(default_factory=datetime.now)
 
 
-@dataclass
+@dataclass(slots=True)
 class SearchResult:
     doc_id: str
     doc_name: str
@@ -45,3 +48,31 @@ class SearchResult:
     score: float
     stage: Literal["fast", "reranked", "colqwen2"]
     thumbnail_url: str
+
+
+@dataclass(slots=True)
+class SearchResultBatch:
+    """Column-wise view of a ranked result list for vectorized scoring."""
+
+    doc_ids: np.ndarray
+    page_nums: np.ndarray
+    scores: np.ndarray
+
+    @classmethod
+    def from_results(cls, results: Sequence[SearchResult]) -> SearchResultBatch:
+        n = len(results)
+        return cls(
+            doc_ids=np.array([r.doc_id for r in results], dtype=str),
+            page_nums=np.fromiter((r.page_num for r in results), dtype=np.int64, count=n),
+            scores=np.fromiter((r.score for r in results), dtype=np.float32, count=n),
+        )
+
+    def __len__(self) -> int:
+        return len(self.doc_ids)
+
+    def first_hit(self, doc_id: str, page_num: int) -> int | None:
+        """0-based rank of the first result on the given page, or None if absent."""
+        hits = (self.doc_ids == doc_id) & (self.page_nums == page_num)
+        if not hits.any():
+            return None
+        return int(np.argmax(hits))
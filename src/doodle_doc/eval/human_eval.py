@@ -1,26 +1,35 @@
 from __future__ import annotations
 
-import json
-from dataclasses import dataclass, field, asdict
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Literal
 
+import numpy as np
+import orjson
+
 from doodle_doc.core.config import Settings
 from doodle_doc.core.models import SearchResult
-from doodle_doc.eval.metrics import RetrievalMetrics
+from doodle_doc.eval.metrics import RECALL_KS, RetrievalMetrics, aggregate_retrieval_metrics
 
 
 RelevanceLabel = Literal["relevant", "partially_relevant", "not_relevant"]
 
+# Labels that count as a hit for each relevance threshold
+HIT_LABELS: dict[RelevanceLabel, frozenset[str]] = {
+    "relevant": frozenset({"relevant"}),
+    "partially_relevant": frozenset({"relevant", "partially_relevant"}),
+    "not_relevant": frozenset({"relevant", "partially_relevant", "not_relevant"}),
+}
 
-@dataclass
+
+@dataclass(slots=True)
 class ResultAnnotation:
     doc_id: str
     page_num: int
     relevance: RelevanceLabel
 
 
-@dataclass
+@dataclass(slots=True)
 class HumanAnnotation:
     query_id: str
     results: list[ResultAnnotation] = field(default_factory=list)
@@ -52,33 +61,23 @@ class HumanEvalManager:
         search_results: dict[str, list[SearchResult]],
     ) -> Path:
         """Create annotation JSON template for human labeling."""
-        self.human_queries_dir.mkdir(parents=True, exist_ok=True)
-
-        annotations = []
-        for query_id in query_ids:
-            results = search_results.get(query_id, [])
-            result_annotations = [
-                {
-                    "doc_id": r.doc_id,
-                    "page_num": r.page_num,
-                    "relevance": "not_relevant",
-                }
-                for r in results[:10]
-            ]
-            annotations.append({
-                "query_id": query_id,
-                "results": result_annotations,
-                "notes": "",
-                "annotator": "",
-            })
-
-        data = {
-            "version": 1,
-            "annotations": annotations,
-        }
-
-        with open(self.annotations_path, "w") as f:
-            json.dump(data, f, indent=2)
+        dataset = HumanEvalDataset(
+            annotations=[
+                HumanAnnotation(
+                    query_id=query_id,
+                    results=[
+                        ResultAnnotation(
+                            doc_id=r.doc_id,
+                            page_num=r.page_num,
+                            relevance="not_relevant",
+                        )
+                        for r in search_results.get(query_id, [])[:10]
+                    ],
+                )
+                for query_id in query_ids
+            ],
+        )
+        self.save_dataset(dataset)
 
         return self.annotations_path
 
@@ -87,8 +86,7 @@ class HumanEvalManager:
         if not self.annotations_path.exists():
             return HumanEvalDataset()
 
-        with open(self.annotations_path) as f:
-            data = json.load(f)
+        data = orjson.loads(self.annotations_path.read_bytes())
 
         annotations = []
         for ann in data.get("annotations", []):
@@ -123,58 +121,29 @@ class HumanEvalManager:
         if not dataset.annotations:
             return RetrievalMetrics()
 
-        threshold_values = {
-            "relevant": ["relevant"],
-            "partially_relevant": ["relevant", "partially_relevant"],
-            "not_relevant": ["relevant", "partially_relevant", "not_relevant"],
-        }
-        valid_labels = threshold_values[relevance_threshold]
-
-        recalls: dict[int, list[float]] = {1: [], 5: [], 10: [], 20: []}
-        mrrs: list[float] = []
-
-        for ann in dataset.annotations:
-            for k in [1, 5, 10, 20]:
-                hit = 0.0
-                for result in ann.results[:k]:
-                    if result.relevance in valid_labels:
-                        hit = 1.0
-                        break
-                recalls[k].append(hit)
-
-            mrr = 0.0
-            for i, result in enumerate(ann.results):
-                if result.relevance in valid_labels:
-                    mrr = 1.0 / (i + 1)
-                    break
-            mrrs.append(mrr)
+        valid_labels = HIT_LABELS[relevance_threshold]
 
+        ks = np.array(RECALL_KS)
         num_queries = len(dataset.annotations)
-        return RetrievalMetrics(
-            recall_at_1=sum(recalls[1]) / num_queries if num_queries else 0.0,
-            recall_at_5=sum(recalls[5]) / num_queries if num_queries else 0.0,
-            recall_at_10=sum(recalls[10]) / num_queries if num_queries else 0.0,
-            recall_at_20=sum(recalls[20]) / num_queries if num_queries else 0.0,
-            mrr=sum(mrrs) / num_queries if num_queries else 0.0,
-            num_queries=num_queries,
-        )
+        recalls = np.zeros((num_queries, len(ks)))
+        mrrs = np.zeros(num_queries)
+
+        for q, ann in enumerate(dataset.annotations):
+            first_hit = next(
+                (i for i, r in enumerate(ann.results) if r.relevance in valid_labels),
+                None,
+            )
+            if first_hit is None:
+                continue
+            recalls[q] = first_hit < ks
+            mrrs[q] = 1.0 / (first_hit + 1)
+
+        return aggregate_retrieval_metrics(recalls, mrrs)
 
     def save_dataset(self, dataset: HumanEvalDataset) -> None:
         """Save dataset back to disk."""
         self.human_queries_dir.mkdir(parents=True, exist_ok=True)
 
-        data = {
-            "version": dataset.version,
-            "annotations": [
-                {
-                    "query_id": ann.query_id,
-                    "results": [asdict(r) for r in ann.results],
-                    "notes": ann.notes,
-                    "annotator": ann.annotator,
-                }
-                for ann in dataset.annotations
-            ],
-        }
-
-        with open(self.annotations_path, "w") as f:
-            json.dump(data, f, indent=2)
+        self.annotations_path.write_bytes(
+            orjson.dumps(dataset, option=orjson.OPT_INDENT_2)
+        )
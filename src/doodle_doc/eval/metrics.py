@@ -8,7 +8,7 @@ import numpy as np
 from doodle_doc.core.models import SearchResult
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class RetrievalMetrics:
     recall_at_1: float = 0.0
     recall_at_5: float = 0.0
@@ -18,7 +18,7 @@ class RetrievalMetrics:
     num_queries: int = 0
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class LatencyMetrics:
     p50_ms: float = 0.0
     p95_ms: float = 0.0
@@ -26,7 +26,7 @@ class LatencyMetrics:
     num_samples: int = 0
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class EvalMetrics:
     retrieval: RetrievalMetrics = field(default_factory=RetrievalMetrics)
     latency: LatencyMetrics = field(default_factory=LatencyMetrics)
@@ -59,20 +59,34 @@ def compute_mrr(
     return 0.0
 
 
+RECALL_KS = (1, 5, 10, 20)
+
+
 def aggregate_retrieval_metrics(
-    recalls: dict[int, list[float]],
-    mrrs: list[float],
+    recalls: np.ndarray | dict[int, list[float]],
+    mrrs: np.ndarray | list[float],
 ) -> RetrievalMetrics:
-    """Aggregate per-query metrics into overall metrics."""
+    """
+    Aggregate per-query metrics into overall metrics.
+
+    recalls is a (num_queries, len(RECALL_KS)) array with one column per k;
+    a dict of per-query lists keyed by k is also accepted.
+    """
     num_queries = len(mrrs)
     if num_queries == 0:
         return RetrievalMetrics()
 
+    if isinstance(recalls, dict):
+        recalls = np.column_stack(
+            [recalls.get(k, np.zeros(num_queries)) for k in RECALL_KS]
+        )
+
+    recall_means = np.asarray(recalls).mean(axis=0)
     return RetrievalMetrics(
-        recall_at_1=float(np.mean(recalls.get(1, [0.0]))),
-        recall_at_5=float(np.mean(recalls.get(5, [0.0]))),
-        recall_at_10=float(np.mean(recalls.get(10, [0.0]))),
-        recall_at_20=float(np.mean(recalls.get(20, [0.0]))),
+        recall_at_1=float(recall_means[0]),
+        recall_at_5=float(recall_means[1]),
+        recall_at_10=float(recall_means[2]),
+        recall_at_20=float(recall_means[3]),
         mrr=float(np.mean(mrrs)),
         num_queries=num_queries,
     )
@@ -95,13 +109,15 @@ def compute_latency_metrics(latencies_ms: list[float]) -> LatencyMetrics:
 class LatencyTimer:
     """Context manager for timing operations."""
 
+    __slots__ = ("elapsed_ms", "_start")
+
     def __init__(self) -> None:
         self.elapsed_ms: float = 0.0
-        self._start: float = 0.0
+        self._start: int = 0
 
     def __enter__(self) -> LatencyTimer:
-        self._start = time.perf_counter()
+        self._start = time.perf_counter_ns()
         return self
 
     def __exit__(self, *args: object) -> None:
-        self.elapsed_ms = (time.perf_counter() - self._start) * 1000.0
+        self.elapsed_ms = (time.perf_counter_ns() - self._start) / 1_000_000.0
@@ -1,18 +1,25 @@
 from __future__ import annotations
 
-import json
+import os
 import random
-from dataclasses import dataclass, asdict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import Any
+from typing import Any, Literal
 
+import numpy as np
+import orjson
 from PIL import Image
 
 from doodle_doc.core.config import Settings
 from doodle_doc.core.database import Database
 
 
+# Either backend: Python's Mersenne Twister or a NumPy SFC64 generator
+Rng = random.Random | np.random.Generator
+
+
 @dataclass
 class PseudoQuery:
     query_id: str
@@ -21,13 +28,22 @@ class PseudoQuery:
     crop_box: tuple[int, int, int, int]
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class PseudoQueryConfig:
     num_queries: int = 100
     min_crop_ratio: float = 0.15
     max_crop_ratio: float = 0.40
     seed: int = 42
     exclude_margins_pct: float = 0.05
+    # "py" reproduces query sets generated before "np" (SFC64) existed
+    rng_backend: Literal["py", "np"] = "py"
+
+
+def _randint(rng: Rng, low: int, high: int) -> int:
+    """Uniform int in [low, high], inclusive like random.randint, for either backend."""
+    if isinstance(rng, np.random.Generator):
+        return int(rng.integers(low, high, endpoint=True))
+    return rng.randint(low, high)
 
 
 class PseudoQueryGenerator:
@@ -52,7 +68,7 @@ class PseudoQueryGenerator:
         queries_dir = output_dir / "queries"
         queries_dir.mkdir(exist_ok=True)
 
-        rng = random.Random(self.config.seed)
+        rng = self._new_rng()
         pages = self._sample_pages(rng)
 
         if len(pages) < self.config.num_queries:
@@ -62,59 +78,75 @@ class PseudoQueryGenerator:
             )
 
         queries: list[PseudoQuery] = []
-        for i, (doc_id, page_num) in enumerate(pages[: self.config.num_queries]):
-            query_id = f"q{i:04d}"
-
-            page_path = self.settings.rendered_dir / doc_id / f"{page_num}.png"
-            if not page_path.exists():
-                continue
-
-            img = Image.open(page_path)
-            crop, crop_box = self._extract_random_crop(img, rng)
-
-            crop_path = queries_dir / f"{query_id}.png"
-            crop.save(crop_path, "PNG")
-
-            queries.append(PseudoQuery(
-                query_id=query_id,
-                doc_id=doc_id,
-                page_num=page_num,
-                crop_box=crop_box,
-            ))
+        # Boxes are drawn here in page order, so the rng sequence (and the
+        # query set) is unchanged; decode, crop and encode run on the pool
+        with ThreadPoolExecutor(
+            max_workers=os.cpu_count(), thread_name_prefix="pseudo-query"
+        ) as pool:
+            saved: list[Future[None]] = []
+            for i, (doc_id, page_num) in enumerate(pages[: self.config.num_queries]):
+                query_id = f"q{i:04d}"
+
+                page_path = self.settings.rendered_dir / doc_id / f"{page_num}.png"
+                try:
+                    # Image.open only reads the header, which is all the box needs
+                    with Image.open(page_path) as img:
+                        size = img.size
+                except FileNotFoundError:
+                    continue
+
+                crop_box = self._random_crop_box(size, rng)
+                crop_path = queries_dir / f"{query_id}.png"
+                saved.append(pool.submit(self._save_crop, page_path, crop_box, crop_path))
+
+                queries.append(PseudoQuery(
+                    query_id=query_id,
+                    doc_id=doc_id,
+                    page_num=page_num,
+                    crop_box=crop_box,
+                ))
+
+            for future in saved:
+                future.result()
 
         self._save_manifest(output_dir, queries)
         self._save_ground_truth(output_dir, queries)
 
         return queries
 
-    def _sample_pages(self, rng: random.Random) -> list[tuple[str, int]]:
-        """Sample random pages from the index."""
-        docs = self.db.get_all_documents()
-        all_pages: list[tuple[str, int]] = []
-
-        for doc in docs:
-            pages = self.db.get_pages_for_document(doc.doc_id)
-            for page in pages:
-                all_pages.append((doc.doc_id, page.page_num))
+    def _new_rng(self) -> Rng:
+        if self.config.rng_backend == "np":
+            return np.random.Generator(np.random.SFC64(self.config.seed))
+        return random.Random(self.config.seed)
 
+    def _sample_pages(self, rng: Rng) -> list[tuple[str, int]]:
+        """Sample random pages from the index."""
+        all_pages = self.db.list_page_keys()
         rng.shuffle(all_pages)
         return all_pages
 
-    def _extract_random_crop(
+    @staticmethod
+    def _save_crop(page_path: Path, crop_box: tuple[int, int, int, int], path: Path) -> None:
+        with Image.open(page_path) as img:
+            crop = img.crop(crop_box)
+        # Fast zlib level: queries are scratch files, size barely matters
+        crop.save(path, "PNG", compress_level=1)
+
+    def _random_crop_box(
         self,
-        img: Image.Image,
-        rng: random.Random,
-    ) -> tuple[Image.Image, tuple[int, int, int, int]]:
-        """Extract a random rectangular crop from the image."""
-        w, h = img.size
+        size: tuple[int, int],
+        rng: Rng,
+    ) -> tuple[int, int, int, int]:
+        """Draw a random (x0, y0, x1, y1) crop box inside the page margins."""
+        w, h = size
 
         margin_x = int(w * self.config.exclude_margins_pct)
         margin_y = int(h * self.config.exclude_margins_pct)
 
-        crop_ratio = rng.uniform(
+        crop_ratio = float(rng.uniform(
             self.config.min_crop_ratio,
             self.config.max_crop_ratio,
-        )
+        ))
 
         crop_w = int(w * crop_ratio)
         crop_h = int(h * crop_ratio)
@@ -122,13 +154,12 @@ class PseudoQueryGenerator:
         max_x = w - margin_x - crop_w
         max_y = h - margin_y - crop_h
 
-        x0 = rng.randint(margin_x, max(margin_x, max_x))
-        y0 = rng.randint(margin_y, max(margin_y, max_y))
+        x0 = _randint(rng, margin_x, max(margin_x, max_x))
+        y0 = _randint(rng, margin_y, max(margin_y, max_y))
         x1 = x0 + crop_w
         y1 = y0 + crop_h
 
-        crop = img.crop((x0, y0, x1, y1))
-        return crop, (x0, y0, x1, y1)
+        return x0, y0, x1, y1
 
     def _save_manifest(
         self,
@@ -139,11 +170,13 @@ class PseudoQueryGenerator:
         manifest = {
             "version": 1,
             "generated_at": datetime.now().isoformat(),
-            "config": asdict(self.config),
+            # orjson serializes the dataclass natively, without asdict()'s deep copy
+            "config": self.config,
             "num_queries": len(queries),
         }
-        with open(output_dir / "manifest.json", "w") as f:
-            json.dump(manifest, f, indent=2)
+        (output_dir / "manifest.json").write_bytes(
+            orjson.dumps(manifest, option=orjson.OPT_INDENT_2)
+        )
 
     def _save_ground_truth(
         self,
@@ -159,13 +192,13 @@ class PseudoQueryGenerator:
             }
             for q in queries
         }
-        with open(output_dir / "ground_truth.json", "w") as f:
-            json.dump(ground_truth, f, indent=2)
+        (output_dir / "ground_truth.json").write_bytes(
+            orjson.dumps(ground_truth, option=orjson.OPT_INDENT_2)
+        )
 
     @classmethod
     def load_ground_truth(cls, eval_dir: Path) -> dict[str, dict[str, Any]]:
         """Load ground truth from disk."""
         gt_path = eval_dir / "pseudo_queries" / "ground_truth.json"
-        with open(gt_path) as f:
-            data: dict[str, dict[str, Any]] = json.load(f)
-            return data
+        data: dict[str, dict[str, Any]] = orjson.loads(gt_path.read_bytes())
+        return data
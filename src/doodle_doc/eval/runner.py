@@ -1,23 +1,29 @@
 from __future__ import annotations
 
-import json
 import logging
-from dataclasses import asdict
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
+from typing import Any
 
+import numpy as np
+import orjson
 from PIL import Image
 
 from doodle_doc.core.config import Settings
+from doodle_doc.core.models import SearchResult, SearchResultBatch
+from doodle_doc.eval.io import preload_images
 from doodle_doc.eval.metrics import (
+    RECALL_KS,
     EvalMetrics,
     LatencyMetrics,
     LatencyTimer,
     RetrievalMetrics,
     aggregate_retrieval_metrics,
     compute_latency_metrics,
-    compute_mrr,
-    compute_recall_at_k,
 )
 from doodle_doc.eval.pseudo_queries import PseudoQueryConfig, PseudoQueryGenerator
 from doodle_doc.search.retrieval import SearchService
@@ -25,6 +31,22 @@ from doodle_doc.search.retrieval import SearchService
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=16)
+def _read_baseline(path: Path, mtime_ns: int, size: int) -> EvalMetrics:
+    """Parse a baseline file once per (mtime, size) version of it.
+
+    Rewriting the baseline changes the key, so a stale parse is never returned.
+    """
+    data = orjson.loads(path.read_bytes())
+
+    return EvalMetrics(
+        retrieval=RetrievalMetrics(**data["retrieval"]),
+        latency=LatencyMetrics(**data["latency"]),
+        search_mode=data["search_mode"],
+        timestamp=data["timestamp"],
+    )
+
+
 class EvalRunner:
     def __init__(
         self,
@@ -32,11 +54,13 @@ class EvalRunner:
         num_queries: int = 100,
         seed: int = 42,
         regenerate: bool = False,
+        workers: int = 1,
     ) -> None:
         self.settings = settings
         self.num_queries = num_queries
         self.seed = seed
         self.regenerate = regenerate
+        self.workers = workers
         self._search_service: SearchService | None = None
 
     @property
@@ -62,10 +86,19 @@ class EvalRunner:
         modes = modes or ["fast", "accurate"]
         self._ensure_pseudo_queries()
 
+        ground_truth = PseudoQueryGenerator.load_ground_truth(self.eval_dir)
+        queries_dir = self.pseudo_queries_dir / "queries"
+        query_images = preload_images(
+            {query_id: queries_dir / f"{query_id}.png" for query_id in ground_truth}
+        )
+
+        # Load every mode's models before timing any of them
+        self._warmup(modes, list(query_images.values())[:3])
+
         results: dict[str, EvalMetrics] = {}
         for mode in modes:
             logger.info(f"Running evaluation for {mode} mode...")
-            metrics = self._run_single_mode(mode)
+            metrics = self._run_single_mode(mode, ground_truth, query_images)
             self._save_results(metrics, mode)
             results[mode] = metrics
 
@@ -85,41 +118,48 @@ class EvalRunner:
         generator = PseudoQueryGenerator(self.settings, config)
         generator.generate(self.pseudo_queries_dir)
 
-    def _run_single_mode(self, search_mode: str) -> EvalMetrics:
+    def _run_single_mode(
+        self,
+        search_mode: str,
+        ground_truth: dict[str, dict[str, Any]],
+        query_images: dict[str, Image.Image],
+    ) -> EvalMetrics:
         """Run evaluation for a single search mode."""
-        ground_truth = PseudoQueryGenerator.load_ground_truth(self.eval_dir)
-        queries_dir = self.pseudo_queries_dir / "queries"
-
-        self._warmup(search_mode)
-
-        recalls: dict[int, list[float]] = {1: [], 5: [], 10: [], 20: []}
-        mrrs: list[float] = []
-        latencies: list[float] = []
-
-        for query_id, gt in ground_truth.items():
-            query_path = queries_dir / f"{query_id}.png"
-            if not query_path.exists():
-                continue
-
-            query_img = Image.open(query_path)
-
+        def timed_search(query_img: Image.Image) -> tuple[list[SearchResult], float]:
+            # Timed inside the worker so queueing behind other queries isn't counted
             with LatencyTimer() as timer:
                 results = self.search_service.search(
                     sketch_image=query_img,
                     top_k=20,
                     search_mode=search_mode,
                 )
+            return results, timer.elapsed_ms
+
+        queries = [
+            (gt, query_images[query_id])
+            for query_id, gt in ground_truth.items()
+            if query_id in query_images
+        ]
 
-            latencies.append(timer.elapsed_ms)
+        ks = np.array(RECALL_KS)
+        recalls = np.zeros((len(queries), len(ks)))
+        mrrs = np.zeros(len(queries))
+        latencies: list[float] = []
 
-            gt_doc_id = str(gt["doc_id"])
-            gt_page_num = int(gt["page_num"])
+        # pool.map yields in submission order, so rows line up with queries
+        with ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="eval-query"
+        ) as pool:
+            searched = pool.map(timed_search, [img for _, img in queries])
+            for row, ((gt, _), (results, elapsed_ms)) in enumerate(zip(queries, searched)):
+                latencies.append(elapsed_ms)
 
-            for k in [1, 5, 10, 20]:
-                recalls[k].append(
-                    compute_recall_at_k(results, gt_doc_id, gt_page_num, k)
+                first_hit = SearchResultBatch.from_results(results).first_hit(
+                    str(gt["doc_id"]), int(gt["page_num"])
                 )
-            mrrs.append(compute_mrr(results, gt_doc_id, gt_page_num))
+                if first_hit is not None:
+                    recalls[row] = first_hit < ks
+                    mrrs[row] = 1.0 / (first_hit + 1)
 
         return EvalMetrics(
             retrieval=aggregate_retrieval_metrics(recalls, mrrs),
@@ -128,18 +168,15 @@ class EvalRunner:
             timestamp=datetime.now().isoformat(),
         )
 
-    def _warmup(self, search_mode: str) -> None:
-        """Run warmup queries to ensure models are loaded."""
-        queries_dir = self.pseudo_queries_dir / "queries"
-        query_files = list(queries_dir.glob("*.png"))[:3]
-
-        for query_file in query_files:
-            query_img = Image.open(query_file)
-            self.search_service.search(
-                sketch_image=query_img,
-                top_k=5,
-                search_mode=search_mode,
-            )
+    def _warmup(self, modes: list[str], query_images: list[Image.Image]) -> None:
+        """Run warmup queries to ensure each mode's models are loaded."""
+        for search_mode in modes:
+            for query_img in query_images:
+                self.search_service.search(
+                    sketch_image=query_img,
+                    top_k=5,
+                    search_mode=search_mode,
+                )
 
     def _save_results(self, metrics: EvalMetrics, search_mode: str) -> Path:
         """Save evaluation results to disk."""
@@ -148,8 +185,7 @@ class EvalRunner:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         result_path = self.results_dir / f"{timestamp}_{search_mode}.json"
 
-        with open(result_path, "w") as f:
-            json.dump(asdict(metrics), f, indent=2)
+        result_path.write_bytes(orjson.dumps(metrics, option=orjson.OPT_INDENT_2))
 
         return result_path
 
@@ -160,8 +196,7 @@ class EvalRunner:
             raise ValueError(f"No results found for {search_mode} mode")
 
         baseline_path = self.results_dir / f"baseline_{search_mode}.json"
-        with open(latest) as src, open(baseline_path, "w") as dst:
-            dst.write(src.read())
+        shutil.copyfile(latest, baseline_path)
 
         logger.info(f"Saved baseline for {search_mode} mode to {baseline_path}")
 
@@ -170,31 +205,33 @@ class EvalRunner:
         if not self.results_dir.exists():
             return None
 
-        results = sorted(
-            self.results_dir.glob(f"*_{search_mode}.json"),
-            reverse=True,
-        )
-        for result in results:
-            if not result.name.startswith("baseline_"):
-                return result
-        return None
+        # Names start with a sortable timestamp, so the latest is the max name
+        suffix = f"_{search_mode}.json"
+        latest: str | None = None
+        with os.scandir(self.results_dir) as entries:
+            for entry in entries:
+                name = entry.name
+                if (
+                    name.endswith(suffix)
+                    and not name.startswith("baseline_")
+                    and (latest is None or name > latest)
+                ):
+                    latest = name
+        return None if latest is None else self.results_dir / latest
 
     @classmethod
     def load_baseline(cls, results_dir: Path, search_mode: str) -> EvalMetrics | None:
-        """Load baseline metrics for comparison."""
+        """Load baseline metrics for comparison.
+
+        The parsed baseline is cached; EvalMetrics is frozen, so sharing it is safe.
+        """
         baseline_path = results_dir / f"baseline_{search_mode}.json"
-        if not baseline_path.exists():
+        try:
+            st = baseline_path.stat()
+        except FileNotFoundError:
             return None
 
-        with open(baseline_path) as f:
-            data = json.load(f)
-
-        return EvalMetrics(
-            retrieval=RetrievalMetrics(**data["retrieval"]),
-            latency=LatencyMetrics(**data["latency"]),
-            search_mode=data["search_mode"],
-            timestamp=data["timestamp"],
-        )
+        return _read_baseline(baseline_path, st.st_mtime_ns, st.st_size)
 
     def compare_to_baseline(
         self,
@@ -4,15 +4,17 @@ import json
 import time
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable
 
 import numpy as np
 import torch
 from PIL import Image
 
 from doodle_doc.core.config import Settings
+from doodle_doc.eval.io import preload_images
 from doodle_doc.ingestion.colqwen_embed import ColQwen2Embedder
 from doodle_doc.ingestion.colqwen_index import ColQwen2Index
+from doodle_doc.search.colqwen_search import SCORE_CHUNK_PAGES, maxsim_chunk
 
 
 @dataclass
@@ -40,6 +42,9 @@ class SynthEvalResult:
         return "\n".join(lines)
 
 
+MaxSimKernel = Callable[[torch.Tensor, torch.Tensor, torch.Tensor], torch.Tensor]
+
+
 class SynthEvalRunner:
     def __init__(self, settings: Settings, synth_dir: Path) -> None:
         self.settings = settings
@@ -47,6 +52,9 @@ class SynthEvalRunner:
         self.index_dir = synth_dir / "index" / "colqwen"
         self._embedder: ColQwen2Embedder | None = None
         self._index: ColQwen2Index | None = None
+        self._doc_tensors: tuple[list[tuple[str, int]], torch.Tensor, torch.Tensor] | None = None
+        self._query_buffer: torch.Tensor | None = None
+        self._score_kernel: MaxSimKernel | None = None
 
     @property
     def embedder(self) -> ColQwen2Embedder:
@@ -60,6 +68,38 @@ class SynthEvalRunner:
             self._index = ColQwen2Index.load(self.index_dir)
         return self._index
 
+    @property
+    def doc_tensors(self) -> tuple[list[tuple[str, int]], torch.Tensor, torch.Tensor]:
+        """Stacked, L2-normalized page embeddings and token mask on the embedder's device.
+
+        Kept in float16 on GPU/MPS; CPU half-precision matmuls are slow, so
+        the CPU path upcasts to float32.
+        """
+        if self._doc_tensors is None:
+            page_keys, embeddings, mask = self.index.stacked()
+            device = self.embedder.device
+            dtype = torch.float32 if device == "cpu" else torch.float16
+            docs = torch.from_numpy(embeddings).to(device, dtype)
+            if not self.index.normalized:
+                docs = torch.nn.functional.normalize(docs, p=2, dim=-1)
+            self._doc_tensors = (page_keys, docs, torch.from_numpy(mask).to(device))
+        return self._doc_tensors
+
+    @property
+    def score_kernel(self) -> MaxSimKernel:
+        """maxsim_chunk, compiled into one fused kernel on CUDA.
+
+        Inductor support on MPS is still partial and the CPU backend needs a
+        C++ toolchain, so other devices run it eagerly. Shapes are marked
+        dynamic because query length and the last chunk's size vary.
+        """
+        if self._score_kernel is None:
+            if self.embedder.device == "cuda":
+                self._score_kernel = torch.compile(maxsim_chunk, dynamic=True)
+            else:
+                self._score_kernel = maxsim_chunk
+        return self._score_kernel
+
     def run(self, top_k: int = 20) -> SynthEvalResult:
         ground_truth = self._load_ground_truth()
 
@@ -79,30 +119,27 @@ class SynthEvalRunner:
         if not all_pages:
             raise ValueError("No pages in synth index. Run synth-index first.")
 
+        doodle_paths = {doodle_id: doodles_dir / f"{doodle_id}.png" for doodle_id in ground_truth}
+        doodle_images = preload_images(doodle_paths)
+        self._warmup(list(doodle_images.values())[:2])
+
         for doodle_id, gt in ground_truth.items():
-            img_path = doodles_dir / f"{doodle_id}.png"
-            if not img_path.exists():
-                print(f"  Warning: {img_path} not found, skipping")
+            img = doodle_images.get(doodle_id)
+            if img is None:
+                print(f"  Warning: {doodle_paths[doodle_id]} not found, skipping")
                 continue
 
-            img = Image.open(img_path)
-
             start = time.perf_counter()
             result_ids = self._search(img, top_k)
             latencies.append((time.perf_counter() - start) * 1000)
 
+            # One scan for the target's rank; every metric derives from it
             target_page = gt["page_id"]
+            rank = next((i for i, rid in enumerate(result_ids) if rid == target_page), None)
 
-            for k in [1, 5, 10]:
-                hit = 1.0 if target_page in result_ids[:k] else 0.0
-                all_recalls[k].append(hit)
-
-            rr = 0.0
-            for i, rid in enumerate(result_ids):
-                if rid == target_page:
-                    rr = 1.0 / (i + 1)
-                    break
-            all_rrs.append(rr)
+            for k in all_recalls:
+                all_recalls[k].append(1.0 if rank is not None and rank < k else 0.0)
+            all_rrs.append(0.0 if rank is None else 1.0 / (rank + 1))
 
         return SynthEvalResult(
             recall_at_1=float(np.mean(all_recalls[1])) if all_recalls[1] else 0.0,
@@ -114,38 +151,48 @@ class SynthEvalRunner:
             num_queries=len(ground_truth),
         )
 
+    def _warmup(self, images: list[Image.Image]) -> None:
+        """Load the model, build the doc tensors and run throwaway searches.
+
+        Keeps model load, shard page-in and score kernel compilation out of
+        the latency percentiles.
+        """
+        self.embedder.load()
+        for img in images:
+            self._search(img, top_k=1)
+
+    @torch.no_grad()
     def _search(self, sketch_image: Image.Image, top_k: int) -> list[str]:
         """Search synth index and return list of page IDs."""
         query_emb = self.embedder.embed_single(sketch_image)
-        query_tensor = torch.from_numpy(query_emb).unsqueeze(0)
-
-        all_pages = self.index.all_page_keys()
-        scores: list[tuple[str, float]] = []
-
-        for doc_id, page_num in all_pages:
-            doc_emb = self.index.get(doc_id, page_num)
-            if doc_emb is None:
-                continue
-
-            doc_tensor = torch.from_numpy(doc_emb).unsqueeze(0)
-            score = self._compute_maxsim(query_tensor, doc_tensor)
-            scores.append((doc_id, score))
-
-        scores.sort(key=lambda x: x[1], reverse=True)
-        return [doc_id for doc_id, _ in scores[:top_k]]
-
-    def _compute_maxsim(
-        self,
-        query_emb: torch.Tensor,
-        doc_emb: torch.Tensor,
-    ) -> float:
-        """Compute MaxSim late-interaction score."""
-        query_norm = torch.nn.functional.normalize(query_emb, p=2, dim=-1)
-        doc_norm = torch.nn.functional.normalize(doc_emb, p=2, dim=-1)
-
-        sim_matrix = torch.matmul(query_norm[0], doc_norm[0].T)
-        max_sims = sim_matrix.max(dim=1).values
-        return float(max_sims.sum().item())
+        page_keys, docs, mask = self.doc_tensors
+
+        query = self._load_query(query_emb, docs)
+
+        score_kernel = self.score_kernel
+        scores = torch.empty(len(page_keys), device=docs.device, dtype=torch.float32)
+        for start in range(0, len(page_keys), SCORE_CHUNK_PAGES):
+            end = start + SCORE_CHUNK_PAGES
+            scores[start:end] = score_kernel(query, docs[start:end], mask[start:end])
+
+        top = torch.topk(scores, min(top_k, len(page_keys))).indices.tolist()
+        return [page_keys[i][0] for i in top]
+
+    def _load_query(self, query_emb: np.ndarray, docs: torch.Tensor) -> torch.Tensor:
+        """Copy a query embedding into a reused device buffer and return a view of it.
+
+        The buffer grows to the longest query seen, so the timed loop stops
+        allocating a fresh device tensor per query.
+        """
+        num_tokens, dim = query_emb.shape
+        buf = self._query_buffer
+        if buf is None or buf.shape[0] < num_tokens:
+            buf = self._query_buffer = torch.empty(
+                (num_tokens, dim), device=docs.device, dtype=docs.dtype
+            )
+        query = buf[:num_tokens]
+        query.copy_(torch.from_numpy(query_emb))
+        return query
 
     def _load_ground_truth(self) -> dict[str, dict[str, Any]]:
         gt_path = self.synth_dir / "ground_truth.json"
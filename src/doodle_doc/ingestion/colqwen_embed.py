@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import gc
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from typing import TYPE_CHECKING
 
 import numpy as np
@@ -9,11 +10,21 @@ import torch
 from PIL import Image
 
 if TYPE_CHECKING:
-    from transformers import ColQwen2ForRetrieval, ColQwen2Processor
+    from transformers import BatchFeature, ColQwen2ForRetrieval, ColQwen2Processor
 
 logger = logging.getLogger(__name__)
 
 
+def _as_rgb(img: Image.Image) -> Image.Image:
+    """Return img in RGB mode; convert() always copies, even for RGB input."""
+    return img if img.mode == "RGB" else img.convert("RGB")
+
+
+def _unit_fp16(embeddings: torch.Tensor) -> torch.Tensor:
+    """L2-normalize token vectors on device so scoring can skip it, then cast to float16."""
+    return torch.nn.functional.normalize(embeddings, p=2, dim=-1).to(torch.float16)
+
+
 class ColQwen2Embedder:
     """ColQwen2 embedder for document indexing.
 
@@ -79,7 +90,7 @@ class ColQwen2Embedder:
         """Embed a single image.
 
         Returns:
-            numpy array of shape (num_patches, hidden_dim)
+            L2-normalized float16 numpy array of shape (num_patches, hidden_dim)
         """
         if not self.is_loaded():
             self.load()
@@ -87,10 +98,10 @@ class ColQwen2Embedder:
         assert self._model is not None
         assert self._processor is not None
 
-        inputs = self._processor(images=[img.convert("RGB")]).to(self.device)
+        inputs = self._processor(images=[_as_rgb(img)]).to(self.device)
         outputs = self._model(**inputs)
 
-        embeddings = outputs.embeddings[0].cpu().numpy()
+        embeddings = _unit_fp16(outputs.embeddings[0]).cpu().numpy()
         return embeddings
 
     @torch.no_grad()
@@ -102,7 +113,7 @@ class ColQwen2Embedder:
         """Embed a batch of images.
 
         Returns:
-            List of numpy arrays, each (num_patches, hidden_dim)
+            List of L2-normalized float16 numpy arrays, each (num_patches, hidden_dim)
         """
         if not self.is_loaded():
             self.load()
@@ -110,19 +121,29 @@ class ColQwen2Embedder:
         assert self._model is not None
         assert self._processor is not None
 
-        all_embeddings = []
+        all_embeddings: list[np.ndarray] = []
+        batches = [images[i : i + batch_size] for i in range(0, len(images), batch_size)]
+        if not batches:
+            return all_embeddings
 
-        for i in range(0, len(images), batch_size):
-            batch = [img.convert("RGB") for img in images[i : i + batch_size]]
-            inputs = self._processor(images=batch).to(self.device)
-            outputs = self._model(**inputs)
+        # Preprocess the next batch on a worker thread while the model runs
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            pending = pool.submit(self._preprocess, batches[0])
+            for next_batch in [*batches[1:], None]:
+                inputs = pending.result().to(self.device)
+                if next_batch is not None:
+                    pending = pool.submit(self._preprocess, next_batch)
 
-            for j in range(len(batch)):
-                emb = outputs.embeddings[j].cpu().numpy()
-                all_embeddings.append(emb)
+                outputs = self._model(**inputs)
+                # One device-to-host copy per batch rather than per image
+                all_embeddings.extend(_unit_fp16(outputs.embeddings).cpu().numpy())
 
         return all_embeddings
 
+    def _preprocess(self, images: list[Image.Image]) -> BatchFeature:
+        assert self._processor is not None
+        return self._processor(images=[_as_rgb(img) for img in images])
+
     @property
     def processor(self) -> ColQwen2Processor:
         if not self.is_loaded():
@@ -1,10 +1,13 @@
 from __future__ import annotations
 
+import hashlib
 import json
+import os
 from pathlib import Path
 from typing import Any
 
 import numpy as np
+import orjson
 
 
 class ColQwen2Index:
@@ -13,8 +16,22 @@ class ColQwen2Index:
     Storage layout:
     colqwen/
         manifest.json
+        embeddings-{generation}.bin   # append-only shard, memory-mapped on read
+        stacked-{digest}.npy          # padded (pages, tokens, dim) copy for batch scoring
         embeddings/
-            {doc_id}_{page_num}.npy
+            {doc_id}_{page_num}.npy   # legacy per-page files, folded in by compact()
+
+    The shard is a row-major (rows, dim) array; the manifest records each
+    page's row offset and shape. Rows of removed or overwritten pages stay
+    in the shard until the next compact().
+
+    The stacked copy is a full padded duplicate of the live pages, so with it
+    the index takes at least twice the shard's disk space. It is rebuilt on
+    the first stacked() after the pages change; save() and compact() delete
+    copies that no longer match the pages.
+
+    New manifests set "normalized": every page was L2-normalized by the
+    embedder. Older indexes lack the flag and must be normalized at query time.
     """
 
     def __init__(self, index_dir: Path) -> None:
@@ -25,45 +42,89 @@ class ColQwen2Index:
         self._manifest: dict[str, Any] = {
             "version": 1,
             "model": "",
+            "normalized": True,
             "pages": {},
         }
+        self._shard: np.ndarray | None = None
+        self._page_keys: list[tuple[str, int]] | None = None
+        self._stacked: tuple[list[tuple[str, int]], np.ndarray, np.ndarray] | None = None
 
     def _page_key(self, doc_id: str, page_num: int) -> str:
         return f"{doc_id}:{page_num}"
 
-    def _embedding_filename(self, doc_id: str, page_num: int) -> str:
-        return f"{doc_id}_{page_num}.npy"
-
     def add(
         self,
         doc_id: str,
         page_num: int,
         embedding: np.ndarray,
     ) -> None:
-        self.embeddings_dir.mkdir(parents=True, exist_ok=True)
+        self.add_batch([(doc_id, page_num, embedding)])
 
-        filename = self._embedding_filename(doc_id, page_num)
-        filepath = self.embeddings_dir / filename
+    def add_batch(self, pages: list[tuple[str, int, np.ndarray]]) -> None:
+        """Append (doc_id, page_num, embedding) pages to the shard in one write."""
+        if not pages:
+            return
+        self.index_dir.mkdir(parents=True, exist_ok=True)
 
-        np.save(filepath, embedding)
+        shard = self._manifest.get("shard")
+        if shard is None or shard["rows"] == 0:
+            generation = shard["generation"] if shard else 0
+            shard = self._manifest["shard"] = {
+                "file": f"embeddings-{generation}.bin",
+                "generation": generation,
+                "dtype": np.dtype(pages[0][2].dtype).name,
+                "rows": 0,
+                "dim": pages[0][2].shape[1],
+            }
+        dtype = np.dtype(shard["dtype"])
 
-        key = self._page_key(doc_id, page_num)
-        self._manifest["pages"][key] = {
-            "file": filename,
-            "shape": list(embedding.shape),
-        }
+        shard_path = self.index_dir / shard["file"]
+        shard_path.touch(exist_ok=True)
+        offset = shard["rows"]
+        with open(shard_path, "r+b") as f:
+            # Write after the last row the manifest knows about, overwriting
+            # anything left by a run that crashed before saving its manifest
+            f.seek(offset * shard["dim"] * dtype.itemsize)
+            for doc_id, page_num, embedding in pages:
+                if embedding.shape[1] != shard["dim"]:
+                    raise ValueError(
+                        f"Embedding dim {embedding.shape[1]} does not match "
+                        f"index dim {shard['dim']}"
+                    )
+                f.write(np.ascontiguousarray(embedding, dtype=dtype).tobytes())
+
+                key = self._page_key(doc_id, page_num)
+                if self._page_keys is not None and key not in self._manifest["pages"]:
+                    self._page_keys.append((doc_id, page_num))
+                self._manifest["pages"][key] = {
+                    "offset": offset,
+                    "shape": list(embedding.shape),
+                }
+                offset += embedding.shape[0]
+            f.truncate()
+
+        shard["rows"] = offset
+        self._shard = None
+        self._stacked = None
 
     def get(self, doc_id: str, page_num: int) -> np.ndarray | None:
-        key = self._page_key(doc_id, page_num)
-        if key not in self._manifest["pages"]:
+        meta = self._manifest["pages"].get(self._page_key(doc_id, page_num))
+        if meta is None:
             return None
+        return self._load_page(meta)
 
-        filename = self._manifest["pages"][key]["file"]
-        filepath = self.embeddings_dir / filename
+    def _load_page(self, meta: dict[str, Any]) -> np.ndarray | None:
+        if "offset" in meta:
+            if self._shard is None:
+                self._open_shard()
+            if self._shard is None:
+                return None
+            offset = meta["offset"]
+            return self._shard[offset : offset + meta["shape"][0]]
 
+        filepath = self.embeddings_dir / meta["file"]
         if not filepath.exists():
             return None
-
         return np.load(filepath)
 
     def get_batch(
@@ -72,6 +133,102 @@ class ColQwen2Index:
     ) -> list[np.ndarray | None]:
         return [self.get(doc_id, page_num) for doc_id, page_num in page_keys]
 
+    def stacked(self) -> tuple[list[tuple[str, int]], np.ndarray, np.ndarray]:
+        """Return every page embedding zero-padded into one array.
+
+        Returns (page_keys, embeddings, mask): embeddings has shape
+        (num_pages, max_tokens, dim) and mask marks the real, non-padding
+        tokens. The result is cached until the index is modified.
+
+        The padded array is written once to stacked-{digest}.npy, keyed by
+        the page table, and memory-mapped from there, so later processes
+        skip the rebuild until the pages change. That file costs as much
+        disk as the padded array itself.
+        """
+        if self._stacked is None:
+            page_keys: list[tuple[str, int]] = []
+            metas: list[dict[str, Any]] = []
+            for (doc_id, page_num), meta in zip(
+                self.all_page_keys(), self._manifest["pages"].values()
+            ):
+                if "offset" in meta or (self.embeddings_dir / meta["file"]).exists():
+                    page_keys.append((doc_id, page_num))
+                    metas.append(meta)
+
+            lengths = np.array([meta["shape"][0] for meta in metas], dtype=np.intp)
+            max_tokens = int(lengths.max(initial=0))
+            mask = np.arange(max_tokens) < lengths[:, None]
+
+            if metas and self.index_dir.exists():
+                cache_path = self._stacked_path()
+                if not cache_path.exists():
+                    self._write_stacked(cache_path, metas, max_tokens)
+                # Copy-on-write so torch.from_numpy gets a writable view
+                embeddings = np.load(cache_path, mmap_mode="c")
+            else:
+                embeddings = self._pad_pages(metas, max_tokens)
+
+            self._stacked = (page_keys, embeddings, mask)
+        return self._stacked
+
+    def _stacked_path(self) -> Path:
+        """Where the padded copy of the current page table lives."""
+        digest = hashlib.blake2b(
+            orjson.dumps([self._manifest.get("shard"), self._manifest["pages"]]),
+            digest_size=8,
+        ).hexdigest()
+        return self.index_dir / f"stacked-{digest}.npy"
+
+    def _remove_stale_stacked(self) -> None:
+        """Delete padded copies built for a page table other than the current one."""
+        current = self._stacked_path()
+        for stale in self.index_dir.glob("stacked-*.npy"):
+            if stale != current:
+                stale.unlink(missing_ok=True)
+
+    def _pad_pages(
+        self,
+        metas: list[dict[str, Any]],
+        max_tokens: int,
+        out: np.ndarray | None = None,
+    ) -> np.ndarray:
+        arrays = [self._load_page(meta) for meta in metas]
+        present = [a for a in arrays if a is not None]
+        dim = present[0].shape[1] if present else 0
+        if out is None:
+            dtype = np.result_type(*(a.dtype for a in present)) if present else np.float16
+            out = np.zeros((len(metas), max_tokens, dim), dtype=dtype)
+        for i, emb in enumerate(arrays):
+            if emb is not None:
+                out[i, : len(emb)] = emb
+        return out
+
+    def _write_stacked(
+        self,
+        cache_path: Path,
+        metas: list[dict[str, Any]],
+        max_tokens: int,
+    ) -> None:
+        # Build under a private name, then swap in atomically
+        tmp_path = cache_path.with_name(f".{cache_path.stem}.{os.getpid()}.tmp")
+        shard = self._manifest.get("shard")
+        if shard and all("offset" in meta for meta in metas):
+            out = np.lib.format.open_memmap(
+                tmp_path,
+                mode="w+",
+                dtype=np.dtype(shard["dtype"]),
+                shape=(len(metas), max_tokens, shard["dim"]),
+            )
+            self._pad_pages(metas, max_tokens, out=out)
+            out.flush()
+            del out
+        else:
+            # Legacy .npy pages may mix dtypes; compact() folds them away on save
+            with open(tmp_path, "wb") as f:
+                np.save(f, self._pad_pages(metas, max_tokens))
+        os.replace(tmp_path, cache_path)
+        self._remove_stale_stacked()
+
     def has_page(self, doc_id: str, page_num: int) -> bool:
         key = self._page_key(doc_id, page_num)
         return key in self._manifest["pages"]
@@ -82,21 +239,118 @@ class ColQwen2Index:
 
         for key, meta in self._manifest["pages"].items():
             if key.startswith(f"{doc_id}:"):
-                filepath = self.embeddings_dir / meta["file"]
-                if filepath.exists():
-                    filepath.unlink()
+                # Shard rows are reclaimed by the next compaction
+                if "file" in meta:
+                    (self.embeddings_dir / meta["file"]).unlink(missing_ok=True)
                 keys_to_remove.append(key)
                 removed += 1
 
         for key in keys_to_remove:
             del self._manifest["pages"][key]
+        if keys_to_remove:
+            self._page_keys = None
+            self._stacked = None
 
         return removed
 
     def save(self) -> None:
+        """Save the manifest, compacting first if the shard is mostly dead rows."""
+        if self._needs_compaction():
+            self.compact()
+        else:
+            self._write_manifest()
+            self._remove_stale_stacked()
+
+    def _write_manifest(self) -> None:
         self.index_dir.mkdir(parents=True, exist_ok=True)
-        with open(self.manifest_path, "w") as f:
-            json.dump(self._manifest, f, indent=2)
+        self.manifest_path.write_bytes(orjson.dumps(self._manifest, option=orjson.OPT_INDENT_2))
+
+    def _needs_compaction(self) -> bool:
+        pages = self._manifest["pages"].values()
+        if not self.normalized and pages:
+            return True
+        if any("file" in meta for meta in pages):
+            return True
+        shard = self._manifest.get("shard")
+        if not shard:
+            return False
+        live_rows = sum(meta["shape"][0] for meta in pages)
+        return shard["rows"] - live_rows > live_rows
+
+    def compact(self) -> None:
+        """Rewrite every page into a fresh shard and save the manifest.
+
+        Folds in loose per-page .npy files (deleting them afterwards) and
+        drops rows of removed pages. Indexes from before the "normalized"
+        flag are L2-normalized on the way through, so queries no longer
+        have to. The new shard gets a new generation number so the old one
+        stays valid until the manifest points away from it.
+        """
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+
+        normalize = not self.normalized
+        pages: list[tuple[str, np.ndarray]] = []
+        for key, meta in self._manifest["pages"].items():
+            emb = self._load_page(meta)
+            if emb is not None:
+                if normalize:
+                    norms = np.linalg.norm(emb, axis=-1, keepdims=True)
+                    emb = (emb / np.maximum(norms, 1e-12)).astype(emb.dtype)
+                pages.append((key, emb))
+
+        old_shard = self._manifest.get("shard")
+        generation = old_shard["generation"] + 1 if old_shard else 0
+        shard_file = f"embeddings-{generation}.bin"
+        dtype = np.result_type(*(emb.dtype for _, emb in pages)) if pages else np.float16
+        dim = pages[0][1].shape[1] if pages else 0
+
+        new_pages: dict[str, dict[str, Any]] = {}
+        offset = 0
+        with open(self.index_dir / shard_file, "wb") as f:
+            for key, emb in pages:
+                f.write(np.ascontiguousarray(emb, dtype=dtype).tobytes())
+                new_pages[key] = {"offset": offset, "shape": list(emb.shape)}
+                offset += emb.shape[0]
+
+        loose_files = [
+            self.embeddings_dir / meta["file"]
+            for meta in self._manifest["pages"].values()
+            if "file" in meta
+        ]
+
+        self._manifest["pages"] = new_pages
+        self._manifest["normalized"] = True
+        self._manifest["shard"] = {
+            "file": shard_file,
+            "generation": generation,
+            "dtype": np.dtype(dtype).name,
+            "rows": offset,
+            "dim": dim,
+        }
+        self._write_manifest()
+
+        self._shard = None
+        self._page_keys = None
+        self._stacked = None
+        self._open_shard()
+
+        for filepath in loose_files:
+            filepath.unlink(missing_ok=True)
+        if old_shard:
+            (self.index_dir / old_shard["file"]).unlink(missing_ok=True)
+        # Every padded copy pointed into the old shard's page table
+        self._remove_stale_stacked()
+
+    def _open_shard(self) -> None:
+        shard = self._manifest.get("shard")
+        if not shard or shard["rows"] == 0:
+            return
+        self._shard = np.memmap(
+            self.index_dir / shard["file"],
+            dtype=shard["dtype"],
+            mode="r",
+            shape=(shard["rows"], shard["dim"]),
+        )
 
     @classmethod
     def load(cls, index_dir: Path) -> ColQwen2Index:
@@ -105,9 +359,14 @@ class ColQwen2Index:
         if instance.manifest_path.exists():
             with open(instance.manifest_path) as f:
                 instance._manifest = json.load(f)
+            instance._open_shard()
 
         return instance
 
+    @property
+    def normalized(self) -> bool:
+        return bool(self._manifest.get("normalized", False))
+
     @property
     def page_count(self) -> int:
         return len(self._manifest["pages"])
@@ -116,9 +375,13 @@ class ColQwen2Index:
         self._manifest["model"] = model_name
 
     def all_page_keys(self) -> list[tuple[str, int]]:
-        """Return all (doc_id, page_num) tuples in the index."""
-        result = []
-        for key in self._manifest["pages"]:
-            doc_id, page_num_str = key.split(":")
-            result.append((doc_id, int(page_num_str)))
-        return result
+        """Return all (doc_id, page_num) tuples in the index.
+
+        The list is cached and shared between calls; do not mutate it.
+        """
+        if self._page_keys is None:
+            self._page_keys = []
+            for key in self._manifest["pages"]:
+                doc_id, page_num_str = key.split(":")
+                self._page_keys.append((doc_id, int(page_num_str)))
+        return self._page_keys
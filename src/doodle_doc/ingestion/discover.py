@@ -1,6 +1,9 @@
 from __future__ import annotations
 
 import hashlib
+import os
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
 
@@ -10,35 +13,71 @@ class PDFFile:
     path: Path
     sha256: str
     size_bytes: int
+    mtime_ns: int = 0
+    # Filled in by the pipeline only for PDFs it will index, so unchanged
+    # files are never opened just to count pages
+    num_pages: int | None = None
+
+
+HASH_BUFFER_SIZE = 1 << 20
 
 
 def compute_sha256(path: Path) -> str:
-    """Compute SHA256 hash of a file."""
+    """Compute SHA256 hash of a file.
+
+    Reads into a single reusable 1 MiB buffer so large PDFs never need a
+    full-size allocation.
+    """
     hasher = hashlib.sha256()
-    with open(path, "rb") as f:
-        for chunk in iter(lambda: f.read(8192), b""):
-            hasher.update(chunk)
+    buf = bytearray(HASH_BUFFER_SIZE)
+    view = memoryview(buf)
+    with open(path, "rb", buffering=0) as f:
+        while n := f.readinto(buf):
+            hasher.update(view[:n])
     return hasher.hexdigest()
 
 
-def discover_pdfs(root: Path) -> list[PDFFile]:
+def discover_pdfs(
+    root: Path,
+    hash_cache: Mapping[str, tuple[int, int, str]] | None = None,
+    workers: int | None = None,
+) -> list[PDFFile]:
     """
     Walk directory recursively and find all PDF files.
 
-    Returns list of PDFFile with path and hash.
+    Returns list of PDFFile with path and hash. Files whose mtime and size
+    match their hash_cache entry (path -> (mtime_ns, size_bytes, sha256))
+    reuse the cached hash instead of being read; the rest are hashed on a
+    thread pool (hashlib releases the GIL on large updates).
     """
-    pdfs = []
-
-    for pdf_path in root.rglob("*.pdf"):
-        if pdf_path.is_file():
-            sha256 = compute_sha256(pdf_path)
-            pdfs.append(PDFFile(
-                path=pdf_path,
-                sha256=sha256,
-                size_bytes=pdf_path.stat().st_size,
-            ))
-
-    return pdfs
+    found = [
+        (pdf_path, pdf_path.stat())
+        for pdf_path in root.rglob("*.pdf")
+        if pdf_path.is_file()
+    ]
+
+    hashes: dict[Path, str] = {}
+    to_hash: list[Path] = []
+    for pdf_path, st in found:
+        cached = hash_cache.get(str(pdf_path)) if hash_cache else None
+        if cached and cached[:2] == (st.st_mtime_ns, st.st_size):
+            hashes[pdf_path] = cached[2]
+        else:
+            to_hash.append(pdf_path)
+
+    if to_hash:
+        with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+            hashes.update(zip(to_hash, pool.map(compute_sha256, to_hash)))
+
+    return [
+        PDFFile(
+            path=pdf_path,
+            sha256=hashes[pdf_path],
+            size_bytes=st.st_size,
+            mtime_ns=st.st_mtime_ns,
+        )
+        for pdf_path, st in found
+    ]
 
 
 def filter_unchanged(
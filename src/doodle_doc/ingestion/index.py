@@ -1,20 +1,79 @@
 from __future__ import annotations
 
-import json
 from pathlib import Path
 from typing import Any
 
 import faiss
 import numpy as np
+import orjson
+
+from doodle_doc.core.config import FAISSIndexType
+
+# HNSW graph parameters: near-exact recall at logarithmic query cost.
+# Searches still explore at least k candidates when k > efSearch.
+HNSW_M = 32
+HNSW_EF_CONSTRUCTION = 40
+HNSW_EF_SEARCH = 16
+
+# HNSW type a large index of each exhaustive type is promoted to, keeping vector precision
+HNSW_PROMOTIONS: dict[FAISSIndexType, FAISSIndexType] = {
+    "IndexFlatIP": "IndexHNSWFlat",
+    "IndexScalarQuantizerFP16": "IndexHNSWSQFP16",
+}
+
+# Scratch memory per GPU mirror; the default reserves a large share of the card
+GPU_TEMP_MEMORY_BYTES = 64 * 1024 * 1024
+
+# Rows of fp16 codes widened to float32 at a time; small enough to stay in cache
+FP16_SCORE_CHUNK_ROWS = 512
+
+# Exhaustive index types whose stored vectors _search_flat can score directly
+FLAT_SEARCH_TYPES: tuple[FAISSIndexType, ...] = ("IndexFlatIP", "IndexScalarQuantizerFP16")
+
+
+def _new_faiss_index(index_type: FAISSIndexType, embedding_dim: int) -> faiss.Index:
+    if index_type in ("IndexHNSWFlat", "IndexHNSWSQFP16"):
+        index: faiss.Index
+        if index_type == "IndexHNSWSQFP16":
+            index = faiss.IndexHNSWSQ(
+                embedding_dim, faiss.ScalarQuantizer.QT_fp16, HNSW_M, faiss.METRIC_INNER_PRODUCT
+            )
+        else:
+            index = faiss.IndexHNSWFlat(embedding_dim, HNSW_M, faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+        index.hnsw.efSearch = HNSW_EF_SEARCH
+        return index
+    if index_type == "IndexScalarQuantizerFP16":
+        # fp16 needs no training; vectors are decoded on the fly during search
+        return faiss.IndexScalarQuantizer(
+            embedding_dim, faiss.ScalarQuantizer.QT_fp16, faiss.METRIC_INNER_PRODUCT
+        )
+    return faiss.IndexFlatIP(embedding_dim)
 
 
 class FAISSIndex:
     """FAISS index for SigLIP2 embeddings."""
 
-    def __init__(self, embedding_dim: int = 1152) -> None:
+    def __init__(
+        self,
+        embedding_dim: int = 1152,
+        index_type: FAISSIndexType = "IndexFlatIP",
+    ) -> None:
         self.embedding_dim = embedding_dim
-        self.index = faiss.IndexFlatIP(embedding_dim)
+        self.index_type = index_type
+        self.index = _new_faiss_index(index_type, embedding_dim)
         self.id_to_metadata: list[dict[str, Any]] = []
+        # Row ids per (doc_id, page_num), built on first lookup and kept in step by add()
+        self._page_rows: dict[tuple[str, int], list[int]] | None = None
+        # Built on first row_pages() and dropped whenever rows change
+        self._row_pages: tuple[np.ndarray, list[tuple[str, int]]] | None = None
+        # GPU copy used for search once use_gpu() succeeds; self.index stays authoritative
+        self._gpu_resources: Any = None
+        self._gpu_index: faiss.Index | None = None
+        # What metadata.jsonl under _saved_path holds, so save() can append
+        self._saved_path: Path | None = None
+        self._saved_count = 0
+        self._saved_bytes = 0
 
     def add(
         self,
@@ -25,10 +84,45 @@ class FAISSIndex:
         assert embeddings.shape[0] == len(metadata)
         assert embeddings.shape[1] == self.embedding_dim
 
-        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+        # faiss needs C-contiguous float32; only copy when the input isn't already
+        if embeddings.dtype != np.float32 or not embeddings.flags.c_contiguous:
+            embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
 
+        start = self.index.ntotal
         self.index.add(embeddings)
+        if self._gpu_index is not None:
+            self._gpu_index.add(embeddings)
         self.id_to_metadata.extend(metadata)
+        self._row_pages = None
+        if self._page_rows is not None:
+            self._index_page_rows(metadata, start)
+
+    def _index_page_rows(self, metadata: list[dict[str, Any]], start: int) -> None:
+        assert self._page_rows is not None
+        for row, meta in enumerate(metadata, start):
+            key = (meta["doc_id"], meta["page_num"])
+            self._page_rows.setdefault(key, []).append(row)
+
+    def _rows_for_page(self, doc_id: str, page_num: int) -> list[int]:
+        if self._page_rows is None:
+            self._page_rows = {}
+            self._index_page_rows(self.id_to_metadata, 0)
+        return self._page_rows.get((doc_id, page_num), [])
+
+    def has_page(self, doc_id: str, page_num: int) -> bool:
+        return bool(self._rows_for_page(doc_id, page_num))
+
+    def get_page(
+        self,
+        doc_id: str,
+        page_num: int,
+    ) -> tuple[np.ndarray, list[dict[str, Any]]] | None:
+        """Return the stored vectors and metadata of one page, or None if it has none."""
+        rows = self._rows_for_page(doc_id, page_num)
+        if not rows:
+            return None
+        vectors = np.stack([self.index.reconstruct(row) for row in rows])
+        return vectors, [self.id_to_metadata[row] for row in rows]
 
     def search(
         self,
@@ -40,25 +134,173 @@ class FAISSIndex:
 
         Returns: List of (metadata, score) tuples, sorted by score descending
         """
-        query = np.ascontiguousarray(query.reshape(1, -1), dtype=np.float32)
+        scores, rows = self.search_rows(query.reshape(1, -1), k)
+        return self._hits(scores[0], rows[0])
+
+    def search_batch(
+        self,
+        queries: np.ndarray,
+        k: int = 100,
+    ) -> list[list[tuple[dict[str, Any], float]]]:
+        """Search a (num_queries, dim) matrix in one call; one result list per row."""
+        scores, rows = self.search_rows(queries, k)
+        return [self._hits(row_scores, row_ids) for row_scores, row_ids in zip(scores, rows)]
+
+    def search_rows(
+        self,
+        queries: np.ndarray,
+        k: int = 100,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Search a (num_queries, dim) matrix and return (scores, row ids) arrays.
+
+        Each row is sorted by descending score; row ids of -1 pad results
+        when fewer than k vectors exist. FAISS spreads a multi-query search
+        across its OpenMP threads and scores it as one matrix product.
+        """
+        queries = np.ascontiguousarray(queries, dtype=np.float32).reshape(-1, self.embedding_dim)
+        if (
+            self._gpu_index is None
+            and self.index_type in FLAT_SEARCH_TYPES
+            and len(queries) == 1
+        ):
+            return self._search_flat(queries[0], k)
 
-        scores, indices = self.index.search(query, k)
+        index = self.index if self._gpu_index is None else self._gpu_index
+        scores, rows = index.search(queries, k)
+        return scores, rows
 
-        results = []
-        for score, idx in zip(scores[0], indices[0]):
-            if idx >= 0:
-                results.append((self.id_to_metadata[idx], float(score)))
+    def _search_flat(
+        self,
+        query: np.ndarray,
+        k: int,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Exact single-query search as BLAS matrix-vector products.
+
+        Exhaustive faiss indexes parallelize over queries, so a lone query
+        runs on one thread. Scoring a zero-copy view of the stored vectors
+        with NumPy and partially sorting the top k is much faster for nq=1.
+        fp16 codes are widened a cache-sized chunk at a time, so only half
+        the bytes of a float32 index are read from memory. Results are
+        padded to k like faiss: row -1 with the lowest float32 score.
+        """
+        ntotal = self.index.ntotal
+        out_scores = np.full((1, k), np.finfo(np.float32).min, dtype=np.float32)
+        out_rows = np.full((1, k), -1, dtype=np.int64)
+        if ntotal == 0:
+            return out_scores, out_rows
+
+        if self.index_type == "IndexScalarQuantizerFP16":
+            # QT_fp16 codes are the vectors' IEEE half-precision bytes
+            codes = faiss.rev_swig_ptr(self.index.codes.data(), ntotal * self.embedding_dim * 2)
+            vectors = codes.view(np.float16).reshape(ntotal, self.embedding_dim)
+            scores = np.empty(ntotal, dtype=np.float32)
+            for start in range(0, ntotal, FP16_SCORE_CHUNK_ROWS):
+                chunk = vectors[start : start + FP16_SCORE_CHUNK_ROWS].astype(np.float32)
+                scores[start : start + FP16_SCORE_CHUNK_ROWS] = chunk @ query
+        else:
+            vectors = faiss.rev_swig_ptr(self.index.get_xb(), ntotal * self.embedding_dim)
+            vectors = vectors.reshape(ntotal, self.embedding_dim)
+            scores = vectors @ query
+
+        if k < ntotal:
+            top = np.argpartition(-scores, k)[:k]
+        else:
+            top = np.arange(ntotal)
+        top = top[np.argsort(-scores[top])]
+
+        out_scores[0, : len(top)] = scores[top]
+        out_rows[0, : len(top)] = top
+        return out_scores, out_rows
+
+    def row_pages(self) -> tuple[np.ndarray, list[tuple[str, int]]]:
+        """Page id of every row, and the (doc_id, page_num) each page id stands for.
+
+        Lets callers group search hits by page with NumPy instead of
+        building a key per hit.
+        """
+        if self._row_pages is None:
+            ids: dict[tuple[str, int], int] = {}
+            row_ids = np.fromiter(
+                (
+                    ids.setdefault((meta["doc_id"], meta["page_num"]), len(ids))
+                    for meta in self.id_to_metadata
+                ),
+                dtype=np.int64,
+                count=len(self.id_to_metadata),
+            )
+            self._row_pages = (row_ids, list(ids))
+        return self._row_pages
 
-        return results
+    def _hits(
+        self,
+        scores: np.ndarray,
+        indices: np.ndarray,
+    ) -> list[tuple[dict[str, Any], float]]:
+        # Row ids are positions in id_to_metadata, so each hit is one list index.
+        # tolist() converts in C rather than boxing a NumPy scalar per hit;
+        # faiss pads with -1 when fewer than k vectors are found.
+        metadata = self.id_to_metadata
+        return [
+            (metadata[idx], score)
+            for score, idx in zip(scores.tolist(), indices.tolist())
+            if idx >= 0
+        ]
+
+    def set_ef_search(self, ef_search: int) -> None:
+        """Set how many candidates an HNSW search explores; a no-op for other index types."""
+        if isinstance(self.index, faiss.IndexHNSW):
+            self.index.hnsw.efSearch = ef_search
+
+    def use_gpu(self) -> bool:
+        """Search on a copy of the index on GPU 0, kept in step with add and remove.
+
+        Returns False, leaving search on the CPU, when faiss has no GPU
+        support, no GPU is visible, or the index type (HNSW) has no GPU
+        implementation.
+        """
+        if isinstance(self.index, faiss.IndexHNSW):
+            return False
+        if not hasattr(faiss, "StandardGpuResources") or faiss.get_num_gpus() == 0:
+            return False
+        if self._gpu_resources is None:
+            # Held on the instance: the GPU index is unusable once its resources are freed
+            self._gpu_resources = faiss.StandardGpuResources()
+            self._gpu_resources.setTempMemory(GPU_TEMP_MEMORY_BYTES)
+        self._gpu_index = faiss.index_cpu_to_gpu(self._gpu_resources, 0, self.index)
+        return True
+
+    def _refresh_gpu(self) -> None:
+        # After self.index is replaced, rebuild the GPU copy if there was one
+        if self._gpu_index is not None:
+            self._gpu_index = None
+            self.use_gpu()
 
     def save(self, path: Path) -> None:
-        """Save index and metadata to disk."""
+        """Save index and metadata to disk.
+
+        Metadata is stored as JSON Lines. Records added since the last save
+        to the same path are appended; the file is rewritten only after a
+        removal or if it changed underneath us.
+        """
         path.mkdir(parents=True, exist_ok=True)
 
         faiss.write_index(self.index, str(path / "faiss.index"))
 
-        with open(path / "metadata.json", "w") as f:
-            json.dump(self.id_to_metadata, f)
+        metadata_path = path / "metadata.jsonl"
+        appendable = (
+            self._saved_path == path
+            and metadata_path.exists()
+            and metadata_path.stat().st_size == self._saved_bytes
+        )
+        start = self._saved_count if appendable else 0
+        with open(metadata_path, "ab" if appendable else "wb") as f:
+            for meta in self.id_to_metadata[start:]:
+                f.write(orjson.dumps(meta, option=orjson.OPT_APPEND_NEWLINE))
+        self._saved_bytes = metadata_path.stat().st_size
+        self._saved_path = path
+        self._saved_count = len(self.id_to_metadata)
+
+        (path / "metadata.json").unlink(missing_ok=True)
 
     @classmethod
     def load(cls, path: Path) -> FAISSIndex:
@@ -67,12 +309,40 @@ class FAISSIndex:
 
         instance.index = faiss.read_index(str(path / "faiss.index"))
         instance.embedding_dim = instance.index.d
+        if isinstance(instance.index, faiss.IndexHNSWSQ):
+            instance.index_type = "IndexHNSWSQFP16"
+        elif isinstance(instance.index, faiss.IndexHNSWFlat):
+            instance.index_type = "IndexHNSWFlat"
+        elif isinstance(instance.index, faiss.IndexScalarQuantizer):
+            instance.index_type = "IndexScalarQuantizerFP16"
 
-        with open(path / "metadata.json") as f:
-            instance.id_to_metadata = json.load(f)
+        metadata_path = path / "metadata.jsonl"
+        if metadata_path.exists():
+            # One orjson call over the lines joined into an array, not one per record
+            lines = metadata_path.read_bytes().rstrip(b"\n")
+            instance.id_to_metadata = (
+                orjson.loads(b"[" + lines.replace(b"\n", b",") + b"]") if lines else []
+            )
+            instance._saved_bytes = metadata_path.stat().st_size
+            instance._saved_path = path
+            instance._saved_count = len(instance.id_to_metadata)
+        else:
+            # Indexes saved before metadata.jsonl; rewritten as JSONL on next save
+            instance.id_to_metadata = orjson.loads((path / "metadata.json").read_bytes())
 
         return instance
 
+    def convert(self, index_type: FAISSIndexType) -> None:
+        """Rebuild the index as index_type, keeping vectors and metadata."""
+        if index_type == self.index_type:
+            return
+        new_index = _new_faiss_index(index_type, self.embedding_dim)
+        if self.index.ntotal:
+            new_index.add(self.index.reconstruct_n(0, self.index.ntotal))
+        self.index = new_index
+        self.index_type = index_type
+        self._refresh_gpu()
+
     @property
     def size(self) -> int:
         """Number of vectors in the index."""
@@ -93,10 +363,15 @@ class FAISSIndex:
 
         # Rebuild index with remaining vectors
         if indices_to_keep:
-            vectors = np.array([self.index.reconstruct(i) for i in indices_to_keep])
-            self.index = faiss.IndexFlatIP(self.embedding_dim)
+            # One bulk reconstruct and a fancy-index, not a Python list of rows
+            vectors = self.index.reconstruct_n(0, self.index.ntotal)[indices_to_keep]
+            self.index = _new_faiss_index(self.index_type, self.embedding_dim)
             self.index.add(vectors)
         else:
-            self.index = faiss.IndexFlatIP(self.embedding_dim)
+            self.index = _new_faiss_index(self.index_type, self.embedding_dim)
 
         self.id_to_metadata = new_metadata
+        self._page_rows = None
+        self._row_pages = None
+        self._refresh_gpu()
+        self._saved_path = None  # force a full metadata rewrite
@@ -1,22 +1,31 @@
 from __future__ import annotations
 
+import queue
+import shutil
+import threading
 import uuid
+from contextlib import closing
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
-from typing import Callable
+from typing import TYPE_CHECKING, Any, Callable
+
 import numpy as np
+from PIL import Image
 
 from doodle_doc.core.config import Settings
 from doodle_doc.core.database import Database, DocumentModel, PageModel
-from doodle_doc.ingestion.colqwen_embed import ColQwen2Embedder
 from doodle_doc.ingestion.colqwen_index import ColQwen2Index
 from doodle_doc.ingestion.discover import PDFFile, discover_pdfs, filter_unchanged
 from doodle_doc.ingestion.embed import SigLIP2Embedder
-from doodle_doc.ingestion.index import FAISSIndex
+from doodle_doc.ingestion.index import HNSW_PROMOTIONS, FAISSIndex
 from doodle_doc.ingestion.preprocess import normalize_ink
-from doodle_doc.ingestion.regions import extract_regions
-from doodle_doc.ingestion.render import render_page, extract_text_layer, get_page_count
+from doodle_doc.ingestion.regions import REGION_NAMES, page_region_boxes
+from doodle_doc.ingestion.render import get_page_count, iter_pages
+
+if TYPE_CHECKING:
+    from doodle_doc.ingestion.colqwen_embed import ColQwen2Embedder
 
 
 @dataclass
@@ -38,14 +47,36 @@ class IndexingJob:
 ProgressCallback = Callable[[IndexingProgress], None]
 
 
+@dataclass
+class _PendingPage:
+    page_num: int
+    image: Image.Image
+    text_layer: str | None
+    pixel_sha256: str
+    # Ink-normalized page, or None when the page reuses embeddings from reused_from
+    normalized: Future[np.ndarray | None]
+    reused_from: tuple[str, int] | None = None
+
+
+@dataclass
+class _DocEmbeddings:
+    """Embeddings gathered across a document, added to the indexes once at the end."""
+
+    region_embeddings: list[np.ndarray] = field(default_factory=list)
+    region_metadata: list[dict[str, Any]] = field(default_factory=list)
+    colqwen_pages: list[tuple[str, int, np.ndarray]] = field(default_factory=list)
+
+
 class IngestionPipeline:
     def __init__(
         self,
         settings: Settings,
         embedder: SigLIP2Embedder | None = None,
         colqwen_embedder: ColQwen2Embedder | None = None,
+        workers: int = 1,
     ) -> None:
         self.settings = settings
+        self.workers = max(1, workers)
         self._embedder = embedder
         self._colqwen_embedder = colqwen_embedder
         self._index: FAISSIndex | None = None
@@ -67,7 +98,9 @@ class IngestionPipeline:
             if (index_path / "faiss.index").exists():
                 self._index = FAISSIndex.load(index_path)
             else:
-                self._index = FAISSIndex(self.settings.embedding_dim)
+                self._index = FAISSIndex(
+                    self.settings.embedding_dim, self.settings.faiss_index_type
+                )
         return self._index
 
     @property
@@ -80,6 +113,9 @@ class IngestionPipeline:
     @property
     def colqwen_embedder(self) -> ColQwen2Embedder:
         if self._colqwen_embedder is None:
+            # Only imported once ColQwen2 indexing is actually used
+            from doodle_doc.ingestion.colqwen_embed import ColQwen2Embedder
+
             self._colqwen_embedder = ColQwen2Embedder(
                 model_name=self.settings.colqwen_model,
             )
@@ -106,25 +142,47 @@ class IngestionPipeline:
         progress = IndexingProgress(status="discovering")
         self._notify(on_progress, progress)
 
-        pdfs = discover_pdfs(root)
+        # A forced reindex also distrusts the (mtime, size) hash cache
+        if force_reindex:
+            self.db.clear_file_hashes()
+        hash_cache = self.db.get_file_hashes()
+        pdfs = discover_pdfs(root, hash_cache)
+        self.db.set_file_hashes(
+            (str(p.path), p.mtime_ns, p.size_bytes, p.sha256)
+            for p in pdfs
+            if hash_cache.get(str(p.path)) != (p.mtime_ns, p.size_bytes, p.sha256)
+        )
 
         if not force_reindex:
-            existing = {doc.sha256 for doc in self.db.get_all_documents()}
+            existing = {
+                doc.sha256 for doc in self.db.get_documents_by_sha256(p.sha256 for p in pdfs)
+            }
             pdfs = filter_unchanged(pdfs, existing)
 
         progress.docs_total = len(pdfs)
-        progress.pages_total = sum(get_page_count(str(p.path)) for p in pdfs)
+        for pdf in pdfs:
+            pdf.num_pages = get_page_count(str(pdf.path))
+        progress.pages_total = sum(pdf.num_pages or 0 for pdf in pdfs)
         progress.status = "indexing"
         self._notify(on_progress, progress)
 
-        for pdf in pdfs:
-            progress.current_doc = pdf.path.name
-            self._notify(on_progress, progress)
-
-            self._process_pdf(pdf, progress, on_progress)
-            progress.docs_done += 1
-            self._notify(on_progress, progress)
-
+        with ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="ingest-prep"
+        ) as pool:
+            for pdf in pdfs:
+                progress.current_doc = pdf.path.name
+                self._notify(on_progress, progress)
+
+                self._process_pdf_with_pool(
+                    pdf, progress, on_progress, pool, reuse_pages=not force_reindex
+                )
+                progress.docs_done += 1
+                self._notify(on_progress, progress)
+
+        threshold = self.settings.faiss_hnsw_threshold
+        hnsw_type = HNSW_PROMOTIONS.get(self.index.index_type)
+        if threshold and hnsw_type and self.index.size > threshold:
+            self.index.convert(hnsw_type)
         self.index.save(self.settings.index_dir)
 
         if self.settings.colqwen_index_enabled:
@@ -139,67 +197,256 @@ class IngestionPipeline:
         pdf: PDFFile,
         progress: IndexingProgress,
         on_progress: ProgressCallback | None,
+        reuse_pages: bool = True,
+    ) -> None:
+        """Process a single PDF file on a worker pool of its own."""
+        with ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="ingest-prep"
+        ) as pool:
+            self._process_pdf_with_pool(pdf, progress, on_progress, pool, reuse_pages)
+
+    def _process_pdf_with_pool(
+        self,
+        pdf: PDFFile,
+        progress: IndexingProgress,
+        on_progress: ProgressCallback | None,
+        pool: ThreadPoolExecutor,
+        reuse_pages: bool = True,
     ) -> None:
-        """Process a single PDF file."""
+        """
+        Process a single PDF file, sharing the caller's worker pool.
+
+        A dedicated render thread is the only one touching PyMuPDF (which
+        is not thread-safe); it hands the PNG writes and ink normalization
+        to the worker pool and queues pages at most 2 * workers ahead.
+        Embedding stays on this thread and consumes pages in order, so the
+        model forward for one page overlaps rendering of the next.
+
+        With reuse_pages, a page whose rendered pixels match an already
+        indexed page copies that page's embeddings instead of re-embedding,
+        so editing one page of a long PDF only re-embeds that page.
+        """
         doc_id = str(uuid.uuid4())
-        num_pages = get_page_count(str(pdf.path))
-        num_pages = min(num_pages, self.settings.max_pages_per_doc)
+        if pdf.num_pages is None:
+            pdf.num_pages = get_page_count(str(pdf.path))
+        num_pages = min(pdf.num_pages, self.settings.max_pages_per_doc)
 
         doc = DocumentModel(
             doc_id=doc_id,
             path=str(pdf.path),
             sha256=pdf.sha256,
-            modified_time=datetime.fromtimestamp(pdf.path.stat().st_mtime),
+            modified_time=self._modified_time(pdf),
             num_pages=num_pages,
         )
-        self.db.add_document(doc)
 
         rendered_dir = self.settings.rendered_dir / doc_id
         rendered_dir.mkdir(parents=True, exist_ok=True)
+        thumbnails_dir = self.settings.thumbnails_dir / doc_id
+        thumbnails_dir.mkdir(parents=True, exist_ok=True)
+
+        pages: list[PageModel] = []
+        doc_embeddings = _DocEmbeddings()
+        pending: queue.Queue[_PendingPage | None] = queue.Queue(maxsize=2 * self.workers)
+        stop = threading.Event()
+
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="ingest-render") as renderer:
+            rendered = renderer.submit(
+                self._render_pages,
+                pdf.path, num_pages, rendered_dir, thumbnails_dir, pool, pending, stop,
+                reuse_pages,
+            )
+            page: _PendingPage | None = None
+            try:
+                while (page := pending.get()) is not None:
+                    pages.append(self._embed_page(doc_id, page, doc_embeddings))
+                    progress.pages_done += 1
+                    self._notify(on_progress, progress)
+            finally:
+                # On error, let the renderer wind down and post its end marker
+                stop.set()
+                while page is not None:
+                    page = pending.get()
+            rendered.result()
+
+        # The document row is written with its pages, so a failed PDF leaves no orphan
+        self.db.add_document_with_pages(doc, pages)
+        if doc_embeddings.region_embeddings:
+            self.index.add(
+                np.concatenate(doc_embeddings.region_embeddings),
+                doc_embeddings.region_metadata,
+            )
+        if doc_embeddings.colqwen_pages:
+            self.colqwen_index.add_batch(doc_embeddings.colqwen_pages)
 
-        for page_num in range(num_pages):
-            img = render_page(str(pdf.path), page_num, self.settings.render_dpi)
+    @staticmethod
+    def _modified_time(pdf: PDFFile) -> datetime:
+        # Reuse the stat taken during discovery when there was one
+        if pdf.mtime_ns:
+            return datetime.fromtimestamp(pdf.mtime_ns / 1e9)
+        return datetime.fromtimestamp(pdf.path.stat().st_mtime)
 
-            img_path = rendered_dir / f"{page_num}.png"
-            img.save(img_path)
+    def _render_pages(
+        self,
+        pdf_path: Path,
+        num_pages: int,
+        rendered_dir: Path,
+        thumbnails_dir: Path,
+        pool: ThreadPoolExecutor,
+        out: queue.Queue[_PendingPage | None],
+        stop: threading.Event,
+        reuse_pages: bool,
+    ) -> None:
+        """Render pages in order onto out, ending with None even on failure."""
+        try:
+            # closing() shuts the PDF even when we stop early
+            with closing(iter_pages(str(pdf_path), num_pages, self.settings.render_dpi)) as pages:
+                for page_num, img, text_layer, pixel_sha256 in pages:
+                    if stop.is_set():
+                        return
+                    source = self._reusable_page(pixel_sha256) if reuse_pages else None
+                    normalized: Future[np.ndarray | None]
+                    if source is None:
+                        normalized = pool.submit(
+                            self._prepare_page, img, rendered_dir, thumbnails_dir, page_num
+                        )
+                    else:
+                        normalized = pool.submit(
+                            self._copy_page_images,
+                            source, img, rendered_dir, thumbnails_dir, page_num,
+                        )
+                    out.put(_PendingPage(
+                        page_num, img, text_layer, pixel_sha256, normalized, source
+                    ))
+        finally:
+            out.put(None)
+
+    def _reusable_page(self, pixel_sha256: str) -> tuple[str, int] | None:
+        """Find an indexed page with identical pixels whose embeddings are all present."""
+        for doc_id, page_num in self.db.find_pages_by_pixel_sha256(pixel_sha256):
+            if not self.index.has_page(doc_id, page_num):
+                continue
+            if self.settings.colqwen_index_enabled and not self.colqwen_index.has_page(
+                doc_id, page_num
+            ):
+                continue
+            return doc_id, page_num
+        return None
+
+    def _save_page_images(
+        self,
+        img: Image.Image,
+        rendered_dir: Path,
+        thumbnails_dir: Path,
+        page_num: int,
+    ) -> None:
+        img.save(rendered_dir / f"{page_num}.png")
 
-            text_layer = extract_text_layer(str(pdf.path), page_num)
+        thumb = img.copy()
+        thumb.thumbnail((self.settings.thumbnail_width, img.height), Image.Resampling.LANCZOS)
+        thumb.save(thumbnails_dir / f"{page_num}.png")
 
-            page = PageModel(
-                doc_id=doc_id,
-                page_num=page_num,
-                width_px=img.width,
-                height_px=img.height,
-                text_layer=text_layer,
+    def _copy_page_images(
+        self,
+        source: tuple[str, int],
+        img: Image.Image,
+        rendered_dir: Path,
+        thumbnails_dir: Path,
+        page_num: int,
+    ) -> None:
+        """Copy the source page's PNGs, which hold identical pixels, instead of re-encoding."""
+        src_doc, src_page = source
+        try:
+            shutil.copyfile(
+                self.settings.rendered_dir / src_doc / f"{src_page}.png",
+                rendered_dir / f"{page_num}.png",
             )
-            self.db.add_page(page)
-
-            normalized = normalize_ink(
-                img,
-                self.settings.clahe_clip_limit,
-                self.settings.clahe_grid_size,
+            shutil.copyfile(
+                self.settings.thumbnails_dir / src_doc / f"{src_page}.png",
+                thumbnails_dir / f"{page_num}.png",
             )
-            regions = extract_regions(normalized)
-
-            embeddings = []
-            metadata = []
-            for region_name, region_img in regions.items():
-                emb = self.embedder.embed_single(region_img)
-                embeddings.append(emb)
-                metadata.append({
-                    "doc_id": doc_id,
-                    "page_num": page_num,
-                    "region": region_name,
-                })
-
-            self.index.add(np.array(embeddings), metadata)
-
-            if self.settings.colqwen_index_enabled:
-                colqwen_emb = self.colqwen_embedder.embed_single(img)
-                self.colqwen_index.add(doc_id, page_num, colqwen_emb)
-
-            progress.pages_done += 1
-            self._notify(on_progress, progress)
+        except FileNotFoundError:
+            self._save_page_images(img, rendered_dir, thumbnails_dir, page_num)
+
+    def _prepare_page(
+        self,
+        img: Image.Image,
+        rendered_dir: Path,
+        thumbnails_dir: Path,
+        page_num: int,
+    ) -> np.ndarray:
+        """Write the page render and thumbnail, then return the ink-normalized page."""
+        self._save_page_images(img, rendered_dir, thumbnails_dir, page_num)
+
+        return normalize_ink(
+            img,
+            self.settings.clahe_clip_limit,
+            self.settings.clahe_grid_size,
+        )
+
+    def _embed_page(
+        self,
+        doc_id: str,
+        page: _PendingPage,
+        doc_embeddings: _DocEmbeddings,
+    ) -> PageModel:
+        """Embed a prepared page into doc_embeddings and build its DB row."""
+        normalized = page.normalized.result()
+        if normalized is None:
+            self._copy_embeddings(doc_id, page, doc_embeddings)
+        else:
+            self._embed_regions_and_page(doc_id, page, normalized, doc_embeddings)
+
+        return PageModel(
+            doc_id=doc_id,
+            page_num=page.page_num,
+            width_px=page.image.width,
+            height_px=page.image.height,
+            text_layer=page.text_layer,
+            pixel_sha256=page.pixel_sha256,
+        )
+
+    def _copy_embeddings(
+        self,
+        doc_id: str,
+        page: _PendingPage,
+        doc_embeddings: _DocEmbeddings,
+    ) -> None:
+        """Reuse the embeddings of the indexed page with identical pixels."""
+        assert page.reused_from is not None
+        src_doc, src_page = page.reused_from
+
+        stored = self.index.get_page(src_doc, src_page)
+        assert stored is not None
+        vectors, metadata = stored
+        doc_embeddings.region_embeddings.append(vectors)
+        doc_embeddings.region_metadata.extend(
+            {**meta, "doc_id": doc_id, "page_num": page.page_num} for meta in metadata
+        )
+
+        if self.settings.colqwen_index_enabled:
+            colqwen_emb = self.colqwen_index.get(src_doc, src_page)
+            assert colqwen_emb is not None
+            # Copy out of the shard memmap, which add_batch may reopen
+            doc_embeddings.colqwen_pages.append((doc_id, page.page_num, np.array(colqwen_emb)))
+
+    def _embed_regions_and_page(
+        self,
+        doc_id: str,
+        page: _PendingPage,
+        normalized: np.ndarray,
+        doc_embeddings: _DocEmbeddings,
+    ) -> None:
+        # All regions of a page are cropped on device and embedded in one forward pass
+        boxes = page_region_boxes(*normalized.shape[:2])
+        doc_embeddings.region_embeddings.append(self.embedder.embed_regions(normalized, boxes))
+        doc_embeddings.region_metadata.extend(
+            {"doc_id": doc_id, "page_num": page.page_num, "region": region_name}
+            for region_name in REGION_NAMES
+        )
+
+        if self.settings.colqwen_index_enabled:
+            colqwen_emb = self.colqwen_embedder.embed_single(page.image)
+            doc_embeddings.colqwen_pages.append((doc_id, page.page_num, colqwen_emb))
 
     def _notify(
         self,
@@ -1,7 +1,60 @@
 from __future__ import annotations
 
+from functools import lru_cache
+
 import numpy as np
 
+Box = tuple[int, int, int, int]
+
+# Order of the boxes from page_region_boxes and of the rows embed_regions returns
+REGION_NAMES = ("full", "q1", "q2", "q3", "q4")
+
+
+@lru_cache(maxsize=8)
+def page_region_boxes(
+    height: int,
+    width: int,
+    overlap_pct: float = 0.1,
+) -> tuple[Box, ...]:
+    """(x0, y0, x1, y1) boxes of the regions in REGION_NAMES order.
+
+    Cached per page size: at a fixed render DPI most pages share one size,
+    so the boxes are computed once rather than per page.
+    """
+    overlap_x = int(width * overlap_pct)
+    overlap_y = int(height * overlap_pct)
+
+    mid_x, mid_y = width // 2, height // 2
+
+    return (
+        (0, 0, width, height),
+        (0, 0, mid_x + overlap_x, mid_y + overlap_y),
+        (mid_x - overlap_x, 0, width, mid_y + overlap_y),
+        (0, mid_y - overlap_y, mid_x + overlap_x, height),
+        (mid_x - overlap_x, mid_y - overlap_y, width, height),
+    )
+
+
+def region_boxes(
+    height: int,
+    width: int,
+    overlap_pct: float = 0.1,
+) -> dict[str, Box]:
+    """(x0, y0, x1, y1) boxes of the regions extract_regions cuts."""
+    return dict(zip(REGION_NAMES, page_region_boxes(height, width, overlap_pct)))
+
+
+@lru_cache(maxsize=8)
+def _region_slices(
+    height: int,
+    width: int,
+    overlap_pct: float,
+) -> tuple[tuple[slice, slice], ...]:
+    return tuple(
+        (slice(y0, y1), slice(x0, x1))
+        for x0, y0, x1, y1 in page_region_boxes(height, width, overlap_pct)
+    )
+
 
 def extract_regions(
     img: np.ndarray,
@@ -16,20 +69,15 @@ def extract_regions(
     +-----+-----+
     | q3  | q4  |
     +-----+-----+
+
+    The regions are views that share memory with img ("full" is img
+    itself); copy one before modifying it in place.
     """
     h, w = img.shape[:2]
 
-    overlap_x = int(w * overlap_pct)
-    overlap_y = int(h * overlap_pct)
-
-    mid_x, mid_y = w // 2, h // 2
-
     regions = {
-        "full": img,
-        "q1": img[0 : mid_y + overlap_y, 0 : mid_x + overlap_x],
-        "q2": img[0 : mid_y + overlap_y, mid_x - overlap_x : w],
-        "q3": img[mid_y - overlap_y : h, 0 : mid_x + overlap_x],
-        "q4": img[mid_y - overlap_y : h, mid_x - overlap_x : w],
+        name: img[region]
+        for name, region in zip(REGION_NAMES[1:], _region_slices(h, w, overlap_pct)[1:])
     }
 
-    return regions
+    return {"full": img, **regions}
@@ -1,33 +1,67 @@
 from __future__ import annotations
 
+import hashlib
+from collections.abc import Generator
+
 import fitz
 from PIL import Image
 
 
-def render_page(pdf_path: str, page_num: int, dpi: int = 150) -> Image.Image:
-    """Render a single PDF page to PIL Image."""
-    doc = fitz.open(pdf_path)
-    page = doc[page_num]
-
+def _pixmap(page: fitz.Page, dpi: int) -> fitz.Pixmap:
     zoom = dpi / 72.0
     matrix = fitz.Matrix(zoom, zoom)
+    return page.get_pixmap(matrix=matrix, alpha=False)
 
-    pixmap = page.get_pixmap(matrix=matrix, alpha=False)
-    img = Image.frombytes("RGB", [pixmap.width, pixmap.height], pixmap.samples)
 
-    doc.close()
-    return img
+def _to_image(pixmap: fitz.Pixmap, samples: bytes) -> Image.Image:
+    # samples is already a fresh bytes copy; wrap it rather than copying again
+    return Image.frombuffer(
+        "RGB", (pixmap.width, pixmap.height), samples, "raw", "RGB", pixmap.stride, 1
+    )
 
 
-def extract_text_layer(pdf_path: str, page_num: int) -> str | None:
-    """Extract embedded text from PDF page (if any)."""
-    doc = fitz.open(pdf_path)
-    page = doc[page_num]
+def _render(page: fitz.Page, dpi: int) -> Image.Image:
+    pixmap = _pixmap(page, dpi)
+    return _to_image(pixmap, pixmap.samples)
+
+
+def _text_layer(page: fitz.Page) -> str | None:
     text = page.get_text("text").strip()
-    doc.close()
     return text if text else None
 
 
+def render_page(pdf_path: str, page_num: int, dpi: int = 150) -> Image.Image:
+    """Render a single PDF page to PIL Image."""
+    with fitz.open(pdf_path) as doc:
+        return _render(doc[page_num], dpi)
+
+
+def extract_text_layer(pdf_path: str, page_num: int) -> str | None:
+    """Extract embedded text from PDF page (if any)."""
+    with fitz.open(pdf_path) as doc:
+        return _text_layer(doc[page_num])
+
+
+def iter_pages(
+    pdf_path: str,
+    num_pages: int,
+    dpi: int = 150,
+) -> Generator[tuple[int, Image.Image, str | None, str], None, None]:
+    """Yield (page_num, image, text_layer, pixel_sha256) for the first num_pages pages.
+
+    Opens the PDF once for the whole walk rather than once per page and call.
+    pixel_sha256 hashes the raw rendered samples, so a page whose pixels
+    are unchanged hashes the same even when other pages of the PDF differ.
+    """
+    with fitz.open(pdf_path) as doc:
+        for page_num in range(min(num_pages, len(doc))):
+            page = doc[page_num]
+            pixmap = _pixmap(page, dpi)
+            samples = pixmap.samples
+            pixel_sha256 = hashlib.sha256(samples).hexdigest()
+            yield page_num, _to_image(pixmap, samples), _text_layer(page), pixel_sha256
+
+
 def get_page_count(pdf_path: str) -> int:
     """Get the number of pages in a PDF."""
     doc = fitz.open(pdf_path)
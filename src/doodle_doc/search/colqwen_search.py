@@ -3,6 +3,7 @@ from __future__ import annotations
 import logging
 from pathlib import Path
 
+import numpy as np
 import torch
 from PIL import Image
 
@@ -14,6 +15,20 @@ from doodle_doc.ingestion.colqwen_index import ColQwen2Index
 
 logger = logging.getLogger(__name__)
 
+# Pages scored per einsum; bounds the (pages, query_tokens, doc_tokens) buffer
+SCORE_CHUNK_PAGES = 64
+
+
+def maxsim_chunk(query: torch.Tensor, docs: torch.Tensor, mask: torch.Tensor) -> torch.Tensor:
+    """MaxSim of one (tokens, dim) query against a chunk of padded pages.
+
+    Padding tokens are masked out, similarities are maxed over doc tokens
+    and summed over query tokens. Returns float32 scores of shape (pages,).
+    """
+    sims = torch.einsum("qd,ptd->pqt", query, docs)
+    sims = sims.masked_fill(~mask[:, None, :], float("-inf"))
+    return sims.amax(dim=-1).float().sum(dim=-1)
+
 
 class ColQwen2SearchService:
     """Search service using pre-computed ColQwen2 embeddings."""
@@ -28,6 +43,8 @@ class ColQwen2SearchService:
         self._embedder = embedder
         self._index = index
         self._db: Database | None = None
+        self._doc_tensors: tuple[list[tuple[str, int]], torch.Tensor, torch.Tensor] | None = None
+        self._doc_tensors_source: np.ndarray | None = None
 
     @property
     def embedder(self) -> ColQwen2Embedder:
@@ -41,6 +58,24 @@ class ColQwen2SearchService:
             self._index = ColQwen2Index.load(self.settings.colqwen_index_dir)
         return self._index
 
+    @property
+    def doc_tensors(self) -> tuple[list[tuple[str, int]], torch.Tensor, torch.Tensor]:
+        """Padded page embeddings and token mask on the embedder's device.
+
+        On GPU/MPS the stack is uploaded once as float16 so scoring runs on
+        the accelerator; on CPU the tensors share the index's memory.
+        Rebuilt whenever the index restacks after a change.
+        """
+        page_keys, embeddings, mask = self.index.stacked()
+        if self._doc_tensors is None or self._doc_tensors_source is not embeddings:
+            device = self.embedder.device
+            docs = torch.from_numpy(embeddings)
+            if device != "cpu":
+                docs = docs.to(device, torch.float16)
+            self._doc_tensors = (page_keys, docs, torch.from_numpy(mask).to(device))
+            self._doc_tensors_source = embeddings
+        return self._doc_tensors
+
     @property
     def db(self) -> Database:
         if self._db is None:
@@ -48,9 +83,16 @@ class ColQwen2SearchService:
         return self._db
 
     def is_available(self) -> bool:
-        """Check if ColQwen2 index exists."""
-        manifest_path = self.settings.colqwen_index_dir / "manifest.json"
-        return manifest_path.exists() and self.index.page_count > 0
+        """Check if ColQwen2 index exists.
+
+        The manifest is only stat'ed until the index has been loaded; after
+        that the answer comes from the in-memory page count.
+        """
+        if self._index is None:
+            manifest_path = self.settings.colqwen_index_dir / "manifest.json"
+            if not manifest_path.exists():
+                return False
+        return self.index.page_count > 0
 
     def search(
         self,
@@ -63,30 +105,36 @@ class ColQwen2SearchService:
         if not self.embedder.is_loaded():
             self.embedder.load()
 
-        query_emb = self.embedder.embed_single(sketch_image)
-        query_tensor = torch.from_numpy(query_emb).unsqueeze(0)
-
-        all_pages = self.index.all_page_keys()
-
-        if not all_pages:
+        page_keys, docs, mask = self.doc_tensors
+        if not page_keys:
             logger.warning("No ColQwen2 embeddings found")
             return []
 
-        scores = []
-        for doc_id, page_num in all_pages:
-            doc_emb = self.index.get(doc_id, page_num)
-            if doc_emb is None:
-                continue
+        # CPU half-precision matmuls are slow, so CPU chunks are upcast to float32;
+        # accelerators score in float16 and only the top-k indices come back.
+        compute_dtype = torch.float32 if docs.device.type == "cpu" else torch.float16
+
+        # The embedder already L2-normalizes queries and new index pages
+        query = torch.from_numpy(self.embedder.embed_single(sketch_image))
+        query = query.to(docs.device, compute_dtype)
+        normalize_docs = not self.index.normalized
 
-            doc_tensor = torch.from_numpy(doc_emb).unsqueeze(0)
-            score = self._compute_maxsim(query_tensor, doc_tensor)
-            scores.append((doc_id, page_num, score))
+        scores = torch.empty(len(page_keys), device=docs.device)
+        for start in range(0, len(page_keys), SCORE_CHUNK_PAGES):
+            end = start + SCORE_CHUNK_PAGES
+            chunk = docs[start:end].to(compute_dtype)
+            if normalize_docs:
+                chunk = torch.nn.functional.normalize(chunk, p=2, dim=-1)
+            scores[start:end] = maxsim_chunk(query, chunk, mask[start:end])
 
-        scores.sort(key=lambda x: x[2], reverse=True)
+        top = torch.topk(scores, min(top_k, len(page_keys)))
+
+        top_keys = [page_keys[i] for i in top.indices.tolist()]
+        docs_by_id = self.db.get_documents(doc_id for doc_id, _ in top_keys)
 
         results = []
-        for doc_id, page_num, score in scores[:top_k]:
-            doc = self.db.get_document(doc_id)
+        for score, (doc_id, page_num) in zip(top.values.tolist(), top_keys):
+            doc = docs_by_id.get(doc_id)
             if doc:
                 results.append(SearchResult(
                     doc_id=doc_id,
@@ -98,23 +146,3 @@ class ColQwen2SearchService:
                 ))
 
         return results
-
-    def _compute_maxsim(
-        self,
-        query_emb: torch.Tensor,
-        doc_emb: torch.Tensor,
-    ) -> float:
-        """Compute MaxSim late-interaction score.
-
-        For each query patch, find max similarity to any doc patch,
-        then sum across query patches.
-        """
-        query_norm = torch.nn.functional.normalize(query_emb, p=2, dim=-1)
-        doc_norm = torch.nn.functional.normalize(doc_emb, p=2, dim=-1)
-
-        sim_matrix = torch.matmul(query_norm[0], doc_norm[0].T)
-
-        max_sims = sim_matrix.max(dim=1).values
-        score = max_sims.sum().item()
-
-        return score
@@ -1,24 +1,53 @@
 from __future__ import annotations
 
-from collections import defaultdict
+from collections.abc import Hashable
+from functools import lru_cache
+from typing import TypeVar
+
+import numpy as np
+
+K = TypeVar("K", bound=Hashable)
+
+
+@lru_cache(maxsize=8)
+def _rank_weights(k: int, n: int) -> np.ndarray:
+    """Read-only 1 / (k + rank) for ranks 1..n, shared between calls."""
+    weights = 1.0 / (k + np.arange(1, n + 1, dtype=np.float64))
+    weights.flags.writeable = False
+    return weights
 
 
 def reciprocal_rank_fusion(
-    result_lists: list[list[tuple[str, float]]],
+    result_lists: list[list[tuple[K, float]]],
     k: int = 60,
-) -> list[tuple[str, float]]:
+) -> list[tuple[K, float]]:
     """
     Combine multiple ranked lists using Reciprocal Rank Fusion.
 
     RRF score = sum(1 / (k + rank)) across all lists
     Higher k = less aggressive boosting of top results
     """
-    scores: dict[str, float] = defaultdict(float)
-
-    for result_list in result_lists:
-        for rank, (key, _) in enumerate(result_list, start=1):
-            scores[key] += 1.0 / (k + rank)
+    # Dense ids in first-seen order, so ties keep the order keys first appeared.
+    # Only this key mapping runs in Python; accumulation is a single bincount.
+    key_ids: dict[K, int] = {}
+    ids = np.fromiter(
+        (
+            key_ids.setdefault(key, len(key_ids))
+            for result_list in result_lists
+            for key, _ in result_list
+        ),
+        dtype=np.intp,
+        # Known length: fromiter fills one allocation instead of growing it
+        count=sum(map(len, result_lists)),
+    )
+    if not key_ids:
+        return []
 
-    sorted_results = sorted(scores.items(), key=lambda x: x[1], reverse=True)
+    # One cached rank-weight table, sliced per list rather than recomputed for each
+    rank_weights = _rank_weights(k, max(map(len, result_lists)))
+    weights = np.concatenate([rank_weights[: len(result_list)] for result_list in result_lists])
+    scores = np.bincount(ids, weights=weights, minlength=len(key_ids))
 
-    return sorted_results
+    keys = list(key_ids)
+    order = np.argsort(-scores, kind="stable")
+    return [(keys[i], float(scores[i])) for i in order]
@@ -1,9 +1,12 @@
 from __future__ import annotations
 
-from collections import defaultdict
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
 from pathlib import Path
-from typing import Any
 
+import numpy as np
 from PIL import Image
 
 from doodle_doc.core.config import Settings
@@ -18,6 +21,89 @@ from doodle_doc.search.rerank import ColQwen2Reranker
 from doodle_doc.search.text_search import BM25Index
 
 
+# One query's (scores, row ids) from FAISSIndex.search_rows
+RowHits = tuple[np.ndarray, np.ndarray]
+
+
+class _QueryBatcher:
+    """Coalesces concurrent stage-1 FAISS queries into batched searches.
+
+    A query arriving while no search is running is searched at once, so a
+    lone request never waits on a timer. Queries arriving during a search
+    queue up, and the thread that ran it then searches all of them in one
+    search_rows call. The index and k are fixed per batcher, since one
+    search serves every queued query.
+    """
+
+    def __init__(self, index: FAISSIndex, k: int) -> None:
+        self.index = index
+        self.k = k
+        self._lock = threading.Lock()
+        self._pending: list[tuple[np.ndarray, Future[RowHits]]] = []
+        self._running = False
+
+    def search(self, query: np.ndarray) -> RowHits:
+        future: Future[RowHits] = Future()
+        with self._lock:
+            self._pending.append((query, future))
+            leader = not self._running
+            self._running = True
+        if leader:
+            self._drain()
+        return future.result()
+
+    def _drain(self) -> None:
+        while True:
+            with self._lock:
+                batch, self._pending = self._pending, []
+                if not batch:
+                    self._running = False
+                    return
+            try:
+                queries = np.stack([query for query, _ in batch])
+                scores, rows = self.index.search_rows(queries, self.k)
+            except Exception as exc:  # noqa: BLE001 - every waiting search() re-raises it
+                for _, future in batch:
+                    future.set_exception(exc)
+                continue
+            for i, (_, future) in enumerate(batch):
+                future.set_result((scores[i], rows[i]))
+
+
+class _EmbeddingCache:
+    """Thread-safe LRU of query embeddings keyed by a digest of the normalized sketch."""
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[bytes, np.ndarray] = OrderedDict()
+
+    @staticmethod
+    def key(normalized: np.ndarray) -> bytes:
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(repr(normalized.shape).encode())
+        digest.update(np.ascontiguousarray(normalized).data)
+        return digest.digest()
+
+    def get(self, key: bytes) -> np.ndarray | None:
+        with self._lock:
+            embedding = self._entries.get(key)
+            if embedding is not None:
+                self._entries.move_to_end(key)
+            return embedding
+
+    def put(self, key: bytes, embedding: np.ndarray) -> None:
+        if self.max_size <= 0:
+            return
+        # Cached arrays are shared between requests, so guard against in-place edits
+        embedding.flags.writeable = False
+        with self._lock:
+            self._entries[key] = embedding
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+
 class SearchService:
     """Stage 1 retrieval service using FAISS."""
 
@@ -37,6 +123,8 @@ class SearchService:
         self._reranker = reranker
         self._colqwen_search = colqwen_search
         self._db: Database | None = None
+        self._batcher: _QueryBatcher | None = None
+        self._query_cache = _EmbeddingCache(settings.query_cache_size)
 
     @property
     def embedder(self) -> SigLIP2Embedder:
@@ -48,8 +136,17 @@ class SearchService:
     def index(self) -> FAISSIndex:
         if self._index is None:
             self._index = FAISSIndex.load(self.settings.index_dir)
+            self._index.set_ef_search(self.settings.faiss_hnsw_ef_search)
+            if self.settings.use_gpu_faiss:
+                self._index.use_gpu()
         return self._index
 
+    @property
+    def batcher(self) -> _QueryBatcher:
+        if self._batcher is None:
+            self._batcher = _QueryBatcher(self.index, self.settings.stage1_top_k)
+        return self._batcher
+
     @property
     def bm25(self) -> BM25Index:
         if self._bm25 is None:
@@ -118,34 +215,38 @@ class SearchService:
             self.settings.clahe_grid_size,
         )
 
-        query_embedding = self.embedder.embed_single(normalized)
+        # Re-running the same sketch (post-normalization) skips the SigLIP2 forward
+        cache_key = _EmbeddingCache.key(normalized)
+        query_embedding = self._query_cache.get(cache_key)
+        if query_embedding is None:
+            query_embedding = self.embedder.embed_single(normalized)
+            self._query_cache.put(cache_key, query_embedding)
 
-        raw_results = self.index.search(query_embedding, self.settings.stage1_top_k)
+        scores, rows = self.batcher.search(query_embedding)
 
-        page_scores = self._aggregate_by_page(raw_results)
+        page_scores = self._aggregate_by_page(scores, rows)
 
         if text_query and self.settings.enable_text_boost:
             text_results = self.bm25.search(text_query, self.settings.stage1_top_k)
-            text_page_scores = [(f"{m['doc_id']}:{m['page_num']}", s) for m, s in text_results]
-            visual_page_scores = [(k, s) for k, s in page_scores.items()]
+            text_page_scores = [((m["doc_id"], m["page_num"]), s) for m, s in text_results]
+            visual_page_scores = list(page_scores.items())
 
             fused = reciprocal_rank_fusion([visual_page_scores, text_page_scores])
             sorted_pages = [key for key, _ in fused[:stage1_limit]]
         else:
-            sorted_pages = sorted(page_scores.keys(), key=lambda k: page_scores[k], reverse=True)
-            sorted_pages = sorted_pages[:stage1_limit]
+            sorted_pages = list(page_scores)[:stage1_limit]
+
+        docs = self.db.get_documents(doc_id for doc_id, _ in sorted_pages)
 
         results = []
-        for page_key in sorted_pages:
-            doc_id, page_num_str = page_key.split(":")
-            page_num = int(page_num_str)
-            doc = self.db.get_document(doc_id)
+        for doc_id, page_num in sorted_pages:
+            doc = docs.get(doc_id)
             if doc:
                 results.append(SearchResult(
                     doc_id=doc_id,
                     doc_name=Path(doc.path).name,
                     page_num=page_num,
-                    score=page_scores.get(page_key, 0.0),
+                    score=page_scores.get((doc_id, page_num), 0.0),
                     stage="fast",
                     thumbnail_url=f"/v1/thumb/{doc_id}/{page_num}",
                 ))
@@ -162,11 +263,23 @@ class SearchService:
 
     def _aggregate_by_page(
         self,
-        results: list[tuple[dict[str, Any], float]],
-    ) -> dict[str, float]:
-        """Aggregate region scores to page level (max score per page)."""
-        page_scores: dict[str, float] = defaultdict(float)
-        for meta, score in results:
-            key = f"{meta['doc_id']}:{meta['page_num']}"
-            page_scores[key] = max(page_scores[key], score)
-        return page_scores
+        scores: np.ndarray,
+        rows: np.ndarray,
+    ) -> dict[tuple[str, int], float]:
+        """Aggregate region scores to page level (max score per page), best page first.
+
+        Hits are grouped by integer page id and keyed by the index's own
+        (doc_id, page_num) tuples, so no per-hit or per-page key is built.
+        """
+        found = rows >= 0
+        row_pages, page_keys = self.index.row_pages()
+        pages, first, inverse = np.unique(
+            row_pages[rows[found]], return_index=True, return_inverse=True
+        )
+        # Scores floor at 0, as the per-hit defaultdict(float) max always did
+        best = np.zeros(len(pages), dtype=np.float32)
+        np.maximum.at(best, inverse, scores[found])
+
+        # Ties keep the order pages first appeared in the ranked hits
+        order = np.lexsort((first, -best))
+        return {page_keys[pages[i]]: float(best[i]) for i in order}
@@ -1,61 +1,174 @@
 from __future__ import annotations
 
 import pickle
+from array import array
 from pathlib import Path
 from typing import Any
 
-from rank_bm25 import BM25Okapi
+import numpy as np
+import orjson
+
+# BM25Okapi parameters, as rank_bm25 defaulted them
+BM25_K1 = 1.5
+BM25_B = 0.75
+# Terms in more than half the corpus get this fraction of the mean idf instead of a negative one
+BM25_EPSILON = 0.25
+
+# Postings arrays saved as .npy files so load() can memory-map them
+POSTINGS_ARRAYS = ("term_indptr", "post_docs", "post_weights")
+
+
+def _save_array(path: Path, arr: np.ndarray) -> None:
+    """np.save via a temp file and rename, so live memory maps of path stay valid."""
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "wb") as f:
+        np.save(f, arr)
+    tmp_path.replace(path)
 
 
 class BM25Index:
-    """BM25 index for text layer search."""
+    """BM25 index for text layer search.
+
+    Documents are stored as int32 token ids into a vocabulary, concatenated
+    CSR-style (doc i is tokens[indptr[i]:indptr[i + 1]]). build() turns
+    them into an inverted index holding each term's precomputed Okapi BM25
+    weight per document, so a query only touches its own terms' postings.
+
+    Saved postings are memory-mapped on load, so only the pages of postings
+    a query touches are read; the token stream is only read back if more
+    documents are added.
+    """
 
     def __init__(self) -> None:
-        self.corpus: list[list[str]] = []
+        self.vocab: dict[str, int] = {}
+        self.tokens: array[int] = array("i")
+        self.indptr: list[int] = [0]
         self.metadata: list[dict[str, Any]] = []
-        self.bm25: BM25Okapi | None = None
+        # Postings of term t are post_docs/post_weights[term_indptr[t]:term_indptr[t + 1]]
+        self._term_indptr: np.ndarray | None = None
+        self._post_docs: np.ndarray | None = None
+        self._post_weights: np.ndarray | None = None
+        # Saved token stream not yet read back; see _load_tokens()
+        self._tokens_path: Path | None = None
+
+    @property
+    def num_docs(self) -> int:
+        return len(self.indptr) - 1
 
     def add(self, text: str, metadata: dict[str, Any]) -> None:
         """Add a document to the index."""
-        tokens = text.lower().split()
-        self.corpus.append(tokens)
+        self._load_tokens()
+        self.tokens.extend(
+            self.vocab.setdefault(token, len(self.vocab)) for token in text.lower().split()
+        )
+        self.indptr.append(len(self.tokens))
         self.metadata.append(metadata)
 
     def build(self) -> None:
         """Build the BM25 index after adding all documents."""
-        if self.corpus:
-            self.bm25 = BM25Okapi(self.corpus)
+        num_docs = self.num_docs
+        if not num_docs:
+            return
+
+        self._load_tokens()
+        tokens = np.frombuffer(self.tokens, dtype=np.int32)
+        indptr = np.asarray(self.indptr, dtype=np.int64)
+        # Sliced rather than np.diff, whose stubs type the result as timedelta64
+        doc_lens = indptr[1:] - indptr[:-1]
+        length_norm = BM25_K1 * (1 - BM25_B + BM25_B * doc_lens / (doc_lens.mean() or 1.0))
+
+        # Term frequencies from unique (term, doc) pairs; sorting by term groups postings
+        token_docs = np.repeat(np.arange(num_docs, dtype=np.int64), doc_lens)
+        pairs, tf = np.unique(tokens.astype(np.int64) * num_docs + token_docs, return_counts=True)
+        terms, docs = np.divmod(pairs, num_docs)
+
+        df = np.bincount(terms, minlength=len(self.vocab))
+        idf = np.log(num_docs - df + 0.5) - np.log(df + 0.5)
+        if len(idf):
+            idf[idf < 0] = BM25_EPSILON * idf.mean()
+
+        self._term_indptr = np.concatenate([[0], np.cumsum(df)])
+        self._post_docs = docs.astype(np.int32)
+        self._post_weights = idf[terms] * tf * (BM25_K1 + 1) / (tf + length_norm[docs])
 
     def search(self, query: str, k: int = 100) -> list[tuple[dict[str, Any], float]]:
         """Search for documents matching query."""
-        if not self.bm25:
+        if self._term_indptr is None:
             return []
+        assert self._post_docs is not None and self._post_weights is not None
 
-        tokens = query.lower().split()
-        scores = self.bm25.get_scores(tokens)
+        scores = np.zeros(self.num_docs, dtype=np.float64)
+        for token in query.lower().split():
+            term = self.vocab.get(token)
+            if term is not None:
+                # Doc ids are unique within a posting, so fancy-index += is safe
+                start, end = self._term_indptr[term], self._term_indptr[term + 1]
+                scores[self._post_docs[start:end]] += self._post_weights[start:end]
 
-        top_indices = scores.argsort()[::-1][:k]
+        # Only matched documents can be returned, so select and sort among those
+        matched = np.flatnonzero(scores > 0)
+        if k < len(matched):
+            matched = matched[np.argpartition(-scores[matched], k)[:k]]
+        top_indices = matched[np.argsort(-scores[matched], kind="stable")]
 
-        results = []
-        for idx in top_indices:
-            if scores[idx] > 0:
-                results.append((self.metadata[idx], float(scores[idx])))
+        return [(self.metadata[idx], float(scores[idx])) for idx in top_indices.tolist()]
 
-        return results
+    def _load_tokens(self) -> None:
+        """Read the saved token stream back in before it is extended or rebuilt."""
+        if self._tokens_path is not None:
+            self.tokens = array("i", np.load(self._tokens_path).astype(np.int32).tobytes())
+            self._tokens_path = None
 
     def save(self, path: Path) -> None:
-        """Save index to disk."""
+        """Save token and postings arrays as .npy files plus JSON vocabulary and metadata."""
         path.mkdir(parents=True, exist_ok=True)
-        with open(path / "bm25.pkl", "wb") as f:
-            pickle.dump((self.corpus, self.metadata), f)
+        self._load_tokens()
+        if self._term_indptr is None:
+            self.build()
+
+        _save_array(path / "tokens.npy", np.frombuffer(self.tokens, dtype=np.int32))
+        _save_array(path / "indptr.npy", np.asarray(self.indptr, dtype=np.int64))
+        if self._term_indptr is not None:
+            for name in POSTINGS_ARRAYS:
+                _save_array(path / f"{name}.npy", getattr(self, f"_{name}"))
+        (path / "bm25.json").write_bytes(
+            orjson.dumps({"vocab": list(self.vocab), "metadata": self.metadata})
+        )
+        # Superseded by the files above
+        (path / "bm25.npz").unlink(missing_ok=True)
+        (path / "bm25.pkl").unlink(missing_ok=True)
 
     @classmethod
     def load(cls, path: Path) -> BM25Index:
         """Load index from disk."""
         instance = cls()
+        npz_path = path / "bm25.npz"
         pkl_path = path / "bm25.pkl"
-        if pkl_path.exists():
+        if (path / "tokens.npy").exists():
+            instance.indptr = np.load(path / "indptr.npy").tolist()
+            data = orjson.loads((path / "bm25.json").read_bytes())
+            instance.vocab = {token: i for i, token in enumerate(data["vocab"])}
+            instance.metadata = data["metadata"]
+            instance._tokens_path = path / "tokens.npy"
+            if all((path / f"{name}.npy").exists() for name in POSTINGS_ARRAYS):
+                for name in POSTINGS_ARRAYS:
+                    setattr(instance, f"_{name}", np.load(path / f"{name}.npy", mmap_mode="r"))
+            else:
+                instance.build()
+        elif npz_path.exists():
+            # Indexes saved as a single npz of tokens before postings were persisted
+            with np.load(npz_path) as arrays:
+                instance.tokens = array("i", arrays["tokens"].astype(np.int32).tobytes())
+                instance.indptr = arrays["indptr"].tolist()
+            data = orjson.loads((path / "bm25.json").read_bytes())
+            instance.vocab = {token: i for i, token in enumerate(data["vocab"])}
+            instance.metadata = data["metadata"]
+            instance.build()
+        elif pkl_path.exists():
+            # Indexes saved as a pickled (corpus, metadata) before the token-id format
             with open(pkl_path, "rb") as f:
-                instance.corpus, instance.metadata = pickle.load(f)
+                corpus, metadata = pickle.load(f)
+            for tokens, meta in zip(corpus, metadata):
+                instance.add(" ".join(tokens), meta)
             instance.build()
         return instance
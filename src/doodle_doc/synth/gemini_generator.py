@@ -44,6 +44,10 @@ class GeminiGenerator:
             self._client = genai.Client()
         return self._client
 
+    def connect(self) -> None:
+        """Create the API client now instead of on first use."""
+        _ = self.client
+
     def generate_notes_page(self, subject: str) -> Image.Image:
         prompt = f"""Generate an image of a page of handwritten student notes about {subject}.
 Include diagrams, equations, annotations, and text scattered across the page.
@@ -64,14 +68,13 @@ After the image, write a short description of what element you picked."""
 
         img_bytes = io.BytesIO()
         page_image.save(img_bytes, format="PNG")
-        img_bytes.seek(0)
 
         from google.genai import types
 
         response = self.client.models.generate_content(
             model=self.config.model,
             contents=[
-                types.Part.from_bytes(data=img_bytes.read(), mime_type="image/png"),
+                types.Part.from_bytes(data=img_bytes.getvalue(), mime_type="image/png"),
                 prompt,
             ],
         )
@@ -80,8 +83,9 @@ After the image, write a short description of what element you picked."""
         description = ""
 
         for part in response.parts:
-            if part.inline_data:
-                doodle_image = self._to_pil(part.as_image())
+            inline = part.inline_data
+            if inline and inline.data:
+                doodle_image = self._to_pil(inline.data)
             elif part.text:
                 description = part.text.strip()
 
@@ -97,10 +101,12 @@ After the image, write a short description of what element you picked."""
         )
 
         for part in response.parts:
-            if part.inline_data:
-                return self._to_pil(part.as_image())
+            inline = part.inline_data
+            if inline and inline.data:
+                return self._to_pil(inline.data)
 
         raise RuntimeError("No image in Gemini response")
 
-    def _to_pil(self, img: Any) -> Image.Image:
-        return Image.open(io.BytesIO(img.image_bytes)).convert("RGB")
+    def _to_pil(self, data: bytes) -> Image.Image:
+        # Decode the inline bytes directly; as_image() would re-read the part
+        return Image.open(io.BytesIO(data)).convert("RGB")
@@ -1,12 +1,14 @@
 from __future__ import annotations
 
-import json
 import random
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
 from typing import Any
 
+import orjson
+
 from doodle_doc.synth.gemini_generator import SUBJECTS, GeminiGenerator
 
 
@@ -15,6 +17,8 @@ class SynthConfig:
     output_dir: Path = Path("data/synth")
     num_pairs: int = 25
     seed: int = 42
+    # Pairs generated at once; each pair is two sequential Gemini requests
+    concurrency: int = 4
 
 
 @dataclass
@@ -49,29 +53,36 @@ class SynthPipeline:
             print(f"Found {len(ground_truth)} existing pairs, appending from index {start_idx}")
             existing_pairs = len(ground_truth)
 
-        for i in range(self.config.num_pairs):
-            idx = start_idx + i
-            subject = self._rng.choice(SUBJECTS)
-            page_id = f"page_{idx:04d}"
-            doodle_id = f"doodle_{idx:04d}"
-
-            print(f"[{i+1}/{self.config.num_pairs}] {subject[:40]}...")
-
-            page = self.gemini.generate_notes_page(subject)
-            page.save(pages_dir / f"{page_id}.png", "PNG")
-
-            doodle, element = self.gemini.generate_doodle_for_page(page)
-            doodle.save(doodles_dir / f"{doodle_id}.png", "PNG")
-
-            ground_truth[doodle_id] = {
-                "page_id": page_id,
-                "subject": subject,
-                "element": element,
-            }
-
-            print(f"    -> {element[:60] if element else 'no description'}")
-
-            self._save_ground_truth(ground_truth)
+        # Drawn up front so the seed picks the same subjects at any concurrency
+        subjects = [self._rng.choice(SUBJECTS) for _ in range(self.config.num_pairs)]
+
+        # Create the lazy client here, not in a race between the workers
+        self.gemini.connect()
+
+        # Generation is network-bound, so pairs overlap on threads; pending pairs are
+        # recorded from this thread as they finish
+        with ThreadPoolExecutor(
+            max_workers=max(1, self.config.concurrency), thread_name_prefix="synth"
+        ) as pool:
+            futures = [
+                pool.submit(self._generate_pair, start_idx + i, subject, pages_dir, doodles_dir)
+                for i, subject in enumerate(subjects)
+            ]
+            try:
+                for done, future in enumerate(as_completed(futures), 1):
+                    doodle_id, entry = future.result()
+                    ground_truth[doodle_id] = entry
+                    self._append_pending_pair(doodle_id, entry)
+
+                    element = entry["element"]
+                    print(f"[{done}/{self.config.num_pairs}] {entry['subject'][:40]}")
+                    print(f"    -> {element[:60] if element else 'no description'}")
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+
+        self._save_ground_truth(dict(sorted(ground_truth.items())))
         self._save_manifest(len(ground_truth))
 
         return SynthStats(
@@ -80,15 +91,41 @@ class SynthPipeline:
             output_dir=self.config.output_dir,
         )
 
+    def _generate_pair(
+        self,
+        idx: int,
+        subject: str,
+        pages_dir: Path,
+        doodles_dir: Path,
+    ) -> tuple[str, dict[str, Any]]:
+        page_id = f"page_{idx:04d}"
+        doodle_id = f"doodle_{idx:04d}"
+
+        # Fast zlib level: encoding at the default level 6 is CPU-bound for little size gain
+        page = self.gemini.generate_notes_page(subject)
+        page.save(pages_dir / f"{page_id}.png", "PNG", compress_level=1)
+
+        doodle, element = self.gemini.generate_doodle_for_page(page)
+        doodle.save(doodles_dir / f"{doodle_id}.png", "PNG", compress_level=1)
+
+        return doodle_id, {"page_id": page_id, "subject": subject, "element": element}
+
     def _setup_dirs(self) -> None:
         self.config.output_dir.mkdir(parents=True, exist_ok=True)
         (self.config.output_dir / "pages").mkdir(exist_ok=True)
         (self.config.output_dir / "doodles").mkdir(exist_ok=True)
 
+    def _append_pending_pair(self, doodle_id: str, entry: dict[str, Any]) -> None:
+        """Record one generated pair so an interrupted run keeps it, without rewriting the JSON."""
+        path = self.config.output_dir / "ground_truth.pending.jsonl"
+        with open(path, "ab") as f:
+            f.write(orjson.dumps([doodle_id, entry], option=orjson.OPT_APPEND_NEWLINE))
+
     def _save_ground_truth(self, gt: dict[str, dict[str, Any]]) -> None:
         path = self.config.output_dir / "ground_truth.json"
-        with open(path, "w") as f:
-            json.dump(gt, f, indent=2)
+        path.write_bytes(orjson.dumps(gt, option=orjson.OPT_INDENT_2))
+        # Everything pending is now in ground_truth.json
+        (self.config.output_dir / "ground_truth.pending.jsonl").unlink(missing_ok=True)
 
     def _save_manifest(self, num_pairs: int) -> None:
         manifest = {
@@ -99,16 +136,25 @@ class SynthPipeline:
             "subjects": SUBJECTS,
         }
         path = self.config.output_dir / "manifest.json"
-        with open(path, "w") as f:
-            json.dump(manifest, f, indent=2)
+        path.write_bytes(orjson.dumps(manifest, option=orjson.OPT_INDENT_2))
 
     def _load_existing_ground_truth(self) -> dict[str, dict[str, Any]]:
         gt_path = self.config.output_dir / "ground_truth.json"
+        data: dict[str, dict[str, Any]] = {}
         if gt_path.exists():
-            with open(gt_path) as f:
-                data: dict[str, dict[str, Any]] = json.load(f)
-                return data
-        return {}
+            data = orjson.loads(gt_path.read_bytes())
+
+        # Pairs from a run that stopped before writing ground_truth.json
+        pending_path = self.config.output_dir / "ground_truth.pending.jsonl"
+        if pending_path.exists():
+            with open(pending_path, "rb") as f:
+                for line in f:
+                    try:
+                        doodle_id, entry = orjson.loads(line)
+                    except orjson.JSONDecodeError:
+                        break  # a line cut short by the interruption
+                    data[doodle_id] = entry
+        return data
 
     def _find_next_index(self, ground_truth: dict[str, dict[str, Any]]) -> int:
         if not ground_truth:
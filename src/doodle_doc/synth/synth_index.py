@@ -51,26 +51,34 @@ class SynthIndexer:
             print(f"No pages found in {self.pages_dir}")
             return SynthIndexStats(total_pages=0, indexed=0, skipped=0)
 
-        indexed = 0
-        skipped = 0
-
+        # Synth pages are single images, so each is page 0 of a doc named after the file
+        pending: list[Path] = []
         for i, page_path in enumerate(page_files):
-            doc_id = page_path.stem  # e.g., "page_0000"
-            page_num = 0  # Synth pages are single images
-
-            if self.index.has_page(doc_id, page_num):
-                print(f"[{i+1}/{len(page_files)}] {doc_id} (skipped, already indexed)")
-                skipped += 1
-                continue
-
-            print(f"[{i+1}/{len(page_files)}] Indexing {doc_id}...")
-
-            img = Image.open(page_path)
-            embedding = self.embedder.embed_single(img)
+            if self.index.has_page(page_path.stem, 0):
+                print(f"[{i+1}/{len(page_files)}] {page_path.stem} (skipped, already indexed)")
+            else:
+                pending.append(page_path)
+        skipped = len(page_files) - len(pending)
 
-            self.index.add(doc_id, page_num, embedding)
-            self.index.save()
-            indexed += 1
+        batch_size = self.settings.colqwen_index_batch_size
+        indexed = 0
+        try:
+            for start in range(0, len(pending), batch_size):
+                batch = pending[start : start + batch_size]
+                done = skipped + indexed + len(batch)
+                print(f"[{done}/{len(page_files)}] Indexing {batch[0].stem}..{batch[-1].stem}")
+
+                embeddings = self.embedder.embed_batch(
+                    [Image.open(path) for path in batch], batch_size=batch_size
+                )
+                self.index.add_batch(
+                    [(path.stem, 0, emb) for path, emb in zip(batch, embeddings)]
+                )
+                indexed += len(batch)
+        finally:
+            # One save for the run; still keeps the batches done if one fails
+            if indexed:
+                self.index.save()
 
         return SynthIndexStats(
             total_pages=len(page_files),
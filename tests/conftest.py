@@ -3,11 +3,13 @@ from __future__ import annotations
 import tempfile
 from pathlib import Path
 
+import orjson
 import pytest
 import numpy as np
 from PIL import Image
 
 from doodle_doc.core.config import Settings
+from doodle_doc.eval.metrics import EvalMetrics, LatencyMetrics, RetrievalMetrics
 
 
 @pytest.fixture
@@ -36,3 +38,20 @@ def sample_image() -> Image.Image:
 @pytest.fixture
 def sample_numpy_image(sample_image: Image.Image) -> np.ndarray:
     return np.array(sample_image)
+
+
+@pytest.fixture(scope="session")
+def baseline_fast_json(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    """A fast-mode baseline with Recall@10 0.72, written once per session.
+
+    Tests copy it into their own results dir rather than re-serializing it.
+    """
+    baseline = EvalMetrics(
+        retrieval=RetrievalMetrics(recall_at_10=0.72),
+        latency=LatencyMetrics(),
+        search_mode="fast",
+        timestamp="2024-01-01",
+    )
+    path = tmp_path_factory.mktemp("baseline") / "baseline_fast.json"
+    path.write_bytes(orjson.dumps(baseline))
+    return path
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from doodle_doc.api.deps import get_app_state
+from doodle_doc.api.routes import documents
+from doodle_doc.core.config import Settings
+
+
+@pytest.fixture
+def client(settings: Settings):
+    app = FastAPI()
+    app.include_router(documents.router)
+    app.dependency_overrides[get_app_state] = lambda: SimpleNamespace(settings=settings)
+    documents.clear_page_stat_cache()
+    yield TestClient(app)
+    documents.clear_page_stat_cache()
+
+
+def _write_page(settings: Settings, doc_id: str, page_num: int):
+    path = settings.rendered_dir / doc_id / f"{page_num}.png"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    Image.new("RGB", (8, 8), color=(255, 255, 255)).save(path)
+    return path
+
+
+def test_get_page_serves_rendered_image(client: TestClient, settings: Settings):
+    _write_page(settings, "doc", 0)
+
+    response = client.get("/v1/doc/doc/page/0")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/png"
+
+
+def test_page_deleted_after_stat_is_cached_returns_404(
+    client: TestClient, settings: Settings
+):
+    path = _write_page(settings, "doc", 0)
+    assert client.get("/v1/doc/doc/page/0").status_code == 200
+
+    # Deleted behind the server's back, e.g. by the CLI
+    path.unlink()
+
+    response = client.get("/v1/doc/doc/page/0")
+    assert response.status_code == 404
+    assert response.json() == {"detail": "Page not found"}
+    assert documents._cached_stat.cache_info().currsize == 0
+
+
+def test_thumbnail_deleted_after_stat_is_cached_returns_404(
+    client: TestClient, settings: Settings
+):
+    path = _write_page(settings, "doc", 1)
+    assert client.get("/v1/thumb/doc/1").status_code == 200
+
+    path.unlink()
+
+    assert client.get("/v1/thumb/doc/1").status_code == 404
+
+
+def test_thumbnail_is_immutable_only_when_generated(client: TestClient, settings: Settings):
+    _write_page(settings, "doc", 0)
+
+    fallback = client.get("/v1/thumb/doc/0")
+    assert fallback.status_code == 200
+    assert "immutable" not in fallback.headers["cache-control"]
+    assert "etag" not in fallback.headers
+
+    thumb_path = settings.thumbnails_dir / "doc" / "0.png"
+    thumb_path.parent.mkdir(parents=True)
+    Image.new("RGB", (4, 4), color=(255, 255, 255)).save(thumb_path)
+    documents.clear_page_stat_cache()
+
+    thumb = client.get("/v1/thumb/doc/0")
+    assert "immutable" in thumb.headers["cache-control"]
+    assert thumb.headers["etag"] == '"doc-0"'
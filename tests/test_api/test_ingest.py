@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import json
+import time
+from concurrent.futures import Future
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from doodle_doc.api.deps import get_app_state
+from doodle_doc.api.routes import ingest
+from doodle_doc.core.config import Settings
+from doodle_doc.ingestion.pipeline import IndexingProgress
+
+
+class _StubPipeline:
+    """Stands in for IngestionPipeline; behaviour is set per test via class attributes."""
+
+    error: Exception | None = None
+    wait_for_listener = False
+
+    def __init__(self, settings: Settings, embedder: object) -> None:
+        pass
+
+    def run(self, root: Path, on_progress, force_reindex: bool = False) -> IndexingProgress:
+        if self.wait_for_listener:
+            # Hold progress back until the event stream has subscribed
+            deadline = time.monotonic() + 5
+            while not any(job.listeners for job in ingest._jobs.values()):
+                if time.monotonic() > deadline:
+                    break
+                time.sleep(0.001)
+        if self.error is not None:
+            raise self.error
+        progress = IndexingProgress(docs_total=1, pages_total=2, status="indexing")
+        on_progress(progress)
+        progress = IndexingProgress(
+            docs_done=1, docs_total=1, pages_done=2, pages_total=2, status="completed"
+        )
+        on_progress(progress)
+        return progress
+
+
+@pytest.fixture
+def client(settings: Settings, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(ingest, "IngestionPipeline", _StubPipeline)
+    monkeypatch.setattr(ingest, "_jobs", {})
+    monkeypatch.setattr(_StubPipeline, "error", None)
+    monkeypatch.setattr(_StubPipeline, "wait_for_listener", False)
+
+    app = FastAPI()
+    app.include_router(ingest.router)
+    state = SimpleNamespace(settings=settings, _embedder=None)
+    app.dependency_overrides[get_app_state] = lambda: state
+    return TestClient(app)
+
+
+def _start(client: TestClient, root: Path) -> str:
+    response = client.post("/v1/ingest", json={"root_path": str(root)})
+    assert response.status_code == 200
+    assert response.json()["status"] == "started"
+    return response.json()["job_id"]
+
+
+def _wait_finished(job_id: str) -> None:
+    deadline = time.monotonic() + 5
+    while ingest._jobs[job_id].finished_at is None:
+        assert time.monotonic() < deadline, "ingest job did not finish"
+        time.sleep(0.001)
+
+
+def _finished_job(finished_at: float) -> ingest.IngestJob:
+    future: Future[None] = Future()
+    future.set_result(None)
+    return ingest.IngestJob(
+        future=future,
+        progress=IndexingProgress(status="completed"),
+        finished_at=finished_at,
+    )
+
+
+def _running_job() -> ingest.IngestJob:
+    return ingest.IngestJob(future=Future(), progress=IndexingProgress(status="indexing"))
+
+
+def test_ingest_missing_path_returns_400(client: TestClient, temp_dir: Path):
+    response = client.post("/v1/ingest", json={"root_path": str(temp_dir / "missing")})
+    assert response.status_code == 400
+
+
+def test_ingest_job_reports_completed_status(client: TestClient, temp_dir: Path):
+    job_id = _start(client, temp_dir)
+    _wait_finished(job_id)
+
+    response = client.get(f"/v1/ingest/{job_id}")
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "status": "completed",
+        "docs_done": 1,
+        "docs_total": 1,
+        "pages_done": 2,
+        "pages_total": 2,
+        "eta_seconds": None,
+    }
+
+
+def test_failed_ingest_job_reports_failed_status(client: TestClient, temp_dir: Path):
+    _StubPipeline.error = RuntimeError("render failed")
+    job_id = _start(client, temp_dir)
+    _wait_finished(job_id)
+
+    response = client.get(f"/v1/ingest/{job_id}")
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "failed"
+
+
+def test_unknown_job_returns_404(client: TestClient):
+    assert client.get("/v1/ingest/nope").status_code == 404
+    assert client.get("/v1/ingest/nope/events").status_code == 404
+
+
+def test_evicts_finished_jobs_past_ttl(client: TestClient):
+    now = time.monotonic()
+    ingest._jobs.update({
+        "old": _finished_job(now - ingest.JOB_TTL_S - 1),
+        "recent": _finished_job(now),
+        "running": _running_job(),
+    })
+
+    ingest._evict_finished_jobs()
+
+    assert set(ingest._jobs) == {"recent", "running"}
+
+
+def test_evicts_oldest_finished_jobs_over_cap(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.setattr(ingest, "MAX_TRACKED_JOBS", 3)
+    now = time.monotonic()
+    ingest._jobs.update({
+        "running-1": _running_job(),
+        "running-2": _running_job(),
+        "first": _finished_job(now - 3),
+        "second": _finished_job(now - 2),
+        "third": _finished_job(now - 1),
+    })
+
+    ingest._evict_finished_jobs()
+
+    # Running jobs count towards the cap but are never evicted
+    assert set(ingest._jobs) == {"running-1", "running-2", "third"}
+
+
+def test_event_stream_follows_job_until_it_finishes(client: TestClient, temp_dir: Path):
+    _StubPipeline.wait_for_listener = True
+    job_id = _start(client, temp_dir)
+
+    response = client.get(f"/v1/ingest/{job_id}/events")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = [
+        json.loads(line.removeprefix("data: "))
+        for line in response.text.splitlines()
+        if line.startswith("data: ")
+    ]
+    assert events[0]["status"] == "starting"
+    assert events[-1]["status"] == "completed"
+    assert events[-1]["pages_done"] == 2
+    assert not ingest._jobs[job_id].listeners
+
+
+def test_event_stream_of_finished_job_sends_final_status(
+    client: TestClient, temp_dir: Path
+):
+    _StubPipeline.error = RuntimeError("render failed")
+    job_id = _start(client, temp_dir)
+    _wait_finished(job_id)
+
+    response = client.get(f"/v1/ingest/{job_id}/events")
+
+    events = [line for line in response.text.splitlines() if line.startswith("data: ")]
+    assert len(events) == 1
+    assert json.loads(events[0].removeprefix("data: "))["status"] == "failed"
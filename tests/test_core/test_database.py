@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+
+from doodle_doc.core.database import Database, DocumentModel, PageModel
+
+
+def test_file_hash_cache_hit(temp_dir: Path):
+    db = Database(temp_dir / "metadata.sqlite")
+    db.set_file_hash("/notes/a.pdf", mtime_ns=100, size_bytes=2048, sha256="abc")
+
+    assert db.get_file_hash("/notes/a.pdf", mtime_ns=100, size_bytes=2048) == "abc"
+
+
+def test_file_hash_cache_miss_on_change(temp_dir: Path):
+    db = Database(temp_dir / "metadata.sqlite")
+    db.set_file_hash("/notes/a.pdf", mtime_ns=100, size_bytes=2048, sha256="abc")
+
+    assert db.get_file_hash("/notes/a.pdf", mtime_ns=200, size_bytes=2048) is None
+    assert db.get_file_hash("/notes/a.pdf", mtime_ns=100, size_bytes=4096) is None
+    assert db.get_file_hash("/notes/b.pdf", mtime_ns=100, size_bytes=2048) is None
+
+
+def test_file_hash_cache_overwrite(temp_dir: Path):
+    db = Database(temp_dir / "metadata.sqlite")
+    db.set_file_hash("/notes/a.pdf", mtime_ns=100, size_bytes=2048, sha256="abc")
+    db.set_file_hash("/notes/a.pdf", mtime_ns=200, size_bytes=2048, sha256="def")
+
+    assert db.get_file_hash("/notes/a.pdf", mtime_ns=200, size_bytes=2048) == "def"
+
+
+def test_list_document_summaries(temp_dir: Path):
+    db = Database(temp_dir / "metadata.sqlite")
+    db.add_document(DocumentModel(
+        doc_id="d1",
+        path="/notes/week 1/lecture.v2.pdf",
+        sha256="abc",
+        modified_time=datetime(2024, 1, 1),
+        num_pages=3,
+    ))
+
+    assert db.list_document_summaries() == [{
+        "doc_id": "d1",
+        "path": "/notes/week 1/lecture.v2.pdf",
+        "name": "lecture.v2.pdf",
+        "num_pages": 3,
+        "sha256": "abc",
+    }]
+
+
+def test_list_document_summaries_windows_path(temp_dir: Path):
+    db = Database(temp_dir / "metadata.sqlite")
+    db.add_document(DocumentModel(
+        doc_id="d1",
+        path="C:\\Users\\me\\notes/week 1\\lecture.v2.pdf",
+        sha256="abc",
+        modified_time=datetime(2024, 1, 1),
+        num_pages=3,
+    ))
+
+    [summary] = db.list_document_summaries()
+    assert summary["name"] == "lecture.v2.pdf"
+    assert summary["path"] == "C:\\Users\\me\\notes/week 1\\lecture.v2.pdf"
+
+
+def test_get_documents_by_sha256(temp_dir: Path):
+    db = Database(temp_dir / "metadata.sqlite")
+    db.add_documents([
+        DocumentModel(
+            doc_id=f"d{i}",
+            path=f"/notes/{i}.pdf",
+            sha256=f"hash{i}",
+            modified_time=datetime(2024, 1, 1),
+            num_pages=1,
+        )
+        for i in range(3)
+    ])
+
+    docs = db.get_documents_by_sha256(["hash0", "hash2", "missing"])
+    assert sorted(doc.doc_id for doc in docs) == ["d0", "d2"]
+
+
+def test_set_file_hashes_batch(temp_dir: Path):
+    db = Database(temp_dir / "metadata.sqlite")
+    db.set_file_hashes([
+        ("/notes/a.pdf", 100, 2048, "abc"),
+        ("/notes/b.pdf", 200, 4096, "def"),
+    ])
+
+    assert db.get_file_hashes() == {
+        "/notes/a.pdf": (100, 2048, "abc"),
+        "/notes/b.pdf": (200, 4096, "def"),
+    }
+
+
+def test_clear_file_hashes(temp_dir: Path):
+    db = Database(temp_dir / "metadata.sqlite")
+    db.set_file_hash("/notes/a.pdf", mtime_ns=100, size_bytes=2048, sha256="abc")
+    db.clear_file_hashes()
+
+    assert db.get_file_hashes() == {}
+    assert db.get_file_hash("/notes/a.pdf", mtime_ns=100, size_bytes=2048) is None
+
+
+def test_list_page_keys_matches_document_iteration_order(temp_dir: Path):
+    db = Database(temp_dir / "metadata.sqlite")
+    # Inserted out of alphabetical order, like random uuid doc_ids
+    for doc_id in ["c", "a", "b"]:
+        db.add_document(DocumentModel(
+            doc_id=doc_id,
+            path=f"/notes/{doc_id}.pdf",
+            sha256=doc_id,
+            modified_time=datetime(2024, 1, 1),
+            num_pages=2,
+        ))
+    db.add_pages([
+        PageModel(doc_id=doc_id, page_num=page_num, width_px=10, height_px=10)
+        for doc_id, page_num in [("b", 1), ("a", 1), ("c", 1), ("b", 0), ("a", 0), ("c", 0)]
+    ])
+
+    # How pseudo-query sampling walked the index before list_page_keys existed
+    expected = [
+        (doc.doc_id, page.page_num)
+        for doc in db.get_all_documents()
+        for page in db.get_pages_for_document(doc.doc_id)
+    ]
+
+    assert expected == [("c", 0), ("c", 1), ("a", 0), ("a", 1), ("b", 0), ("b", 1)]
+    assert db.list_page_keys() == expected
+
+
+def test_find_pages_by_pixel_sha256(temp_dir: Path):
+    db = Database(temp_dir / "metadata.sqlite")
+    db.add_pages([
+        PageModel(doc_id="old", page_num=0, width_px=10, height_px=10, pixel_sha256="aa"),
+        PageModel(doc_id="old", page_num=1, width_px=10, height_px=10, pixel_sha256="bb"),
+        PageModel(doc_id="new", page_num=3, width_px=10, height_px=10, pixel_sha256="aa"),
+    ])
+
+    assert db.find_pages_by_pixel_sha256("aa") == [("new", 3), ("old", 0)]
+    assert db.find_pages_by_pixel_sha256("cc") == []
+
+
+def test_adds_pixel_sha256_to_existing_pages_table(temp_dir: Path):
+    db_path = temp_dir / "metadata.sqlite"
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(
+            "CREATE TABLE pages (id INTEGER PRIMARY KEY, doc_id VARCHAR(36), page_num INTEGER,"
+            " width_px INTEGER, height_px INTEGER, text_layer TEXT)"
+        )
+        conn.execute("INSERT INTO pages VALUES (1, 'a', 0, 10, 10, NULL)")
+    conn.close()
+
+    db = Database(db_path)
+
+    assert [page.page_num for page in db.get_pages_for_document("a")] == [0]
+    assert db.find_pages_by_pixel_sha256("aa") == []
+
+
+def test_add_document_with_pages(temp_dir: Path):
+    db = Database(temp_dir / "metadata.sqlite")
+    db.add_document_with_pages(
+        DocumentModel(
+            doc_id="d1",
+            path="/notes/a.pdf",
+            sha256="abc",
+            modified_time=datetime(2024, 1, 1),
+            num_pages=2,
+        ),
+        [PageModel(doc_id="d1", page_num=i, width_px=10, height_px=10) for i in range(2)],
+    )
+
+    assert db.get_document("d1") is not None
+    assert db.list_page_keys() == [("d1", 0), ("d1", 1)]
+
+
+def test_get_documents(temp_dir: Path):
+    db = Database(temp_dir / "metadata.sqlite")
+    db.add_documents([
+        DocumentModel(
+            doc_id=doc_id,
+            path=f"/notes/{doc_id}.pdf",
+            sha256=doc_id,
+            modified_time=datetime(2024, 1, 1),
+            num_pages=1,
+        )
+        for doc_id in ("d1", "d2", "d3")
+    ])
+
+    docs = db.get_documents(["d3", "d1", "d1", "missing"])
+
+    assert sorted(docs) == ["d1", "d3"]
+    assert docs["d3"].path == "/notes/d3.pdf"
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+from doodle_doc.core.models import SearchResult, SearchResultBatch
+
+
+def make_result(doc_id: str, page_num: int, score: float) -> SearchResult:
+    return SearchResult(
+        doc_id=doc_id,
+        doc_name=f"{doc_id}.pdf",
+        page_num=page_num,
+        score=score,
+        stage="fast",
+        thumbnail_url=f"/v1/thumb/{doc_id}/{page_num}",
+    )
+
+
+class TestSearchResultBatch:
+    def test_from_results(self) -> None:
+        batch = SearchResultBatch.from_results([
+            make_result("doc1", 5, 0.9),
+            make_result("doc2", 3, 0.8),
+        ])
+
+        assert len(batch) == 2
+        assert list(batch.doc_ids) == ["doc1", "doc2"]
+        assert list(batch.page_nums) == [5, 3]
+
+    def test_first_hit(self) -> None:
+        batch = SearchResultBatch.from_results([
+            make_result("doc1", 5, 0.9),
+            make_result("doc1", 3, 0.8),
+            make_result("doc2", 3, 0.7),
+        ])
+
+        assert batch.first_hit("doc1", 5) == 0
+        assert batch.first_hit("doc2", 3) == 2
+        assert batch.first_hit("doc2", 5) is None
+
+    def test_empty(self) -> None:
+        batch = SearchResultBatch.from_results([])
+
+        assert len(batch) == 0
+        assert batch.first_hit("doc1", 1) is None
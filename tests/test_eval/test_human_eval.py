@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import pytest
+
+from doodle_doc.core.config import Settings
+from doodle_doc.core.models import SearchResult
+from doodle_doc.eval.human_eval import (
+    HumanAnnotation,
+    HumanEvalDataset,
+    HumanEvalManager,
+    ResultAnnotation,
+)
+
+
+def make_annotation(query_id: str, labels: list[str]) -> HumanAnnotation:
+    return HumanAnnotation(
+        query_id=query_id,
+        results=[
+            ResultAnnotation(doc_id=f"doc{i}", page_num=i, relevance=label)  # type: ignore[arg-type]
+            for i, label in enumerate(labels)
+        ],
+    )
+
+
+class TestComputeMetrics:
+    def test_recall_and_mrr(self, settings: Settings) -> None:
+        dataset = HumanEvalDataset(annotations=[
+            make_annotation("q1", ["relevant", "not_relevant"]),
+            make_annotation("q2", ["not_relevant"] * 6 + ["relevant"]),
+            make_annotation("q3", ["not_relevant", "partially_relevant"]),
+        ])
+
+        metrics = HumanEvalManager(settings).compute_metrics(dataset)
+
+        assert metrics.recall_at_1 == pytest.approx(1 / 3)
+        assert metrics.recall_at_5 == pytest.approx(1 / 3)
+        assert metrics.recall_at_10 == pytest.approx(2 / 3)
+        assert metrics.mrr == pytest.approx((1 + 1 / 7) / 3)
+        assert metrics.num_queries == 3
+
+    def test_partial_threshold(self, settings: Settings) -> None:
+        dataset = HumanEvalDataset(annotations=[
+            make_annotation("q1", ["not_relevant", "partially_relevant"]),
+        ])
+
+        metrics = HumanEvalManager(settings).compute_metrics(
+            dataset, relevance_threshold="partially_relevant"
+        )
+
+        assert metrics.recall_at_1 == 0.0
+        assert metrics.recall_at_5 == 1.0
+        assert metrics.mrr == 0.5
+
+    def test_empty(self, settings: Settings) -> None:
+        metrics = HumanEvalManager(settings).compute_metrics(HumanEvalDataset())
+        assert metrics.num_queries == 0
+
+
+class TestSaveLoad:
+    def test_round_trip(self, settings: Settings) -> None:
+        manager = HumanEvalManager(settings)
+        dataset = HumanEvalDataset(annotations=[
+            make_annotation("q1", ["relevant", "not_relevant"]),
+        ])
+        dataset.annotations[0].notes = "ε-δ proof"
+
+        manager.save_dataset(dataset)
+        loaded = manager.load_annotations()
+
+        assert loaded == dataset
+
+    def test_annotation_template(self, settings: Settings) -> None:
+        manager = HumanEvalManager(settings)
+        results = [
+            SearchResult(
+                doc_id="doc1",
+                doc_name="doc1.pdf",
+                page_num=i,
+                score=1.0 - i / 20,
+                stage="fast",
+                thumbnail_url=f"/v1/thumb/doc1/{i}",
+            )
+            for i in range(12)
+        ]
+
+        manager.create_annotation_template(["q1", "q2"], {"q1": results})
+        loaded = manager.load_annotations()
+
+        assert [a.query_id for a in loaded.annotations] == ["q1", "q2"]
+        assert len(loaded.annotations[0].results) == 10
+        assert loaded.annotations[0].results[3] == ResultAnnotation("doc1", 3, "not_relevant")
+        assert loaded.annotations[1].results == []
+
+    def test_load_missing(self, settings: Settings) -> None:
+        loaded = HumanEvalManager(settings).load_annotations()
+        assert loaded.annotations == []
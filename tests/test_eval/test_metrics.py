@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import time
 
+import numpy as np
 import pytest
 
 from doodle_doc.core.models import SearchResult
@@ -103,6 +104,22 @@ class TestAggregateRetrievalMetrics:
         assert metrics.mrr == pytest.approx(5 / 6)
         assert metrics.num_queries == 3
 
+    def test_aggregate_arrays(self) -> None:
+        recalls = np.array([
+            [1.0, 1.0, 1.0, 1.0],
+            [0.0, 1.0, 1.0, 1.0],
+            [0.0, 0.0, 0.0, 1.0],
+        ])
+        mrrs = np.array([1.0, 0.5, 1 / 15])
+
+        metrics = aggregate_retrieval_metrics(recalls, mrrs)
+
+        assert metrics.recall_at_1 == pytest.approx(1 / 3)
+        assert metrics.recall_at_10 == pytest.approx(2 / 3)
+        assert metrics.recall_at_20 == 1.0
+        assert metrics.mrr == pytest.approx((1.0 + 0.5 + 1 / 15) / 3)
+        assert metrics.num_queries == 3
+
     def test_empty(self) -> None:
         metrics = aggregate_retrieval_metrics({}, [])
         assert metrics.recall_at_1 == 0.0
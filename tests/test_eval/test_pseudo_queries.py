@@ -2,30 +2,22 @@ from __future__ import annotations
 
 import random
 
-from PIL import Image
-
 from doodle_doc.eval.pseudo_queries import PseudoQueryConfig, PseudoQueryGenerator
 
 
-class TestExtractRandomCrop:
+class TestRandomCropBox:
     def test_crop_within_bounds(self) -> None:
-        img = Image.new("RGB", (400, 400), color=(255, 255, 255))
-
         config = PseudoQueryConfig(min_crop_ratio=0.2, max_crop_ratio=0.3)
         generator = PseudoQueryGenerator.__new__(PseudoQueryGenerator)
         generator.config = config
 
         rng = random.Random(42)
-        crop, (x0, y0, x1, y1) = generator._extract_random_crop(img, rng)
+        x0, y0, x1, y1 = generator._random_crop_box((400, 400), rng)
 
         assert 0 <= x0 < x1 <= 400
         assert 0 <= y0 < y1 <= 400
-        assert crop.size[0] == x1 - x0
-        assert crop.size[1] == y1 - y0
 
     def test_crop_size_in_range(self) -> None:
-        img = Image.new("RGB", (1000, 1000), color=(255, 255, 255))
-
         config = PseudoQueryConfig(
             min_crop_ratio=0.15,
             max_crop_ratio=0.40,
@@ -37,25 +29,35 @@ class TestExtractRandomCrop:
         rng = random.Random(42)
 
         for _ in range(10):
-            crop, _ = generator._extract_random_crop(img, rng)
-            width, height = crop.size
-            ratio = width / 1000
+            x0, _, x1, _ = generator._random_crop_box((1000, 1000), rng)
+            ratio = (x1 - x0) / 1000
             assert 0.15 <= ratio <= 0.40
 
     def test_deterministic_with_seed(self) -> None:
-        img = Image.new("RGB", (400, 400), color=(255, 255, 255))
-
         config = PseudoQueryConfig(min_crop_ratio=0.2, max_crop_ratio=0.3)
         generator = PseudoQueryGenerator.__new__(PseudoQueryGenerator)
         generator.config = config
 
         rng1 = random.Random(42)
-        _, box1 = generator._extract_random_crop(img, rng1)
+        box1 = generator._random_crop_box((400, 400), rng1)
 
         rng2 = random.Random(42)
-        _, box2 = generator._extract_random_crop(img, rng2)
+        box2 = generator._random_crop_box((400, 400), rng2)
+
+        assert box1 == box2
 
+    def test_numpy_backend_is_deterministic_and_in_bounds(self) -> None:
+        config = PseudoQueryConfig(min_crop_ratio=0.2, max_crop_ratio=0.3, rng_backend="np")
+        generator = PseudoQueryGenerator.__new__(PseudoQueryGenerator)
+        generator.config = config
+
+        box1 = generator._random_crop_box((400, 400), generator._new_rng())
+        box2 = generator._random_crop_box((400, 400), generator._new_rng())
+
+        x0, y0, x1, y1 = box1
         assert box1 == box2
+        assert 0 <= x0 < x1 <= 400
+        assert 0 <= y0 < y1 <= 400
 
 
 class TestPseudoQueryConfig:
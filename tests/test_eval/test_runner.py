@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import os
+import shutil
 from pathlib import Path
 
 import pytest
@@ -14,7 +16,9 @@ class TestCompareToBaseline:
     def settings(self, temp_dir: Path) -> Settings:
         return Settings(data_dir=temp_dir)
 
-    def test_passes_when_no_regression(self, settings: Settings) -> None:
+    def test_passes_when_no_regression(
+        self, settings: Settings, baseline_fast_json: Path
+    ) -> None:
         runner = EvalRunner(settings)
 
         current = EvalMetrics(
@@ -25,23 +29,15 @@ class TestCompareToBaseline:
         )
 
         runner.results_dir.mkdir(parents=True, exist_ok=True)
-
-        import json
-        baseline = EvalMetrics(
-            retrieval=RetrievalMetrics(recall_at_10=0.72),
-            latency=LatencyMetrics(),
-            search_mode="fast",
-            timestamp="2024-01-01",
-        )
-        from dataclasses import asdict
-        with open(runner.results_dir / "baseline_fast.json", "w") as f:
-            json.dump(asdict(baseline), f)
+        shutil.copyfile(baseline_fast_json, runner.results_dir / "baseline_fast.json")
 
         passed, message = runner.compare_to_baseline(current, "fast", threshold=0.05)
         assert passed is True
         assert "OK" in message
 
-    def test_fails_when_regression(self, settings: Settings) -> None:
+    def test_fails_when_regression(
+        self, settings: Settings, baseline_fast_json: Path
+    ) -> None:
         runner = EvalRunner(settings)
 
         current = EvalMetrics(
@@ -52,17 +48,7 @@ class TestCompareToBaseline:
         )
 
         runner.results_dir.mkdir(parents=True, exist_ok=True)
-
-        import json
-        baseline = EvalMetrics(
-            retrieval=RetrievalMetrics(recall_at_10=0.72),
-            latency=LatencyMetrics(),
-            search_mode="fast",
-            timestamp="2024-01-01",
-        )
-        from dataclasses import asdict
-        with open(runner.results_dir / "baseline_fast.json", "w") as f:
-            json.dump(asdict(baseline), f)
+        shutil.copyfile(baseline_fast_json, runner.results_dir / "baseline_fast.json")
 
         passed, message = runner.compare_to_baseline(current, "fast", threshold=0.05)
         assert passed is False
@@ -115,7 +101,52 @@ class TestLoadBaseline:
         assert loaded.retrieval.recall_at_10 == 0.8
         assert loaded.latency.p50_ms == 100.0
 
+    def test_rewritten_baseline_is_reparsed(self, settings: Settings) -> None:
+        results_dir = settings.data_dir / "eval" / "results"
+        results_dir.mkdir(parents=True, exist_ok=True)
+
+        import json
+        from dataclasses import asdict
+        baseline_path = results_dir / "baseline_fast.json"
+        for recall in (0.7, 0.85):
+            baseline = EvalMetrics(
+                retrieval=RetrievalMetrics(recall_at_10=recall),
+                latency=LatencyMetrics(),
+                search_mode="fast",
+                timestamp="2024-01-01T00:00:00",
+            )
+            with open(baseline_path, "w") as f:
+                json.dump(asdict(baseline), f)
+            os.utime(baseline_path, ns=(0, int(recall * 1e9)))
+
+            loaded = EvalRunner.load_baseline(results_dir, "fast")
+            assert loaded is not None
+            assert loaded.retrieval.recall_at_10 == recall
+
     def test_load_nonexistent_baseline(self, settings: Settings) -> None:
         results_dir = settings.data_dir / "eval" / "results"
         loaded = EvalRunner.load_baseline(results_dir, "fast")
         assert loaded is None
+
+
+class TestLatestResult:
+    @pytest.fixture
+    def settings(self, temp_dir: Path) -> Settings:
+        return Settings(data_dir=temp_dir)
+
+    def test_picks_newest_non_baseline(self, settings: Settings) -> None:
+        runner = EvalRunner(settings)
+        runner.results_dir.mkdir(parents=True)
+        for name in [
+            "20240101_120000_fast.json",
+            "20240301_120000_fast.json",
+            "20240201_120000_fast.json",
+            "20240401_120000_accurate.json",
+            "baseline_fast.json",
+        ]:
+            (runner.results_dir / name).write_text("{}")
+
+        assert runner._get_latest_result("fast") == runner.results_dir / "20240301_120000_fast.json"
+
+    def test_missing_dir(self, settings: Settings) -> None:
+        assert EvalRunner(settings)._get_latest_result("fast") is None
@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+
+from doodle_doc.ingestion.colqwen_index import ColQwen2Index
+
+
+def test_stacked_pads_to_longest_page(temp_dir: Path):
+    index = ColQwen2Index(temp_dir / "colqwen")
+    index.add("doc1", 0, np.ones((3, 4), dtype=np.float32))
+    index.add("doc1", 1, np.full((5, 4), 2.0, dtype=np.float32))
+
+    page_keys, embeddings, mask = index.stacked()
+
+    assert page_keys == [("doc1", 0), ("doc1", 1)]
+    assert embeddings.shape == (2, 5, 4)
+    assert mask.sum(axis=1).tolist() == [3, 5]
+    assert np.all(embeddings[0, 3:] == 0.0)
+    assert np.all(embeddings[1] == 2.0)
+
+
+def test_stacked_invalidated_on_change(temp_dir: Path):
+    index = ColQwen2Index(temp_dir / "colqwen")
+    index.add("doc1", 0, np.ones((3, 4), dtype=np.float32))
+    assert len(index.stacked()[0]) == 1
+
+    index.add("doc2", 0, np.ones((3, 4), dtype=np.float32))
+    assert len(index.stacked()[0]) == 2
+
+    index.remove_by_doc_id("doc1")
+    assert index.stacked()[0] == [("doc2", 0)]
+
+
+def test_stacked_empty(temp_dir: Path):
+    page_keys, embeddings, mask = ColQwen2Index(temp_dir / "colqwen").stacked()
+
+    assert page_keys == []
+    assert embeddings.shape[0] == 0
+    assert mask.shape[0] == 0
+
+
+def test_all_page_keys_tracks_changes(temp_dir: Path):
+    index = ColQwen2Index(temp_dir / "colqwen")
+    index.add("doc1", 0, np.ones((3, 4), dtype=np.float32))
+    assert index.all_page_keys() == [("doc1", 0)]
+
+    index.add("doc1", 1, np.ones((3, 4), dtype=np.float32))
+    index.add("doc1", 1, np.ones((3, 4), dtype=np.float32))
+    assert index.all_page_keys() == [("doc1", 0), ("doc1", 1)]
+
+    index.remove_by_doc_id("doc1")
+    assert index.all_page_keys() == []
+
+
+def test_compact_round_trip(temp_dir: Path):
+    index = ColQwen2Index(temp_dir / "colqwen")
+    first = np.arange(12, dtype=np.float32).reshape(3, 4)
+    second = np.arange(20, dtype=np.float32).reshape(5, 4)
+    index.add("doc1", 0, first)
+    index.add("doc2", 0, second)
+    index.compact()
+
+    assert list((temp_dir / "colqwen" / "embeddings").glob("*.npy")) == []
+
+    loaded = ColQwen2Index.load(temp_dir / "colqwen")
+    np.testing.assert_array_equal(loaded.get("doc1", 0), first)
+    np.testing.assert_array_equal(loaded.get("doc2", 0), second)
+
+
+def test_compact_drops_removed_pages(temp_dir: Path):
+    index = ColQwen2Index(temp_dir / "colqwen")
+    index.add("doc1", 0, np.ones((3, 4), dtype=np.float32))
+    index.add("doc2", 0, np.full((2, 4), 2.0, dtype=np.float32))
+    index.compact()
+
+    index.remove_by_doc_id("doc1")
+    index.add("doc3", 0, np.full((1, 4), 3.0, dtype=np.float32))
+    index.compact()
+
+    loaded = ColQwen2Index.load(temp_dir / "colqwen")
+    assert sorted(loaded.all_page_keys()) == [("doc2", 0), ("doc3", 0)]
+    np.testing.assert_array_equal(loaded.get("doc2", 0), np.full((2, 4), 2.0))
+    np.testing.assert_array_equal(loaded.get("doc3", 0), np.full((1, 4), 3.0))
+    assert [p.name for p in (temp_dir / "colqwen").glob("*.bin")] == ["embeddings-2.bin"]
+
+
+def test_add_appends_to_shard(temp_dir: Path):
+    index = ColQwen2Index(temp_dir / "colqwen")
+    index.add_batch([
+        ("doc1", 0, np.ones((3, 4), dtype=np.float16)),
+        ("doc1", 1, np.full((2, 4), 2.0, dtype=np.float16)),
+    ])
+    index.add("doc2", 0, np.full((1, 4), 3.0, dtype=np.float16))
+    index.save()
+
+    assert not (temp_dir / "colqwen" / "embeddings").exists()
+    loaded = ColQwen2Index.load(temp_dir / "colqwen")
+    np.testing.assert_array_equal(loaded.get("doc1", 1), np.full((2, 4), 2.0))
+    np.testing.assert_array_equal(loaded.get("doc2", 0), np.full((1, 4), 3.0))
+    assert loaded.get("doc2", 0).dtype == np.float16
+
+
+def test_normalized_flag(temp_dir: Path):
+    index = ColQwen2Index(temp_dir / "colqwen")
+    index.add("doc1", 0, np.ones((3, 4), dtype=np.float16))
+    index.save()
+    assert ColQwen2Index.load(temp_dir / "colqwen").normalized
+
+    manifest = temp_dir / "colqwen" / "manifest.json"
+    manifest.write_text(manifest.read_text().replace('"normalized": true,', ""))
+    assert not ColQwen2Index.load(temp_dir / "colqwen").normalized
+
+
+def test_compact_normalizes_legacy_index(temp_dir: Path):
+    index = ColQwen2Index(temp_dir / "colqwen")
+    index.add("doc1", 0, np.array([[3.0, 4.0], [0.0, 2.0]], dtype=np.float32))
+    index._manifest.pop("normalized")
+    index.save()
+
+    loaded = ColQwen2Index.load(temp_dir / "colqwen")
+    assert loaded.normalized
+    np.testing.assert_allclose(loaded.get("doc1", 0), [[0.6, 0.8], [0.0, 1.0]])
+
+
+def test_stacked_reused_across_loads(temp_dir: Path):
+    index = ColQwen2Index(temp_dir / "colqwen")
+    index.add("doc1", 0, np.ones((3, 4), dtype=np.float16))
+    index.add("doc1", 1, np.full((5, 4), 2.0, dtype=np.float16))
+    index.save()
+    index.stacked()
+
+    cached = list((temp_dir / "colqwen").glob("stacked-*.npy"))
+    assert len(cached) == 1
+
+    page_keys, embeddings, mask = ColQwen2Index.load(temp_dir / "colqwen").stacked()
+    assert page_keys == [("doc1", 0), ("doc1", 1)]
+    assert isinstance(embeddings, np.memmap)
+    assert mask.sum(axis=1).tolist() == [3, 5]
+    assert np.all(embeddings[1] == 2.0)
+
+    index.remove_by_doc_id("doc1")
+    index.add("doc2", 0, np.ones((2, 4), dtype=np.float16))
+    index.stacked()
+    assert list((temp_dir / "colqwen").glob("stacked-*.npy")) != cached
+
+
+def test_save_and_compact_remove_stale_stacked(temp_dir: Path):
+    index = ColQwen2Index(temp_dir / "colqwen")
+    index.add("doc1", 0, np.ones((3, 4), dtype=np.float16))
+    index.save()
+    index.stacked()
+    assert len(list((temp_dir / "colqwen").glob("stacked-*.npy"))) == 1
+
+    index.add("doc2", 0, np.ones((2, 4), dtype=np.float16))
+    index.save()
+    assert list((temp_dir / "colqwen").glob("stacked-*.npy")) == []
+
+    index.stacked()
+    index.compact()
+    assert list((temp_dir / "colqwen").glob("stacked-*.npy")) == []
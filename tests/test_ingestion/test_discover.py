@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+import hashlib
+from pathlib import Path
+
+from doodle_doc.ingestion.discover import discover_pdfs
+
+
+def test_discover_pdfs_hashes_files(temp_dir: Path):
+    pdf_path = temp_dir / "a.pdf"
+    pdf_path.write_bytes(b"%PDF-1.4 test")
+
+    pdfs = discover_pdfs(temp_dir)
+
+    assert len(pdfs) == 1
+    assert pdfs[0].sha256 == hashlib.sha256(b"%PDF-1.4 test").hexdigest()
+    assert pdfs[0].mtime_ns == pdf_path.stat().st_mtime_ns
+
+
+def test_discover_pdfs_reuses_cached_hash(temp_dir: Path):
+    pdf_path = temp_dir / "a.pdf"
+    pdf_path.write_bytes(b"%PDF-1.4 test")
+    st = pdf_path.stat()
+
+    pdfs = discover_pdfs(temp_dir, {str(pdf_path): (st.st_mtime_ns, st.st_size, "cached")})
+
+    assert pdfs[0].sha256 == "cached"
+
+
+def test_discover_pdfs_ignores_stale_cache(temp_dir: Path):
+    pdf_path = temp_dir / "a.pdf"
+    pdf_path.write_bytes(b"%PDF-1.4 test")
+    st = pdf_path.stat()
+
+    pdfs = discover_pdfs(temp_dir, {str(pdf_path): (st.st_mtime_ns, st.st_size + 1, "stale")})
+
+    assert pdfs[0].sha256 == hashlib.sha256(b"%PDF-1.4 test").hexdigest()
@@ -36,3 +36,10 @@ def test_normalize_ink_white_background(sample_image: Image.Image):
     corners = [result[0, 0], result[0, -1], result[-1, 0], result[-1, -1]]
     for corner in corners:
         assert corner.mean() > 200
+
+
+def test_resize_with_padding_invert_keeps_padding():
+    img = np.zeros((100, 200), dtype=np.uint8)
+    result = resize_with_padding(img, (100, 100), invert=True)
+    assert result.shape == (100, 100)
+    assert np.all(result == 255)
@@ -2,7 +2,12 @@ from __future__ import annotations
 
 import numpy as np
 
-from doodle_doc.ingestion.regions import extract_regions
+from doodle_doc.ingestion.regions import (
+    REGION_NAMES,
+    extract_regions,
+    page_region_boxes,
+    region_boxes,
+)
 
 
 def test_extract_regions_returns_five():
@@ -27,3 +32,16 @@ def test_extract_regions_quadrants_overlap():
         h, w = regions[name].shape[:2]
         assert h > 200
         assert w > 200
+
+
+def test_region_boxes_match_extracted_regions():
+    img = np.random.randint(0, 255, (300, 400, 3), dtype=np.uint8)
+    regions = extract_regions(img)
+
+    for name, (x0, y0, x1, y1) in region_boxes(300, 400).items():
+        assert np.array_equal(regions[name], img[y0:y1, x0:x1])
+
+
+def test_page_region_boxes_follow_region_names():
+    assert page_region_boxes(300, 400) == tuple(region_boxes(300, 400).values())
+    assert tuple(region_boxes(300, 400)) == REGION_NAMES
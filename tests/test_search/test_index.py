@@ -43,3 +43,39 @@ def test_faiss_index_save_load(temp_dir: Path):
 
     results = loaded.search(embeddings[0], k=1)
     assert results[0][0]["id"] == 0
+
+
+def test_faiss_index_single_query_search_matches_batch():
+    index = FAISSIndex(embedding_dim=32)
+
+    embeddings = np.random.default_rng(0).standard_normal((20, 32)).astype(np.float32)
+    embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+    index.add(embeddings, [{"doc_id": f"doc_{i}", "page_num": i} for i in range(20)])
+
+    results = index.search(embeddings[3], k=5)
+    batch_results = index.search_batch(embeddings[3:4], k=5)[0]
+
+    assert [meta for meta, _ in results] == [meta for meta, _ in batch_results]
+    assert results[0][0]["doc_id"] == "doc_3"
+    assert results[0][1] > 0.99
+
+
+@pytest.mark.parametrize("k", [5, 40])
+def test_faiss_index_single_query_fast_path_matches_faiss(k: int):
+    embeddings = np.random.default_rng(1).standard_normal((30, 32)).astype(np.float32)
+    embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+    metadata = [{"doc_id": f"doc_{i}", "page_num": i} for i in range(30)]
+
+    for index_type in ("IndexFlatIP", "IndexScalarQuantizerFP16"):
+        index = FAISSIndex(embedding_dim=32, index_type=index_type)
+        index.add(embeddings, metadata)
+
+        # One query takes the NumPy fast path; two go through faiss
+        scores, rows = index.search_rows(embeddings[7:8], k)
+        faiss_scores, faiss_rows = index.search_rows(embeddings[7:9], k)
+
+        assert scores.shape == rows.shape == (1, k)
+        np.testing.assert_array_equal(rows[0], faiss_rows[0])
+        valid = rows[0] >= 0
+        np.testing.assert_allclose(scores[0][valid], faiss_scores[0][valid], atol=1e-3)
+        assert valid.sum() == min(k, 30)
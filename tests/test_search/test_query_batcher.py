@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import threading
+import time
+
+import numpy as np
+
+from doodle_doc.search.retrieval import _QueryBatcher
+
+
+class _BlockingIndex:
+    """Stands in for FAISSIndex.search_rows; the first search waits on release."""
+
+    def __init__(self, error: Exception | None = None) -> None:
+        self.error = error
+        self.release = threading.Event()
+        self.calls: list[tuple[np.ndarray, int]] = []
+
+    def search_rows(self, queries: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+        self.calls.append((queries, k))
+        if len(self.calls) == 1:
+            self.release.wait(timeout=5)
+        if self.error is not None:
+            raise self.error
+        # Row id and score both echo the query's first component
+        rows = np.repeat(queries[:, :1].astype(np.int64), k, axis=1)
+        return rows.astype(np.float32), rows
+
+
+def _run_concurrently(
+    batcher: _QueryBatcher, index: _BlockingIndex, values: list[int]
+) -> list[object]:
+    """Search values[0] as the leader, queue the rest behind it, then release it."""
+    outcomes: list[object] = [None] * len(values)
+
+    def search(i: int) -> None:
+        try:
+            outcomes[i] = batcher.search(np.full(4, values[i], dtype=np.float32))
+        except Exception as exc:  # noqa: BLE001 - the tests assert on the raised error
+            outcomes[i] = exc
+
+    threads = [threading.Thread(target=search, args=(i,)) for i in range(len(values))]
+    threads[0].start()
+    while not index.calls:
+        time.sleep(0.001)
+    for thread in threads[1:]:
+        thread.start()
+    while len(batcher._pending) < len(values) - 1:
+        time.sleep(0.001)
+
+    index.release.set()
+    for thread in threads:
+        thread.join(timeout=5)
+    return outcomes
+
+
+def test_queries_queued_during_a_search_are_coalesced():
+    index = _BlockingIndex()
+    batcher = _QueryBatcher(index, k=3)  # type: ignore[arg-type]
+
+    outcomes = _run_concurrently(batcher, index, [1, 2, 3])
+
+    assert [len(queries) for queries, _ in index.calls] == [1, 2]
+    assert all(k == 3 for _, k in index.calls)
+    for value, (scores, rows) in zip([1, 2, 3], outcomes):
+        assert rows.tolist() == [value] * 3
+        assert scores.tolist() == [float(value)] * 3
+
+
+def test_search_error_reaches_every_queued_query():
+    index = _BlockingIndex(error=RuntimeError("faiss failed"))
+    batcher = _QueryBatcher(index, k=2)  # type: ignore[arg-type]
+
+    outcomes = _run_concurrently(batcher, index, [1, 2, 3])
+
+    assert all(isinstance(outcome, RuntimeError) for outcome in outcomes)
+    assert not batcher._running
+
+    # The batcher recovers once searches succeed again
+    index.error = None
+    scores, rows = batcher.search(np.full(4, 5, dtype=np.float32))
+    assert rows.tolist() == [5, 5]
+
+
+def test_lone_query_is_searched_immediately():
+    index = _BlockingIndex()
+    index.release.set()
+    batcher = _QueryBatcher(index, k=1)  # type: ignore[arg-type]
+
+    _, rows = batcher.search(np.full(4, 7, dtype=np.float32))
+
+    assert rows.tolist() == [7]
+    assert len(index.calls) == 1
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import pickle
+from pathlib import Path
+
+import numpy as np
+
+from doodle_doc.search.text_search import BM25Index
+
+
+def _index() -> BM25Index:
+    index = BM25Index()
+    index.add("fourier transform of a gaussian", {"doc_id": "a", "page_num": 0})
+    index.add("laplace transform table", {"doc_id": "a", "page_num": 1})
+    index.add("eigenvalues of symmetric matrices", {"doc_id": "b", "page_num": 0})
+    index.add("gaussian elimination worked example", {"doc_id": "b", "page_num": 1})
+    index.add("notes on probability", {"doc_id": "c", "page_num": 0})
+    index.build()
+    return index
+
+
+def test_bm25_ranks_pages_sharing_more_terms_first():
+    results = _index().search("Fourier gaussian")
+
+    assert [meta for meta, _ in results] == [
+        {"doc_id": "a", "page_num": 0},
+        {"doc_id": "b", "page_num": 1},
+    ]
+    assert results[0][1] > results[1][1] > 0
+
+
+def test_bm25_unknown_terms_match_nothing():
+    assert _index().search("topology") == []
+
+
+def test_bm25_respects_k():
+    assert len(_index().search("transform gaussian", k=1)) == 1
+
+
+def test_bm25_save_load_round_trip(temp_dir: Path):
+    index = _index()
+    index.save(temp_dir)
+
+    loaded = BM25Index.load(temp_dir)
+
+    assert loaded.search("eigenvalues") == index.search("eigenvalues")
+
+
+def test_bm25_load_memory_maps_postings_and_accepts_new_documents(temp_dir: Path):
+    _index().save(temp_dir)
+
+    loaded = BM25Index.load(temp_dir)
+    assert isinstance(loaded._post_weights, np.memmap)
+
+    loaded.add("fourier series of a square wave", {"doc_id": "d", "page_num": 0})
+    loaded.build()
+
+    assert {"doc_id": "d", "page_num": 0} in [meta for meta, _ in loaded.search("fourier")]
+
+
+def test_bm25_loads_legacy_pickle(temp_dir: Path):
+    index = _index()
+    corpus = [
+        "fourier transform of a gaussian".split(),
+        "laplace transform table".split(),
+        "eigenvalues of symmetric matrices".split(),
+        "gaussian elimination worked example".split(),
+        "notes on probability".split(),
+    ]
+    with open(temp_dir / "bm25.pkl", "wb") as f:
+        pickle.dump((corpus, index.metadata), f)
+
+    loaded = BM25Index.load(temp_dir)
+
+    assert loaded.search("fourier gaussian") == index.search("fourier gaussian")